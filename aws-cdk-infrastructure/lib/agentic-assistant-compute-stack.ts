@@ -30,7 +30,12 @@ export class AgenticAssistantComputeStack extends cdk.Stack {
           statements: [
             new iam.PolicyStatement({
               effect: iam.Effect.ALLOW,
-              actions: ["dynamodb:GetItem", "dynamodb:Query", "dynamodb:Scan"],
+              actions: [
+                "dynamodb:GetItem",
+                "dynamodb:BatchGetItem",
+                "dynamodb:Query",
+                "dynamodb:Scan",
+              ],
               resources: [orderTrackingTable.tableArn],
             }),
           ],
@@ -38,6 +43,10 @@ export class AgenticAssistantComputeStack extends cdk.Stack {
       },
     });
 
+    // Startup warm-up of the MCP server; /ready answers 503 until it succeeds
+    const warmupTimeoutSeconds = 30;
+    const warmupRetryIntervalSeconds = 10;
+
     // Task Definition
     const taskDefinition = new ecs.FargateTaskDefinition(
       this,
@@ -57,6 +66,9 @@ export class AgenticAssistantComputeStack extends cdk.Stack {
         DYNAMODB_TABLE: orderTrackingTable.tableName,
         PINECONE_API_KEY: process.env.PINECONE_API_KEY!,
         COHERE_API_KEY: process.env.COHERE_API_KEY!,
+        MCP_ADMIN_TOKEN: process.env.MCP_ADMIN_TOKEN!,
+        WARMUP_TIMEOUT: String(warmupTimeoutSeconds),
+        WARMUP_RETRY_INTERVAL: String(warmupRetryIntervalSeconds),
       },
       logging: ecs.LogDrivers.awsLogs({
         streamPrefix: "mcp-server",
@@ -98,12 +110,26 @@ export class AgenticAssistantComputeStack extends cdk.Stack {
       taskDefinition,
       desiredCount: 0,
       assignPublicIp: false,
+      // Failing /ready checks during a slow warm-up must not get the task
+      // replaced: allow one full warm-up attempt plus a retry
+      healthCheckGracePeriod: cdk.Duration.seconds(
+        warmupTimeoutSeconds + warmupRetryIntervalSeconds + 30
+      ),
     });
 
     // Target Group
     listener.addTargets("McpServerTargets", {
       port: 8000,
       targets: [service],
+      // /ready fails until the task has warmed its DynamoDB and Pinecone
+      // connections, so cold tasks never receive traffic
+      healthCheck: {
+        path: "/ready",
+        interval: cdk.Duration.seconds(10),
+        timeout: cdk.Duration.seconds(5),
+        healthyThresholdCount: 2,
+        unhealthyThresholdCount: 3,
+      },
     });
 
     // Outputs
@@ -0,0 +1,448 @@
+"""Offline end-to-end benchmark of the support workflow.
+
+Replays synthetic emails through the real graph, MCP client, MCP server,
+scheduler and mail sender. Gemini, Cohere, DynamoDB, Gmail and SMTP are
+replaced by fakes with fixed latencies (see benchmarks/fakes.py). Run from
+langgraph-workflow/:
+
+    python -m benchmarks.e2e_bench
+    python -m benchmarks.e2e_bench --emails 500 --concurrency 32 --llm-latency 0.2
+    python -m benchmarks.e2e_bench --update-baseline   # rewrite the baseline file
+
+Two paths are measured: "workflow" calls start_agent_workflow directly and
+"gmail" goes through process_email_notification, history sync, batch
+fetches and the workflow scheduler. Results are compared against
+benchmarks/e2e_baseline.json; the exit status is 1 on a regression beyond
+--tolerance.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import functools
+import inspect
+import io
+import json
+import logging
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+BASELINE_PATH = Path(__file__).resolve().parent / "e2e_baseline.json"
+
+TEMPLATES = [
+    (
+        "Where is my order #{order}?",
+        "Hi, my package {tracking} for order #{order} was due last week and "
+        "still has not arrived. Please help.",
+    ),
+    (
+        "Late delivery",
+        "Tracking number {tracking} shows no movement for days. I want a refund "
+        "of the shipping cost.",
+    ),
+    (
+        "Damaged item",
+        "The lamp from order #{order} arrived broken. What are my options?",
+    ),
+]
+
+
+def synthetic_emails(count: int, seed: int) -> list[tuple[str, str, str]]:
+    rng = random.Random(seed)
+    emails = []
+    for i in range(count):
+        subject, body = rng.choice(TEMPLATES)
+        values = {"order": 6000 + i, "tracking": f"TRK{100000 + i}"}
+        emails.append(
+            (subject.format(**values), body.format(**values), f"customer{i}@example.com")
+        )
+    return emails
+
+
+def percentiles(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+
+    return {
+        "count": len(ordered),
+        "p50_ms": round(rank(0.50), 2),
+        "p95_ms": round(rank(0.95), 2),
+        "p99_ms": round(rank(0.99), 2),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class NodeTimer:
+    """Wraps graph node functions to record their wall time per call."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def wrap(self, name, fn):
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def timed(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    self.samples[name].append(time.perf_counter() - started)
+
+        else:
+
+            @functools.wraps(fn)
+            def timed(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.samples[name].append(time.perf_counter() - started)
+
+        return timed
+
+    def report(self) -> dict:
+        return {name: percentiles(samples) for name, samples in sorted(self.samples.items())}
+
+
+class Harness:
+    def __init__(self, args, workdir: str):
+        self.args = args
+        self.workdir = workdir
+        self.timer = NodeTimer()
+
+    def configure(self):
+        """Point every Settings value that reaches the outside world at a fake."""
+        os.environ.setdefault("GOOGLE_API_KEY", "offline")
+        os.environ.setdefault("COHERE_API_KEY", "offline")
+        os.environ.setdefault("AWS_ACCESS_KEY_ID", "offline")
+        os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "offline")
+
+        from src.config import Settings
+
+        self.mcp_port = _free_port()
+        Settings.MCP_SERVER_BASE_URL = f"http://127.0.0.1:{self.mcp_port}"
+        Settings.MCP_SERVER_URL = f"{Settings.MCP_SERVER_BASE_URL}/mcp"
+        Settings.GMAIL_USER = "support@example.com"
+        Settings.SMTP_HOST = "127.0.0.1"
+        Settings.SMTP_STARTTLS = False
+        Settings.SMTP_PASSWORD = None
+        Settings.WORKFLOW_WORKERS = self.args.concurrency
+        Settings.LLM_CACHE_ENABLED = False
+        Settings.DEDUPE_DB_PATH = os.path.join(self.workdir, "dedupe.db")
+        Settings.DEDUPE_BLOOM_CAPACITY = 100_000
+        self.settings = Settings
+
+    async def start(self):
+        from benchmarks import fakes
+
+        self.configure()
+        self.sink = fakes.SMTPSink()
+        await self.sink.start()
+        self.settings.SMTP_PORT = self.sink.port
+
+        self.mcp = fakes.load_mcp_server(
+            os.path.join(self.workdir, "policy_index"),
+            embed_latency=self.args.tool_latency,
+            db_latency=self.args.tool_latency,
+        )
+        self._start_mcp_server()
+
+        import src.agent.nodes as nodes
+        import src.agent.workflow as workflow
+        from src.agent.runtime import start_runtime
+        from src.agent.scheduler import workflow_scheduler
+        from src.utils import gmail_manager, mail_sender
+        import src.utils.history_tracker as history_tracker
+
+        self.llm = fakes.FakeChatModel(latency=self.args.llm_latency)
+        nodes.get_llm = lambda: self.llm
+        for name in (
+            "parse_email",
+            "prefetch_tools",
+            "analyze_problem",
+            "handle_tool_result",
+            "draft_response",
+            "format_to_html_and_send",
+        ):
+            setattr(workflow, name, self.timer.wrap(name, getattr(workflow, name)))
+        workflow.async_tool_executor = self.timer.wrap("tools", workflow.async_tool_executor)
+
+        self.gmail = fakes.FakeGmailService(latency=self.args.gmail_latency)
+        gmail_manager.service = lambda: self.gmail
+        gmail_manager.authorized_http = lambda: None
+        history_tracker.HISTORY_ID_FILE = os.path.join(self.workdir, "last_history_id.txt")
+        history_tracker.save_last_history_id(self.gmail.history_id)
+
+        self.mail_sender = mail_sender
+        self.scheduler = workflow_scheduler
+        mail_sender.start()
+        self.runtime = await start_runtime()
+        workflow_scheduler.start()
+
+    def _start_mcp_server(self):
+        import uvicorn
+
+        config = uvicorn.Config(
+            self.mcp.get_app(), host="127.0.0.1", port=self.mcp_port, log_level="warning"
+        )
+        self.mcp_server = uvicorn.Server(config)
+        # Its own thread and event loop, like the separate service it is in production
+        self.mcp_thread = threading.Thread(target=self.mcp_server.run, daemon=True)
+        self.mcp_thread.start()
+        while not self.mcp_server.started:
+            time.sleep(0.01)
+
+    async def stop(self):
+        from src.agent.runtime import stop_runtime
+
+        await self.scheduler.stop()
+        await stop_runtime()
+        await self.mail_sender.stop()
+        await self.sink.stop()
+        self.mcp_server.should_exit = True
+        self.mcp_thread.join(timeout=10)
+
+    def _reset(self, expected: int):
+        self.timer.samples.clear()
+        self.llm.calls.clear()
+        self.sink.received.clear()
+        self.sink.expected = expected
+        self.sink.arrived.clear()
+
+    async def _wait_for_mail(self, timeout: float):
+        try:
+            await asyncio.wait_for(self.sink.arrived.wait(), timeout)
+        except asyncio.TimeoutError:
+            print(f"Only {len(self.sink.received)}/{self.sink.expected} replies arrived")
+
+    async def run_workflow_path(self, emails) -> dict:
+        """Drive start_agent_workflow directly at the configured concurrency."""
+        from src.agent.workflow import start_agent_workflow
+
+        self._reset(len(emails))
+        semaphore = asyncio.Semaphore(self.args.concurrency)
+        started_at = {}
+
+        async def one(subject, body, from_email):
+            async with semaphore:
+                started_at[from_email] = time.perf_counter()
+                await start_agent_workflow(subject, body, from_email)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(*email) for email in emails))
+        await self._wait_for_mail(self.args.timeout)
+        return self._summary(emails, started, started_at)
+
+    async def run_gmail_path(self, emails) -> dict:
+        """Deliver emails to the fake inbox and send one notification per email."""
+        from benchmarks.fakes import raw_message
+        from src.utils import process_email_notification
+
+        self._reset(len(emails))
+        started_at = {}
+
+        async def notify(index, subject, body, from_email):
+            history_id = self.gmail.deliver(
+                f"msg-{index}", raw_message(subject, body, from_email)
+            )
+            started_at[from_email] = time.perf_counter()
+            await asyncio.to_thread(
+                process_email_notification, "support@example.com", history_id
+            )
+
+        started = time.perf_counter()
+        await asyncio.gather(*(notify(i, *email) for i, email in enumerate(emails)))
+        await self._wait_for_mail(self.args.timeout)
+        return self._summary(emails, started, started_at)
+
+    def _summary(self, emails, started: float, started_at: dict) -> dict:
+        received = self.sink.received
+        finished = max(received.values(), default=time.perf_counter())
+        latencies = [
+            received[from_email] - started_at[from_email]
+            for _, _, from_email in emails
+            if from_email in received and from_email in started_at
+        ]
+        count = len(emails)
+        return {
+            "emails": count,
+            "delivered": len(received),
+            "emails_per_sec": round(len(received) / (finished - started), 2),
+            "latency": percentiles(latencies),
+            "nodes": self.timer.report(),
+            "llm_calls_per_email": round(sum(self.llm.calls.values()) / count, 2),
+            "llm_calls_by_kind": dict(sorted(self.llm.calls.items())),
+        }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regressions beyond ``tolerance`` (a fraction) in throughput, end-to-end
+    p95, per-node p50 or LLM calls per email."""
+    regressions = []
+    for path, current in results["paths"].items():
+        previous = baseline.get("paths", {}).get(path)
+        if previous is None:
+            continue
+
+        if current["emails_per_sec"] < previous["emails_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{path}: emails/sec {previous['emails_per_sec']} -> {current['emails_per_sec']}"
+            )
+
+        # End-to-end tails matter; per-node p50 is steadier than p95 on a busy host
+        checks = [("end-to-end", "p95_ms", current["latency"], previous["latency"])] + [
+            (node, "p50_ms", stats, previous["nodes"][node])
+            for node, stats in current["nodes"].items()
+            if node in previous["nodes"]
+        ]
+        for name, key, now, before in checks:
+            # Sub-millisecond nodes are noise, not regressions
+            if now[key] > max(before[key] * (1 + tolerance), before[key] + 1):
+                regressions.append(
+                    f"{path}/{name}: {key[:3]} {before[key]} ms -> {now[key]} ms"
+                )
+
+        if current["llm_calls_per_email"] > previous["llm_calls_per_email"]:
+            regressions.append(
+                f"{path}: LLM calls/email {previous['llm_calls_per_email']} -> "
+                f"{current['llm_calls_per_email']}"
+            )
+    return regressions
+
+
+def print_report(results: dict):
+    for path, summary in results["paths"].items():
+        latency = summary["latency"]
+        print(
+            f"\n[{path}] {summary['delivered']}/{summary['emails']} emails  "
+            f"{summary['emails_per_sec']} emails/sec  "
+            f"LLM calls/email {summary['llm_calls_per_email']}"
+        )
+        print(
+            f"  {'end-to-end':<26} p50={latency['p50_ms']:9.2f} ms  "
+            f"p95={latency['p95_ms']:9.2f} ms  p99={latency['p99_ms']:9.2f} ms"
+        )
+        for node, stats in summary["nodes"].items():
+            print(
+                f"  {node:<26} p50={stats['p50_ms']:9.2f} ms  "
+                f"p95={stats['p95_ms']:9.2f} ms  p99={stats['p99_ms']:9.2f} ms  "
+                f"n={stats['count']}"
+            )
+
+
+async def run(args, workdir: str) -> dict:
+    harness = Harness(args, workdir)
+    quiet = (
+        contextlib.nullcontext()
+        if args.verbose
+        else contextlib.redirect_stdout(io.StringIO())
+    )
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO)
+    else:
+        for name in ("httpx", "mcp", "src", "mcp_server_src"):
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+    with quiet:
+        await harness.start()
+        try:
+            emails = synthetic_emails(args.emails, args.seed)
+            paths = {}
+            if args.path in ("workflow", "both"):
+                paths["workflow"] = await harness.run_workflow_path(emails)
+            if args.path in ("gmail", "both"):
+                paths["gmail"] = await harness.run_gmail_path(emails)
+        finally:
+            await harness.stop()
+
+    return {
+        "config": {
+            "emails": args.emails,
+            "concurrency": args.concurrency,
+            "llm_latency": args.llm_latency,
+            "tool_latency": args.tool_latency,
+            "gmail_latency": args.gmail_latency,
+            "seed": args.seed,
+        },
+        "paths": paths,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--emails", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per LLM call")
+    parser.add_argument(
+        "--tool-latency", type=float, default=0.01, help="seconds per embedding / DynamoDB call"
+    )
+    parser.add_argument(
+        "--gmail-latency", type=float, default=0.02, help="seconds per Gmail API round trip"
+    )
+    parser.add_argument("--path", choices=["workflow", "gmail", "both"], default="both")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.3)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", type=Path, help="also write results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="show workflow output")
+    args = parser.parse_args()
+
+    # Run from a scratch directory so no state files land in the project
+    sys.path.insert(0, str(PROJECT_ROOT))
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="e2e-bench-") as workdir:
+        os.chdir(workdir)
+        try:
+            results = asyncio.run(run(args, workdir))
+        finally:
+            os.chdir(cwd)
+    print_report(results)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to create one")
+        return
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("config") != results["config"]:
+        print("\nBaseline was recorded with a different configuration; not comparing")
+        return
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("\nRegressions against baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print(f"\nNo regressions against {args.baseline.name} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
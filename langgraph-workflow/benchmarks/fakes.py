@@ -0,0 +1,388 @@
+"""Offline stand-ins for Gemini, the MCP server's backends, Gmail and SMTP.
+
+Used by benchmarks.e2e_bench; every fake takes a fixed latency so runs are
+repeatable.
+"""
+
+import asyncio
+import base64
+import hashlib
+import importlib
+import re
+import sys
+import threading
+import time
+import types
+from collections import Counter
+from decimal import Decimal
+from email.mime.text import MIMEText
+from pathlib import Path
+from typing import Any
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+MCP_SERVER_SRC = Path(__file__).resolve().parents[2] / "mcp-server" / "src"
+# Both projects are packages named "src"; the server is loaded under this name
+MCP_PACKAGE = "mcp_server_src"
+EMBEDDING_DIMENSIONS = 384
+
+TRACKING_RE = re.compile(r"\bTRK\d+\b")
+ORDER_RE = re.compile(r"#(\d+)")
+
+
+def _prompt_text(messages) -> str:
+    return "\n".join(str(message.content) for message in messages)
+
+
+def _field(prompt: str, label: str) -> str | None:
+    match = re.search(rf"^{label}:\s*(.*)$", prompt, re.MULTILINE)
+    value = match.group(1).strip() if match else None
+    return None if value in (None, "", "None") else value
+
+
+class FakeChatModel(BaseChatModel):
+    """Deterministic Gemini stand-in for every prompt in the workflow.
+
+    Structured-output calls answer the schema's tool call from the prompt;
+    the analyze turn asks for whichever of tracking data and policy info is
+    still missing.
+    """
+
+    latency: float = 0.05
+    calls: Any = None
+
+    def model_post_init(self, __context):
+        self.calls = Counter()
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-gemini"
+
+    def bind_tools(self, tools, *, tool_choice=None, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        return self._respond(messages, kwargs.get("tools") or [])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        return self._respond(messages, kwargs.get("tools") or [])
+
+    def _respond(self, messages, tools) -> ChatResult:
+        prompt = _prompt_text(messages)
+        names = [tool["function"]["name"] for tool in tools]
+        kind = names[0] if len(names) == 1 else "analyze_problem"
+        self.calls[kind] += 1
+
+        if kind == "EmailParseOutput":
+            tracking = TRACKING_RE.findall(prompt)
+            order = ORDER_RE.search(prompt)
+            args = {
+                "problem": (
+                    f"Package {tracking[0]} has not been delivered"
+                    if tracking
+                    else "Customer wants a refund for a damaged item"
+                ),
+                "sentiment": "frustrated",
+                "tracking_number": tracking[0] if tracking else None,
+                "tracking_numbers": tracking,
+                "order_id": order.group(1) if order else None,
+            }
+        elif kind == "DraftResponseOutput":
+            args = {
+                "subject": "Re: your support request",
+                "body": (
+                    "Dear customer,\n\nThank you for reaching out. We checked your "
+                    "order and here is what we can offer:\n"
+                    "- A full refund of the shipping cost\n"
+                    "- A 15% discount on your next order\n\n"
+                    "Best regards,\nCustomer Support Team"
+                ),
+            }
+        elif kind == "HtmlOutput":
+            args = {"html": "<p>Dear customer,</p><p>Thank you for reaching out.</p>"}
+        else:
+            return ChatResult(generations=[ChatGeneration(message=self._analyze(prompt))])
+
+        message = AIMessage(
+            content="", tool_calls=[{"name": kind, "args": args, "id": f"call-{kind}"}]
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    @staticmethod
+    def _analyze(prompt: str) -> AIMessage:
+        tracking_number = _field(prompt, "TRACKING NUMBER")
+        tool_calls = []
+        if tracking_number and _field(prompt, "Tracking Data") is None:
+            numbers = [tn.strip() for tn in tracking_number.split(",")]
+            tool_calls.append(
+                {
+                    "name": "fetch_tracking_data_batch",
+                    "args": {"tracking_numbers": numbers},
+                    "id": "call-tracking",
+                }
+                if len(numbers) > 1
+                else {
+                    "name": "fetch_tracking_data",
+                    "args": {"tracking_number": tracking_number},
+                    "id": "call-tracking",
+                }
+            )
+        if _field(prompt, "Policy Data") is None:
+            tool_calls.append(
+                {
+                    "name": "search_policy",
+                    "args": {"query": _field(prompt, "PROBLEM") or "refund policy"},
+                    "id": "call-policy",
+                }
+            )
+        if tool_calls:
+            return AIMessage(content="", tool_calls=tool_calls)
+        return AIMessage(content="The package is late; offer a shipping refund.")
+
+
+class FakeEmbeddings:
+    """Hash-seeded vectors with a fixed per-call latency."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def embed_query(self, text: str) -> list[float]:
+        time.sleep(self.latency)
+        self.calls += 1
+        return self._vector(text)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    async def aembed(self, texts: list[str], input_type=None) -> list[list[float]]:
+        """CohereEmbeddings.aembed: one round trip for the whole batch."""
+        await asyncio.sleep(self.latency)
+        self.calls += 1
+        return [self._vector(text) for text in texts]
+
+    @staticmethod
+    def _vector(text: str) -> list[float]:
+        import numpy as np
+
+        seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "little")
+        return np.random.default_rng(seed).standard_normal(EMBEDDING_DIMENSIONS).tolist()
+
+
+def tracking_item(tracking_number: str) -> dict:
+    """A DynamoDB-shaped item, including attributes the prompts never use."""
+    return {
+        "tracking_number": tracking_number,
+        "order_id": str(6000 + int(tracking_number[3:]) % 1000),
+        "status": "In Transit",
+        "carrier": "FedEx",
+        "location": "Distribution Center, New York, NY",
+        "last_update": "2025-09-01T15:00:00Z",
+        "estimated_delivery": "2025-09-08",
+        "days_in_transit": Decimal("6"),
+        "weight_kg": Decimal("1.25"),
+        "warehouse_code": "NYC-04",
+        "insurance_value": Decimal("120.50"),
+    }
+
+
+def load_mcp_server(index_path: str, embed_latency: float, db_latency: float):
+    """Import mcp-server/src under MCP_PACKAGE with stubbed Cohere and DynamoDB.
+
+    Policy search runs on the real local vector index, and tracking lookups on
+    the real batcher and cache; only the network calls behind them are faked.
+    """
+    package = types.ModuleType(MCP_PACKAGE)
+    package.__path__ = [str(MCP_SERVER_SRC)]
+    sys.modules[MCP_PACKAGE] = package
+
+    config = importlib.import_module(f"{MCP_PACKAGE}.config")
+    config.Settings.VECTOR_BACKEND = "local"
+    config.Settings.LOCAL_INDEX_PATH = index_path
+    config.Settings.KB_SEARCH_MODE = "vector"
+    build_policy_index(index_path)
+
+    server = importlib.import_module(f"{MCP_PACKAGE}.server")
+    kb_service = server.kb_service
+    kb_service.embeddings = FakeEmbeddings(embed_latency)
+
+    tracking_service = server.tracking_service
+
+    def batch_get_items(tracking_numbers):
+        # Like BatchGetItem, keys with no item (e.g. the warm-up probe) are
+        # simply absent from the response
+        time.sleep(db_latency)
+        return {
+            tn: tracking_item(tn) for tn in tracking_numbers if TRACKING_RE.fullmatch(tn)
+        }
+
+    tracking_service.batch_get_items = batch_get_items
+    return server
+
+
+def build_policy_index(path: str, chunks: int = 60):
+    vector_index = importlib.import_module(f"{MCP_PACKAGE}.services.vector_index")
+    texts = [
+        f"Policy section {i}: late deliveries over {i % 7 + 1} days qualify for a "
+        f"shipping refund.\nDamaged items may be returned within {i % 30 + 1} days."
+        for i in range(chunks)
+    ]
+    embeddings = FakeEmbeddings().embed_documents(texts)
+    vector_index.LocalVectorIndex.build(path, embeddings, texts)
+
+
+def raw_message(subject: str, body: str, from_email: str) -> str:
+    msg = MIMEText(body)
+    msg["Subject"] = subject
+    msg["From"] = from_email
+    msg["To"] = "support@example.com"
+    return base64.urlsafe_b64encode(msg.as_bytes()).decode("ascii")
+
+
+class _Request:
+    def __init__(self, fn):
+        self._fn = fn
+
+    def execute(self, http=None):
+        return self._fn()
+
+
+class _Batch:
+    def __init__(self, gmail, callback):
+        self._gmail = gmail
+        self._callback = callback
+        self._requests = []
+
+    def add(self, request, request_id):
+        self._requests.append((request_id, request))
+
+    def execute(self, http=None):
+        # One round trip for the whole batch
+        time.sleep(self._gmail.latency)
+        for request_id, request in self._requests:
+            self._callback(request_id, request.execute(), None)
+
+
+class FakeGmailService:
+    """The slice of the Gmail API that email_processor uses."""
+
+    def __init__(self, latency: float = 0.02):
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._messages = {}
+        self._history = []
+        self.history_id = 1
+        self.calls = Counter()
+
+    def deliver(self, message_id: str, raw: str) -> int:
+        """Add a message to the inbox; returns its historyId."""
+        with self._lock:
+            self.history_id += 1
+            self._messages[message_id] = raw
+            self._history.append((self.history_id, message_id))
+            return self.history_id
+
+    def users(self):
+        return self
+
+    def history(self):
+        return types.SimpleNamespace(list=self._history_list)
+
+    def messages(self):
+        return types.SimpleNamespace(
+            get=self._get, list=self._list, batchModify=self._batch_modify
+        )
+
+    def new_batch_http_request(self, callback):
+        self.calls["batch"] += 1
+        return _Batch(self, callback)
+
+    def _history_list(self, userId, startHistoryId, historyTypes=None, pageToken=None):
+        def run():
+            time.sleep(self.latency)
+            self.calls["history.list"] += 1
+            with self._lock:
+                added = [
+                    {"messagesAdded": [{"message": {"id": message_id}}]}
+                    for history_id, message_id in self._history
+                    if history_id > int(startHistoryId)
+                ]
+                return {"history": added, "historyId": str(self.history_id)}
+
+        return _Request(run)
+
+    def _get(self, userId, id, format="raw"):
+        return _Request(lambda: {"id": id, "raw": self._messages[id]})
+
+    def _list(self, userId, labelIds=None, maxResults=None):
+        return _Request(lambda: {"messages": []})
+
+    def _batch_modify(self, userId, body):
+        def run():
+            time.sleep(self.latency)
+            self.calls["batchModify"] += 1
+
+        return _Request(run)
+
+
+class SMTPSink:
+    """Minimal SMTP server that records when each recipient's mail arrives."""
+
+    def __init__(self):
+        self.received = {}
+        self.arrived = asyncio.Event()
+        self.expected = 0
+        self._server = None
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        def reply(line: str):
+            writer.write(f"{line}\r\n".encode())
+
+        reply("220 sink ready")
+        recipients = []
+        try:
+            while line := await reader.readline():
+                command = line.decode(errors="replace").strip()
+                verb = command[:4].upper()
+                if verb in ("EHLO", "HELO"):
+                    reply("250 sink")
+                elif verb == "RCPT":
+                    recipients.append(command.split(":", 1)[1].strip(" <>"))
+                    reply("250 OK")
+                elif verb == "DATA":
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    await writer.drain()
+                    while (await reader.readline()) not in (b".\r\n", b".\n", b""):
+                        pass
+                    now = time.perf_counter()
+                    for recipient in recipients:
+                        self.received[recipient] = now
+                    recipients = []
+                    reply("250 OK")
+                    if len(self.received) >= self.expected:
+                        self.arrived.set()
+                elif verb == "QUIT":
+                    reply("221 Bye")
+                    await writer.drain()
+                    break
+                else:
+                    # MAIL, RSET, NOOP
+                    reply("250 OK")
+                await writer.drain()
+        finally:
+            writer.close()
@@ -0,0 +1,85 @@
+"""Compare the local HTML renderer with the HTML_CONVERTER_PROMPT LLM round trip.
+
+Run from langgraph-workflow/:
+
+    python -m benchmarks.html_render_bench
+    python -m benchmarks.html_render_bench --llm 5   # also time Gemini (needs GOOGLE_API_KEY)
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+SAMPLE_DRAFT = """Dear Sarah,
+
+Thank you for reaching out, and I'm sorry your order #6184 has not arrived yet.
+
+I checked tracking number TRK123456789: the package is **In Transit** with FedEx and was last scanned at our New York distribution center. It is now 3 days past the estimated delivery date of 2025-09-08.
+
+Under our late delivery policy, here is what we can offer:
+- A full refund of the shipping cost
+- A 15% discount code for your next order
+
+Next steps:
+1. Reply to this email to confirm which option you prefer
+2. We will process it within 24 hours
+
+Best regards,
+Customer Support Team
+"""
+
+
+def bench_template(iterations: int) -> list[float]:
+    from src.agent.html_renderer import render_email_html
+
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        render_email_html(SAMPLE_DRAFT)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+async def bench_llm(iterations: int) -> list[float]:
+    from src.agent.llm import llm
+    from src.agent.prompts import HTML_CONVERTER_PROMPT
+    from src.agent.state import HtmlOutput
+
+    chain = llm.with_structured_output(HtmlOutput)
+    prompt = HTML_CONVERTER_PROMPT.format(response_body=SAMPLE_DRAFT)
+
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await chain.ainvoke(prompt)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def report(name: str, timings: list[float]):
+    timings = sorted(timings)
+    p95 = timings[int(0.95 * (len(timings) - 1))]
+    print(
+        f"{name:<10} n={len(timings):<6} "
+        f"mean={statistics.mean(timings) * 1e3:10.3f} ms  "
+        f"p50={statistics.median(timings) * 1e3:10.3f} ms  "
+        f"p95={p95 * 1e3:10.3f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=10_000)
+    parser.add_argument(
+        "--llm", type=int, default=0, metavar="N", help="also time N LLM conversions"
+    )
+    args = parser.parse_args()
+
+    report("template", bench_template(args.iterations))
+    if args.llm:
+        report("llm", asyncio.run(bench_llm(args.llm)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Import-time budget for the API service, measured with ``python -X importtime``.
+
+Fails when importing the app takes longer than the budget, or when a module
+that should only load on first use (the knowledge base and Gemini stacks) is
+imported eagerly. Run from langgraph-workflow/:
+
+    python -m benchmarks.import_budget
+    python -m benchmarks.import_budget --budget-ms 1500 --top 20
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Loaded by /initialize-kb or the first LLM call, never by importing the app
+LAZY_MODULES = (
+    "langchain_google_genai",
+    "langchain_cohere",
+    "cohere",
+    "langchain_community",
+    "langchain_pinecone",
+    "pinecone",
+    "pypdf",
+    "src.agent.llm_cache",
+)
+
+
+def measure(module: str) -> list[tuple[int, int, int, str]]:
+    """(self_us, cumulative_us, depth, name) per module, in importtime order."""
+    env = {**os.environ, "PYTHONPATH": str(PROJECT_ROOT)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # column header
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((int(fields[0]), int(fields[1]), depth, name.strip()))
+    return rows
+
+
+def direct_imports(rows, module: str) -> list[tuple[int, str]]:
+    """(cumulative_us, name) of the modules ``module`` itself imported.
+
+    importtime prints children before their parent, so they are the depth-1
+    rows since the previous top-level row.
+    """
+    end = next(i for i, row in enumerate(rows) if row[2] == 0 and row[3] == module)
+    children = []
+    for _, cumulative, depth, name in reversed(rows[:end]):
+        if depth == 0:
+            break
+        if depth == 1:
+            children.append((cumulative, name))
+    return children
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="src.api.main")
+    parser.add_argument("--budget-ms", type=float, default=2500)
+    parser.add_argument(
+        "--runs", type=int, default=3, help="best of N runs, to ride out noise"
+    )
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    best = None
+    for _ in range(args.runs):
+        rows = measure(args.module)
+        total = next(
+            cum for _, cum, depth, name in rows if depth == 0 and name == args.module
+        )
+        if best is None or total < best[0]:
+            best = (total, rows)
+    total_us, rows = best
+
+    print(f"import {args.module}: {total_us / 1000:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    print("  slowest direct imports:")
+    for cum, name in sorted(direct_imports(rows, args.module), reverse=True)[: args.top]:
+        print(f"  {cum / 1000:9.1f} ms  {name}")
+
+    imported = {name for _, _, _, name in rows}
+    eager = [m for m in LAZY_MODULES if m in imported]
+
+    failed = False
+    if total_us / 1000 > args.budget_ms:
+        print(f"Over budget by {total_us / 1000 - args.budget_ms:.1f} ms")
+        failed = True
+    if eager:
+        print(f"Imported eagerly, should load on first use: {', '.join(eager)}")
+        failed = True
+    if not failed:
+        print("Within budget")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,18 @@
-from .nodes import parse_email, analyze_problem, draft_response
-from .workflow import start_agent_workflow
-from .state import SupportState, DraftResponseOutput
-from .llm import llm
-from .knowledge_base import kb
+import importlib
+
+# Exports are resolved on first access, so importing one submodule (say
+# src.agent.knowledge_base from the API routes) does not load the LLM, graph
+# and knowledge base stacks with it.
+_EXPORTS = {
+    "parse_email": ".nodes",
+    "analyze_problem": ".nodes",
+    "draft_response": ".nodes",
+    "start_agent_workflow": ".workflow",
+    "SupportState": ".state",
+    "DraftResponseOutput": ".state",
+    "llm": ".llm",
+    "kb": ".knowledge_base",
+}
 
 __all__ = [
     "parse_email",
@@ -13,3 +23,10 @@ __all__ = [
     "DraftResponseOutput",
     "llm",
 ]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
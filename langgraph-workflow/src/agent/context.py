@@ -0,0 +1,125 @@
+import json
+import logging
+from decimal import Decimal
+from langchain_core.prompts import PromptTemplate
+from ..config import Settings
+
+logger = logging.getLogger(__name__)
+
+# Tracking attributes the prompts actually reason about
+TRACKING_FIELDS = (
+    "tracking_number",
+    "order_id",
+    "status",
+    "carrier",
+    "location",
+    "last_update",
+    "estimated_delivery",
+    "days_in_transit",
+    "error",
+)
+
+# Per-node prompt sizes: node -> {"calls", "tokens", "trimmed"}
+prompt_stats = {}
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return str(value)
+
+
+def compact_json(value) -> str:
+    return json.dumps(value, separators=(",", ":"), default=_json_default)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token) without an API call."""
+    return (len(text) + 3) // 4
+
+
+def project_tracking(data: dict) -> dict:
+    return {key: data[key] for key in TRACKING_FIELDS if data.get(key) not in (None, "")}
+
+
+def dedupe_policy_chunks(text: str) -> str:
+    """Drop lines repeated across policy chunks.
+
+    The indexer splits with a 200 character overlap on line boundaries, so
+    adjacent chunks returned together repeat whole lines.
+    """
+    seen = set()
+    lines = []
+    for line in text.splitlines():
+        key = " ".join(line.split())
+        if key:
+            if key in seen:
+                continue
+            seen.add(key)
+        elif lines and not lines[-1]:
+            continue
+        lines.append(line.rstrip())
+    return "\n".join(lines).strip()
+
+
+def format_tool_result(tool_name: str, result) -> str:
+    """Serialize a tool result compactly for state and prompts."""
+    if tool_name == "fetch_tracking_data" and isinstance(result, dict):
+        return compact_json(project_tracking(result))
+    if tool_name == "fetch_tracking_data_batch" and isinstance(result, dict):
+        return compact_json(
+            {
+                tracking_number: project_tracking(data) if isinstance(data, dict) else data
+                for tracking_number, data in result.items()
+            }
+        )
+    if tool_name in ("search_policy", "search_policy_multi") and isinstance(result, str):
+        return dedupe_policy_chunks(result)
+    if isinstance(result, str):
+        return result
+    return compact_json(result)
+
+
+def _trim_to_tokens(text: str, max_tokens: int) -> str:
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind("\n", 0, max_chars)
+    return text[: cut if cut > 0 else max_chars].rstrip() + "\n[...]"
+
+
+def build_prompt(node: str, template: PromptTemplate, **values) -> str:
+    """Format ``template``, trimming policy_info to fit PROMPT_TOKEN_BUDGET.
+
+    Policy text is the only open-ended input, so it absorbs the cut. The
+    resulting token count is logged and recorded per node.
+    """
+    budget = Settings.PROMPT_TOKEN_BUDGET
+    trimmed = False
+
+    policy_info = values.get("policy_info")
+    if policy_info and policy_info != "None":
+        base_tokens = estimate_tokens(template.format(**{**values, "policy_info": ""}))
+        fitted = _trim_to_tokens(policy_info, max(budget - base_tokens, 0))
+        trimmed = fitted != policy_info
+        values["policy_info"] = fitted
+
+    prompt = template.format(**values)
+    record_prompt(node, prompt, trimmed)
+    return prompt
+
+
+def record_prompt(node: str, prompt: str, trimmed: bool = False):
+    tokens = estimate_tokens(prompt)
+    stats = prompt_stats.setdefault(node, {"calls": 0, "tokens": 0, "trimmed": 0})
+    stats["calls"] += 1
+    stats["tokens"] += tokens
+    stats["trimmed"] += trimmed
+    logger.debug("%s prompt: ~%d tokens%s", node, tokens, " (policy trimmed)" if trimmed else "")
+
+
+def prompt_token_stats() -> dict:
+    return {
+        node: {**stats, "avg_tokens": stats["tokens"] / stats["calls"]}
+        for node, stats in prompt_stats.items()
+    }
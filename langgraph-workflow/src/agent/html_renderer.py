@@ -0,0 +1,111 @@
+import html
+import re
+from itertools import groupby
+from string import Template
+
+# Templates are parsed once at import; rendering is plain substitution.
+EMAIL_TEMPLATE = Template(
+    """<!DOCTYPE html>
+<html>
+<body style="margin:0;padding:0;background-color:#f4f5f7;">
+<div style="max-width:600px;margin:0 auto;padding:24px;background-color:#ffffff;font-family:Arial,Helvetica,sans-serif;font-size:15px;line-height:1.6;color:#1f2933;">
+$content
+</div>
+</body>
+</html>"""
+)
+PARAGRAPH_TEMPLATE = Template('<p style="margin:0 0 16px 0;">$text</p>')
+LIST_TEMPLATE = Template('<$tag style="margin:0 0 16px 0;padding-left:24px;">$items</$tag>')
+LIST_ITEM_TEMPLATE = Template('<li style="margin:0 0 4px 0;">$text</li>')
+SIGNATURE_TEMPLATE = Template(
+    '<p style="margin:24px 0 0 0;color:#52606d;">$text</p>'
+)
+
+BULLET_RE = re.compile(r"^\s*[-*•]\s+(.*)$")
+NUMBERED_RE = re.compile(r"^\s*\d+[.)]\s+(.*)$")
+BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+SIGN_OFF_RE = re.compile(
+    r"^((best|kind|warm|warmest)\s+)?(regards|wishes)|sincerely|(many\s+)?thanks|"
+    r"thank\s+you|cheers|best|yours\s+(truly|sincerely)",
+    re.IGNORECASE,
+)
+
+
+def _inline(text: str) -> str:
+    """Escape text, then apply the light markdown we allow inline."""
+    return BOLD_RE.sub(r"<strong>\1</strong>", html.escape(text.strip()))
+
+
+def _render_list(lines: list[str], pattern: re.Pattern, tag: str) -> str:
+    items = "".join(
+        LIST_ITEM_TEMPLATE.substitute(text=_inline(pattern.match(line).group(1)))
+        for line in lines
+    )
+    return LIST_TEMPLATE.substitute(tag=tag, items=items)
+
+
+def _line_kind(line: str) -> str:
+    if BULLET_RE.match(line):
+        return "ul"
+    if NUMBERED_RE.match(line):
+        return "ol"
+    return "p"
+
+
+def _render_block(lines: list[str]) -> str:
+    """Render a block, splitting it into runs of text and list lines."""
+    parts = []
+    for kind, run in groupby(lines, key=_line_kind):
+        run = list(run)
+        if kind == "ul":
+            parts.append(_render_list(run, BULLET_RE, "ul"))
+        elif kind == "ol":
+            parts.append(_render_list(run, NUMBERED_RE, "ol"))
+        else:
+            parts.append(
+                PARAGRAPH_TEMPLATE.substitute(
+                    text="<br>".join(_inline(line) for line in run)
+                )
+            )
+    return "\n".join(parts)
+
+
+def _split_blocks(text: str) -> list[list[str]]:
+    blocks, current = [], []
+    for line in text.replace("\r\n", "\n").split("\n"):
+        if line.strip():
+            current.append(line)
+        elif current:
+            blocks.append(current)
+            current = []
+    if current:
+        blocks.append(current)
+    return blocks
+
+
+def render_email_html(body: str) -> str:
+    """Render a plain-text / light-markdown email draft as branded HTML.
+
+    Blank lines separate paragraphs, ``-``/``*`` and ``1.`` lines become lists,
+    ``**text**`` becomes bold, and everything from the sign-off line onwards
+    is rendered as the signature. All text is HTML-escaped.
+    """
+    blocks = _split_blocks(body or "")
+
+    # The sign-off ("Best regards,") opens one of the last two blocks
+    signature = []
+    for i in range(len(blocks) - 1, max(len(blocks) - 3, -1), -1):
+        if SIGN_OFF_RE.fullmatch(blocks[i][0].strip().rstrip(",!.")):
+            signature = [line for block in blocks[i:] for line in block]
+            blocks = blocks[:i]
+            break
+
+    parts = [_render_block(block) for block in blocks]
+    if signature:
+        parts.append(
+            SIGNATURE_TEMPLATE.substitute(
+                text="<br>".join(_inline(line) for line in signature)
+            )
+        )
+
+    return EMAIL_TEMPLATE.substitute(content="\n".join(parts))
@@ -1,30 +1,218 @@
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_pinecone import PineconeVectorStore
-from langchain_cohere import CohereEmbeddings
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import httpx
+from ..config import Settings
+from ..utils.metrics import metrics
+
+# Cohere accepts up to 96 texts per embed call
+EMBED_BATCH_SIZE = 96
+UPSERT_BATCH_SIZE = 100
+DELETE_BATCH_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def _load_and_split(pdf_path: str) -> list[tuple[str, dict]]:
+    """Parse and chunk one PDF. Runs in a worker process."""
+    from langchain_community.document_loaders import PyPDFLoader
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    documents = PyPDFLoader(pdf_path).load()
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+    return [
+        (doc.page_content, {"source": Path(pdf_path).name, "page": doc.metadata.get("page", 0)})
+        for doc in text_splitter.split_documents(documents)
+    ]
+
+
+def chunk_id(text: str, metadata: dict) -> str:
+    """Content-addressed vector id: unchanged chunks keep their id across runs."""
+    return hashlib.sha256(f"{metadata['source']}\n{text}".encode()).hexdigest()
+
+
+class IndexingJob:
+    """Progress of one knowledge base indexing run."""
+
+    def __init__(self):
+        self.status = "pending"
+        self.phase = None
+        self.documents = 0
+        self.chunks = 0
+        self.unchanged = 0
+        self.to_embed = 0
+        self.embedded = 0
+        self.upserted = 0
+        self.deleted = 0
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
 
 
 class KnowledgeBase:
-    def __init__(self, pdf_path: str, index_name: str = "support-kb"):
-        self.pdf_path = pdf_path
+    """Indexes the policy documents into Pinecone.
+
+    Only /initialize-kb needs the PDF, Cohere and Pinecone clients, so they
+    are imported on first use instead of in every worker.
+    """
+
+    def __init__(self, source_path: str, index_name: str = "support-kb"):
+        self.source_path = source_path
         self.index_name = index_name
-        self.vectorstore = None
-        self.embeddings = CohereEmbeddings(model="embed-english-light-v3.0")
+        self.current_job = None
+        self._task = None
+        self._embeddings = None
 
-    def load_and_index(self):
-        """Load PDF and create Pinecone vector index"""
-        loader = PyPDFLoader(self.pdf_path)
-        documents = loader.load()
+    @property
+    def embeddings(self):
+        if self._embeddings is None:
+            from langchain_cohere import CohereEmbeddings
 
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000, chunk_overlap=200
-        )
-        splits = text_splitter.split_documents(documents)
+            self._embeddings = CohereEmbeddings(model="embed-english-light-v3.0")
+        return self._embeddings
+
+    def start_indexing(self) -> IndexingJob:
+        """Start a background indexing run unless one is already in progress."""
+        if self._task is None or self._task.done():
+            self.current_job = IndexingJob()
+            self._task = asyncio.create_task(self.load_and_index(self.current_job))
+        return self.current_job
+
+    async def load_and_index(self, job: IndexingJob | None = None) -> IndexingJob:
+        """Incrementally sync the source documents into the Pinecone index.
 
-        self.vectorstore = PineconeVectorStore.from_documents(
-            splits, self.embeddings, index_name=self.index_name
+        The index itself records what is already indexed: only chunks whose
+        content hash is not among its vector ids are embedded and upserted,
+        and every other id is deleted, including vectors from older runs that
+        used random ids. A re-run over unchanged documents makes no embedding
+        calls.
+        """
+        job = job or IndexingJob()
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.phase = "parsing"
+            chunks = await self._parse_documents(job)
+
+            from pinecone import Pinecone
+
+            index = Pinecone().Index(self.index_name)
+            indexed = await asyncio.to_thread(self._indexed_ids, index)
+            new_ids = [cid for cid in chunks if cid not in indexed]
+            stale_ids = [cid for cid in indexed if cid not in chunks]
+            job.chunks = len(chunks)
+            job.unchanged = len(chunks) - len(new_ids)
+            job.to_embed = len(new_ids)
+
+            job.phase = "embedding"
+            await self._embed_and_upsert(index, chunks, new_ids, job)
+
+            job.phase = "deleting"
+            for i in range(0, len(stale_ids), DELETE_BATCH_SIZE):
+                batch = stale_ids[i : i + DELETE_BATCH_SIZE]
+                with metrics.span("pinecone_call", op="delete"):
+                    await asyncio.to_thread(index.delete, ids=batch)
+                job.deleted += len(batch)
+
+            if new_ids or stale_ids:
+                await invalidate_search_cache()
+            job.status = "succeeded"
+        except Exception as e:
+            logger.exception("Knowledge base indexing failed: %s", e)
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.phase = None
+            job.finished_at = time.time()
+        return job
+
+    def _source_files(self) -> list[str]:
+        source = Path(self.source_path)
+        if source.is_dir():
+            return [str(p) for p in sorted(source.glob("*.pdf"))]
+        return [str(source)]
+
+    async def _parse_documents(self, job: IndexingJob) -> dict:
+        files = self._source_files()
+        job.documents = len(files)
+
+        loop = asyncio.get_running_loop()
+        # Forking the threaded server process can copy held locks into the
+        # children; spawned workers start clean
+        with ProcessPoolExecutor(
+            max_workers=Settings.KB_PARSE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            parsed = await asyncio.gather(
+                *(loop.run_in_executor(pool, _load_and_split, f) for f in files)
+            )
+
+        chunks = {}
+        for file_chunks in parsed:
+            for text, metadata in file_chunks:
+                chunks[chunk_id(text, metadata)] = (text, metadata)
+        return chunks
+
+    async def _embed_and_upsert(self, index, chunks: dict, ids: list[str], job: IndexingJob):
+        semaphore = asyncio.Semaphore(Settings.KB_EMBED_CONCURRENCY)
+
+        async def process(batch_ids):
+            async with semaphore:
+                texts = [chunks[cid][0] for cid in batch_ids]
+                with metrics.span("embedding_call", op="embed_documents"):
+                    vectors = await self.embeddings.aembed_documents(texts)
+                job.embedded += len(batch_ids)
+
+                records = [
+                    {
+                        "id": cid,
+                        "values": vector,
+                        "metadata": {**chunks[cid][1], "text": chunks[cid][0]},
+                    }
+                    for cid, vector in zip(batch_ids, vectors)
+                ]
+                for i in range(0, len(records), UPSERT_BATCH_SIZE):
+                    with metrics.span("pinecone_call", op="upsert"):
+                        await asyncio.to_thread(
+                            index.upsert, vectors=records[i : i + UPSERT_BATCH_SIZE]
+                        )
+                job.upserted += len(batch_ids)
+
+        await asyncio.gather(
+            *(
+                process(ids[i : i + EMBED_BATCH_SIZE])
+                for i in range(0, len(ids), EMBED_BATCH_SIZE)
+            )
         )
 
+    @staticmethod
+    def _indexed_ids(index) -> set[str]:
+        ids = set()
+        with metrics.span("pinecone_call", op="list"):
+            for page in index.list():
+                ids.update(page)
+        return ids
+
+
+async def invalidate_search_cache():
+    """Tell the MCP server its cached policy search results are stale."""
+    try:
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                f"{Settings.MCP_SERVER_BASE_URL}/cache/invalidate",
+                headers={"X-Admin-Token": Settings.MCP_ADMIN_TOKEN or ""},
+            )
+            response.raise_for_status()
+    except Exception as e:
+        logger.warning("Failed to invalidate MCP search cache: %s", e)
+
 
 # Global instance
-kb = KnowledgeBase("../resources/CompanySupportPolicyandKnowledgeBase.pdf")
+kb = KnowledgeBase(Settings.KB_SOURCE_PATH)
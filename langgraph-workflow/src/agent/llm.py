@@ -1,12 +1,51 @@
+import functools
 import os
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
+from ..config import Settings
+
+if TYPE_CHECKING:
+    from .llm_cache import SQLiteLLMCache
 
 load_dotenv(override=True)
 
-# Initialize LLM once
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    api_key=os.getenv("GOOGLE_API_KEY"),
-    temperature=0,
-)
+
+@functools.cache
+def get_llm_cache() -> "SQLiteLLMCache | None":
+    # Responses are deterministic at temperature=0, so retried, redelivered and
+    # forwarded emails are answered from disk
+    if not Settings.LLM_CACHE_ENABLED:
+        return None
+    from .llm_cache import SQLiteLLMCache
+
+    return SQLiteLLMCache(
+        Settings.LLM_CACHE_PATH,
+        max_bytes=Settings.LLM_CACHE_MAX_BYTES,
+        ttl=Settings.LLM_CACHE_TTL,
+    )
+
+
+@functools.cache
+def get_llm():
+    """The shared Gemini client, created on first use.
+
+    langchain_google_genai loads the google-ai and gRPC stack, so it is
+    imported here rather than with this module.
+    """
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(
+        model="gemini-2.5-flash",
+        api_key=os.getenv("GOOGLE_API_KEY"),
+        temperature=0,
+        cache=get_llm_cache(),
+    )
+
+
+def __getattr__(name):
+    # ``from .llm import llm`` keeps working without building the client at import
+    if name == "llm":
+        return get_llm()
+    if name == "llm_cache":
+        return get_llm_cache()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
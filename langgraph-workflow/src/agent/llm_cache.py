@@ -0,0 +1,132 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteLLMCache(BaseCache):
+    """Content-addressed LLM response cache on disk.
+
+    Entries are keyed by a hash of LangChain's llm_string (model, temperature,
+    bound tools or structured output schema) and the serialized prompt, so
+    ``with_structured_output`` and ``bind_tools`` variants never collide.
+    Entries expire after ``ttl`` seconds and the least recently used ones are
+    evicted once the stored responses exceed ``max_bytes``.
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl: float):
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS llm_cache_last_used ON llm_cache (last_used)"
+        )
+        self._db.execute(
+            "DELETE FROM llm_cache WHERE created_at <= ?", (time.time() - ttl,)
+        )
+        self._size = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM llm_cache"
+        ).fetchone()[0]
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode()).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now - self._ttl:
+                self.misses += 1
+                return None
+            self._db.execute(
+                "UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+
+        try:
+            return loads(row[0])
+        except Exception as e:
+            logger.warning("Discarding unreadable LLM cache entry: %s", e)
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = self._key(prompt, llm_string)
+        value = dumps(return_val)
+        size = len(value)
+        now = time.time()
+        with self._lock:
+            previous = self._db.execute(
+                "SELECT size FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._size += size - (previous[0] if previous else 0)
+            self._evict()
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones. Caller holds the lock."""
+        if self._size <= self._max_bytes:
+            return
+        self._db.execute(
+            "DELETE FROM llm_cache WHERE created_at <= ?", (time.time() - self._ttl,)
+        )
+        rows = self._db.execute(
+            "SELECT key, size FROM llm_cache ORDER BY last_used"
+        ).fetchall()
+        size = sum(s for _, s in rows)
+        victims = []
+        for key, entry_size in rows:
+            if size <= self._max_bytes:
+                break
+            victims.append((key,))
+            size -= entry_size
+        self._db.executemany("DELETE FROM llm_cache WHERE key = ?", victims)
+        self.evictions += len(victims)
+        self._size = size
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM llm_cache")
+            self._size = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": self._size,
+            "max_bytes": self._max_bytes,
+            "evictions": self.evictions,
+        }
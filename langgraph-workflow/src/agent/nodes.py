@@ -1,18 +1,22 @@
-import smtplib
-import os
+import logging
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from .state import SupportState, EmailParseOutput, DraftResponseOutput, HtmlOutput
-from .llm import llm
+from .llm import get_llm
+from .html_renderer import render_email_html
+from .context import build_prompt, compact_json, record_prompt
 from .prompts import (
     PARSE_EMAIL_PROMPT,
     ANALYZE_PROBLEM_PROMPT,
     DRAFT_RESPONSE_PROMPT,
     HTML_CONVERTER_PROMPT,
 )
-from langchain_core.messages import ToolMessage
-from pprint import pprint
+from langchain_core.messages import AIMessage, ToolMessage
 from datetime import datetime, timezone
+from ..config import Settings
+from ..utils.mail_sender import mail_sender
+
+logger = logging.getLogger(__name__)
 
 # This will be set by the workflow when MCP tools are loaded
 llm_with_tools = None
@@ -22,104 +26,155 @@ todays_date = datetime.now(timezone.utc).date().isoformat()
 def set_llm_with_tools(tools):
     """Set the LLM with tools after MCP tools are loaded."""
     global llm_with_tools
-    llm_with_tools = llm.bind_tools(tools)
+    llm_with_tools = get_llm().bind_tools(tools)
 
 
-def parse_email(state: SupportState) -> SupportState:
+async def parse_email(state: SupportState) -> SupportState:
     """Extract structured information from customer email."""
     try:
-        print("Inside Node: parse_email")
+        logger.debug("Inside Node: parse_email")
         prompt = PARSE_EMAIL_PROMPT.format(
             subject=state["subject"], email_body=state["email_body"]
         )
-        response = llm.with_structured_output(EmailParseOutput).invoke(prompt)
-
+        record_prompt("parse_email", prompt)
+        response = await get_llm().with_structured_output(EmailParseOutput).ainvoke(prompt)
+
+        tracking_numbers = list(
+            dict.fromkeys(
+                tn
+                for tn in [response.tracking_number, *(response.tracking_numbers or [])]
+                if tn
+            )
+        )
         return {
             **state,
             "problem": response.problem,
             "sentiment": response.sentiment,
-            "tracking_number": response.tracking_number,
+            "tracking_number": tracking_numbers[0] if tracking_numbers else None,
+            "tracking_numbers": tracking_numbers,
             "order_id": response.order_id,
         }
     except Exception as e:
-        print(f"parse_email error: {e}")
+        logger.exception("parse_email error: %s", e)
         return state
 
 
-def analyze_problem(state: SupportState):
+async def analyze_problem(state: SupportState):
     """The brain of the operation. Decides the next step based on the parsed email and available data."""
-    print("Inside Node: analyze_problem")
+    logger.debug("Inside Node: analyze_problem")
 
     if llm_with_tools is None:
         raise RuntimeError(
             "LLM with tools not initialized. Call set_llm_with_tools() first."
         )
 
-    pprint(
-        {
-            "problem": state["problem"],
-            "sentiment": state["sentiment"],
-            "tracking_number": state["tracking_number"],
-            "tracking_data": state.get("tracking_data", "None"),
-            "order_id": state.get("order_id", "None"),
-            "todays_date": todays_date,
-        }
-    )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "analyze_problem input: %s",
+            {
+                "problem": state["problem"],
+                "sentiment": state["sentiment"],
+                "tracking_number": state["tracking_number"],
+                "tracking_data": state.get("tracking_data", "None"),
+                "order_id": state.get("order_id", "None"),
+                "todays_date": todays_date,
+            },
+        )
 
-    prompt = ANALYZE_PROBLEM_PROMPT.format(
+    tracking_numbers = ", ".join(state.get("tracking_numbers") or []) or state["tracking_number"]
+    prompt = build_prompt(
+        "analyze_problem",
+        ANALYZE_PROBLEM_PROMPT,
         problem=state["problem"],
         sentiment=state["sentiment"],
-        tracking_number=state["tracking_number"],
+        tracking_number=tracking_numbers,
         tracking_data=state.get("tracking_data", "None"),
         policy_info=state.get("policy_info", "None"),
         order_id=state.get("order_id", "None"),
         todays_date=todays_date,
     )
 
-    response = llm_with_tools.invoke(prompt)
+    response = await llm_with_tools.ainvoke(prompt)
 
-    print("LLM response", response)
+    logger.debug("LLM response %s", response)
 
-    return {**state, "messages": state.get("messages", []) + [response]}
+    return {
+        **state,
+        "messages": state.get("messages", []) + [response],
+        "agent_turns": state.get("agent_turns", 0) + 1,
+    }
+
+
+# State field each tool's result is stored in
+TOOL_STATE_FIELDS = {
+    "fetch_tracking_data": "tracking_data",
+    "fetch_tracking_data_batch": "tracking_data",
+    "search_policy": "policy_info",
+    "search_policy_multi": "policy_info",
+}
 
 
 def handle_tool_result(state: SupportState) -> SupportState:
     """Extract tool results and save to appropriate state fields."""
-    print("Inside Node: handle_tool_result")
+    logger.debug("Inside Node: handle_tool_result")
+
+    updates = {}
+
+    # A single turn may produce several tool results; walk back to the AIMessage
+    # that requested them.
+    for message in reversed(state["messages"]):
+        if not isinstance(message, ToolMessage):
+            if isinstance(message, AIMessage) and message.tool_calls:
+                break
+            continue
 
-    last_message = state["messages"][-1]
+        field = TOOL_STATE_FIELDS.get(message.name)
+        if field:
+            updates.setdefault(field, message.content)
 
-    # print(last_message)
+    return {**state, **updates}
 
-    if isinstance(last_message, ToolMessage):
-        tool_name = last_message.name
 
-        if tool_name == "fetch_tracking_data":
-            return {**state, "tracking_data": last_message.content}
-        elif tool_name == "search_policy":
-            return {**state, "policy_info": last_message.content}
+def _analysis(last_message) -> str:
+    """The agent's final analysis, or a note on why there is none.
 
-    return state
+    When the run hits MAX_AGENT_TURNS the last message is a tool-call turn
+    with no text, so the draft is told to work from the gathered data.
+    """
+    tool_calls = getattr(last_message, "tool_calls", None)
+    if isinstance(last_message, AIMessage) and tool_calls:
+        pending = ", ".join(
+            f"{call['name']}({compact_json(call['args'])})" for call in tool_calls
+        )
+        return (
+            "The agent reached its turn limit before finishing its analysis; it "
+            f"still wanted to call {pending}. Base the reply on the tracking data "
+            "and policy information above, and say plainly what could not be "
+            "confirmed."
+        )
+    return last_message.content or "None"
 
 
-def draft_response(state: SupportState) -> SupportState:
+async def draft_response(state: SupportState) -> SupportState:
     """Generate professional email response based on problem analysis and available data."""
-    print("Inside Node: draft_response")
+    logger.debug("Inside Node: draft_response")
 
     messages = state["messages"]
     last_message = messages[-1]
 
-    prompt = DRAFT_RESPONSE_PROMPT.format(
+    prompt = build_prompt(
+        "draft_response",
+        DRAFT_RESPONSE_PROMPT,
         problem=state["problem"],
         sentiment=state["sentiment"],
         from_email=state["from_email"],
         order_id=state.get("order_id", "None"),
-        tracking_data=state.get("shipping_data", "None"),
+        tracking_data=state.get("tracking_data", "None"),
         policy_info=state.get("policy_info", "None"),
         todays_date=todays_date,
-        analysis=last_message.content,
+        analysis=_analysis(last_message),
     )
-    response = llm.with_structured_output(DraftResponseOutput).invoke(prompt)
+    response = await get_llm().with_structured_output(DraftResponseOutput).ainvoke(prompt)
 
     return {
         **state,
@@ -128,24 +183,24 @@ def draft_response(state: SupportState) -> SupportState:
     }
 
 
-def format_to_html_and_send(state: SupportState) -> SupportState:
-    """Convert email response to HTML format and prepare for sending."""
-    print("Inside Node: format_to_html_and_send")
+async def format_to_html_and_send(state: SupportState) -> SupportState:
+    """Convert email response to HTML format and queue it for sending."""
+    logger.debug("Inside Node: format_to_html_and_send")
 
-    prompt = HTML_CONVERTER_PROMPT.format(response_body=state["response_body"])
-    response = llm.with_structured_output(HtmlOutput).invoke(prompt)
+    if Settings.HTML_RENDERER == "llm":
+        prompt = HTML_CONVERTER_PROMPT.format(response_body=state["response_body"])
+        response = await get_llm().with_structured_output(HtmlOutput).ainvoke(prompt)
+        body = response.html
+    else:
+        body = render_email_html(state["response_body"])
 
     subject = state["response_subject"]
     to_email = state["from_email"]
-    body = response.html
-
-    gmail_app_password = os.getenv("GMAIL_APP_PASSWORD")
-    from_email = os.getenv("GMAIL_USER")
 
     # Create a multipart message
     msg = MIMEMultipart("alternative")
     msg["Subject"] = subject
-    msg["From"] = from_email
+    msg["From"] = Settings.GMAIL_USER
     msg["To"] = to_email
 
     # Attach the body (HTML)
@@ -153,11 +208,9 @@ def format_to_html_and_send(state: SupportState) -> SupportState:
     msg.attach(html_part)
 
     try:
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
-            server.starttls()
-            server.login(from_email, gmail_app_password)
-            server.send_message(msg)
+        # Delivery happens on the mail sender's pooled connections
+        await mail_sender.enqueue(msg)
         return {**state, "response_html_body": body}
     except Exception as e:
-        print(str(e))
+        logger.error("Failed to queue reply to %s: %s", to_email, e)
         return state
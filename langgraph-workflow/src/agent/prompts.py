@@ -1,4 +1,4 @@
-from langchain.prompts import PromptTemplate
+from langchain_core.prompts import PromptTemplate
 
 PARSE_EMAIL_PROMPT = PromptTemplate(
     input_variables=["subject", "email_body"],
@@ -6,7 +6,8 @@ PARSE_EMAIL_PROMPT = PromptTemplate(
 You are a customer support AI. Extract the following information from the customer's email:
 - The core problem: one sentence summary.
 - The customer's sentiment: angry, frustrated, calm, etc.
-- Any order ID or tracking number present in the email.
+- Any order ID or tracking numbers present in the email. List every tracking number;
+  tracking_number is the first one.
 
 Subject: {subject}
 Email: {email_body}
@@ -40,10 +41,14 @@ DECISION RULES:
 2. For other issues: Determine if you need tracking data, policy data, or both
 3. Only proceed without tools if you have ALL necessary information to resolve the issue
 4. Carefully review the tracking data if available, before calling 'fetch_tracking_data' tool
+5. With several tracking numbers, make ONE 'fetch_tracking_data_batch' call with all of them
+6. With several unrelated policy questions, make ONE 'search_policy_multi' call with all of them
 
 Available tools:
 - 'fetch_tracking_data': Get tracking status and delivery info, Tracking number is required
+- 'fetch_tracking_data_batch': Tracking data for a list of tracking numbers in one call
 - 'search_policy': Get company policies for refunds, returns, etc.
+- 'search_policy_multi': Company policies for a list of questions in one call
 
 Make your decision based on whether you can resolve the customer's issue with current data.
 """,
@@ -0,0 +1,239 @@
+import asyncio
+import logging
+from mcp import types
+from mcp.shared.exceptions import McpError
+
+from .client import MCPClient
+from .nodes import set_llm_with_tools
+from .state import SupportState
+from .tracing import metrics_callback
+from .workflow import build_workflow, prefetch_outcome, save_workflow_graph
+from ..config import Settings
+from ..utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class WorkflowRuntime:
+    """App-lifetime holder for the warm MCP session, bound tools and compiled graph.
+
+    The MCP session is owned by a dedicated background task so it can be torn
+    down and re-opened from any workflow task when the connection drops.
+    """
+
+    def __init__(self, server_url: str):
+        self._server_url = server_url
+        self._client = None
+        self._session_task = None
+        self._session_stop = None
+        self._connect_lock = asyncio.Lock()
+        self.tools = []
+        self.tools_by_name = {}
+        self.app = None
+        self.active_runs = 0
+        self.peak_active_runs = 0
+        self.completed_runs = 0
+        self.prefetched_runs = 0
+        self.llm_turns_saved = 0
+        self.redundant_tool_calls = 0
+        self.agent_turns = {}
+        self.capped_runs = 0
+        self.memo_hits = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._client is not None
+
+    async def start(self):
+        """Compile the graph and open the MCP session."""
+        self.app = build_workflow(self)
+        try:
+            await self.ensure_connected()
+        except Exception as e:
+            # The session is re-opened on demand by the first workflow run
+            logger.warning("MCP server unavailable at startup: %s", e)
+
+    async def stop(self):
+        await self._close_session()
+
+    async def ensure_connected(self) -> MCPClient:
+        client = self._client
+        if client is not None:
+            return client
+
+        async with self._connect_lock:
+            if self._client is None:
+                await self._open_session()
+            return self._client
+
+    async def reconnect(self, stale_client=None):
+        """Replace the session, unless another task already did."""
+        async with self._connect_lock:
+            if self._client is not None and self._client is not stale_client:
+                return self._client
+            await self._close_session()
+            await self._open_session()
+            return self._client
+
+    async def call_tool(
+        self, tool_name: str, tool_input: dict
+    ) -> types.CallToolResult | None:
+        with metrics.span("mcp_tool_call", tool=tool_name):
+            client = await self.ensure_connected()
+            try:
+                return await client.call_tool(tool_name, tool_input)
+            except McpError:
+                raise
+            except Exception as e:
+                logger.warning("MCP session dropped during %s, reconnecting: %s", tool_name, e)
+                client = await self.reconnect(client)
+                return await client.call_tool(tool_name, tool_input)
+
+    async def run(self, subject: str, body: str, from_email: str):
+        await self.ensure_connected()
+
+        initial_state = SupportState(
+            email_body=body, subject=subject, from_email=from_email
+        )
+        self.active_runs += 1
+        self.peak_active_runs = max(self.peak_active_runs, self.active_runs)
+        try:
+            with metrics.span("workflow_run"):
+                result = await self.app.ainvoke(
+                    initial_state, config={"callbacks": [metrics_callback]}
+                )
+            self._record_prefetch(result)
+            self._record_agent_loop(result)
+            return result
+        finally:
+            self.active_runs -= 1
+            self.completed_runs += 1
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "active_runs": self.active_runs,
+            "peak_active_runs": self.peak_active_runs,
+            "completed_runs": self.completed_runs,
+            "agent_loop": {
+                "max_turns": Settings.MAX_AGENT_TURNS,
+                "turns_per_run": dict(sorted(self.agent_turns.items())),
+                "capped_runs": self.capped_runs,
+                "memo_hits": self.memo_hits,
+            },
+            "prefetch": {
+                "runs": self.prefetched_runs,
+                "llm_turns_saved": self.llm_turns_saved,
+                "redundant_tool_calls": self.redundant_tool_calls,
+            },
+        }
+
+    def _record_agent_loop(self, result: dict):
+        turns = result.get("agent_turns", 0)
+        self.agent_turns[turns] = self.agent_turns.get(turns, 0) + 1
+        self.memo_hits += result.get("memo_hits") or 0
+        last_message = result["messages"][-1] if result.get("messages") else None
+        if getattr(last_message, "tool_calls", None):
+            self.capped_runs += 1
+        logger.info(
+            "Agent loop for %s: %s turns, %s memoized tool calls",
+            result["from_email"], turns, result.get("memo_hits") or 0,
+        )
+
+    def _record_prefetch(self, result: dict):
+        outcome = prefetch_outcome(result)
+        if outcome["prefetched"]:
+            self.prefetched_runs += 1
+            self.llm_turns_saved += outcome["llm_turns_saved"]
+            self.redundant_tool_calls += outcome["redundant_calls"]
+            logger.info("Prefetch outcome for %s: %s", result["from_email"], outcome)
+
+    async def render_graph(self, filename: str = Settings.WORKFLOW_GRAPH_PATH):
+        await save_workflow_graph(self.app, filename)
+
+    async def _open_session(self):
+        client = MCPClient(server_url=self._server_url)
+        ready = asyncio.get_running_loop().create_future()
+        stop = asyncio.Event()
+        task = asyncio.create_task(self._hold_session(client, ready, stop))
+
+        try:
+            await ready
+        except asyncio.CancelledError:
+            # The caller gave up; don't leave the transport open in the background
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            raise
+        except Exception:
+            await task
+            raise
+
+        try:
+            self.tools = await client.list_tools()
+        except BaseException:
+            stop.set()
+            await asyncio.gather(task, return_exceptions=True)
+            raise
+        self.tools_by_name = {tool.name: tool for tool in self.tools}
+        set_llm_with_tools(self.tools)
+        logger.info("Loaded %d MCP tools: %s", len(self.tools), list(self.tools_by_name))
+
+        self._client = client
+        self._session_task = task
+        self._session_stop = stop
+
+    async def _close_session(self):
+        task, stop = self._session_task, self._session_stop
+        self._client = None
+        self._session_task = None
+        self._session_stop = None
+
+        if task is not None:
+            stop.set()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _hold_session(self, client: MCPClient, ready, stop: asyncio.Event):
+        """Enter and exit the client's transport contexts from a single task."""
+        try:
+            async with client:
+                ready.set_result(client)
+                await stop.wait()
+        except asyncio.CancelledError:
+            if not ready.done():
+                ready.cancel()
+            raise
+        except BaseException as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.warning("MCP session closed unexpectedly: %s", e)
+        finally:
+            if self._client is client:
+                self._client = None
+
+
+_runtime = None
+_runtime_lock = asyncio.Lock()
+
+
+async def get_runtime() -> WorkflowRuntime:
+    """Return the process-wide runtime, starting one on first use."""
+    global _runtime
+    if _runtime is None:
+        async with _runtime_lock:
+            if _runtime is None:
+                runtime = WorkflowRuntime(server_url=Settings.MCP_SERVER_URL)
+                await runtime.start()
+                _runtime = runtime
+    return _runtime
+
+
+async def start_runtime() -> WorkflowRuntime:
+    return await get_runtime()
+
+
+async def stop_runtime():
+    global _runtime
+    if _runtime is not None:
+        await _runtime.stop()
+        _runtime = None
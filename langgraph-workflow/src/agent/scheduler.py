@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from ..config import Settings
+from ..utils.dedupe_index import get_dedupe_index
+
+logger = logging.getLogger(__name__)
+
+
+def _summary(samples) -> dict:
+    if not samples:
+        return {"avg_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+    return {
+        "avg_ms": sum(ordered) / len(ordered) * 1000,
+        "p95_ms": ordered[int(0.95 * (len(ordered) - 1))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+class WorkflowScheduler:
+    """Bounded queue of email workflows served by a fixed pool of workers.
+
+    Gmail ingestion runs in threadpool threads, so ``submit_threadsafe`` hands
+    work to the event loop and blocks while the queue is full. That
+    backpressure keeps a burst of email from overwhelming Gemini and the MCP
+    server.
+    """
+
+    def __init__(self, workers: int, max_queue: int, timeout: float):
+        self._workers = workers
+        self._timeout = timeout
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._loop = None
+        self._tasks = []
+        self.busy = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self._wait_times = deque(maxlen=1000)
+        self._run_times = deque(maxlen=1000)
+
+    def start(self):
+        if not self._tasks:
+            self._loop = asyncio.get_running_loop()
+            self._tasks = [
+                asyncio.create_task(self._worker()) for _ in range(self._workers)
+            ]
+
+    async def stop(self, timeout: float = 30.0):
+        """Let queued workflows finish for up to ``timeout`` seconds, then cancel."""
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Scheduler stopped with %d workflows queued", self._queue.qsize())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(
+        self,
+        subject: str,
+        body: str,
+        from_email: str,
+        message_id: str | None = None,
+        timeout: float | None = None,
+    ):
+        """Queue a workflow, waiting for space if the queue is full.
+
+        With ``timeout``, gives up after that many seconds and raises
+        TimeoutError; the workflow is then not queued.
+        """
+        self.start()
+        item = (subject, body, from_email, message_id, time.monotonic())
+        try:
+            await asyncio.wait_for(self._queue.put(item), timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise
+        self.submitted += 1
+
+    def submit_threadsafe(
+        self, subject: str, body: str, from_email: str, message_id: str | None = None
+    ):
+        """Queue a workflow from a non-event-loop thread.
+
+        Blocks for up to WORKFLOW_ENQUEUE_TIMEOUT seconds while the queue is
+        full, then raises TimeoutError so the caller can leave the email for
+        a later retry.
+        """
+        if self._loop is None:
+            raise RuntimeError("Workflow scheduler is not running")
+
+        # The timeout runs on the loop, so a put that wins the race still
+        # counts as queued instead of being reported as rejected
+        future = asyncio.run_coroutine_threadsafe(
+            self.submit(
+                subject, body, from_email, message_id,
+                timeout=Settings.WORKFLOW_ENQUEUE_TIMEOUT,
+            ),
+            self._loop,
+        )
+        future.result()
+
+    async def _worker(self):
+        # Import here to avoid circular imports
+        from .workflow import start_agent_workflow
+
+        while True:
+            subject, body, from_email, message_id, enqueued_at = await self._queue.get()
+            started = time.monotonic()
+            self._wait_times.append(started - enqueued_at)
+            self.busy += 1
+            succeeded = False
+            try:
+                if message_id:
+                    await asyncio.to_thread(get_dedupe_index().mark_in_progress, message_id)
+                await asyncio.wait_for(
+                    start_agent_workflow(subject, body, from_email), self._timeout
+                )
+                succeeded = True
+                self.completed += 1
+            except asyncio.TimeoutError:
+                self.timed_out += 1
+                logger.warning("Workflow for %s timed out after %ss", from_email, self._timeout)
+            except Exception:
+                # start_agent_workflow already reported the error
+                self.failed += 1
+            finally:
+                if message_id:
+                    # A failed run may be retried if Gmail hands the message back
+                    dedupe_index = get_dedupe_index()
+                    await asyncio.to_thread(
+                        dedupe_index.mark_done if succeeded else dedupe_index.release,
+                        message_id,
+                    )
+                self.busy -= 1
+                self._run_times.append(time.monotonic() - started)
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "max_queue": self._queue.maxsize,
+            "workers": self._workers,
+            "busy_workers": self.busy,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "wait_time": _summary(self._wait_times),
+            "run_time": _summary(self._run_times),
+        }
+
+
+# Global instance
+workflow_scheduler = WorkflowScheduler(
+    workers=Settings.WORKFLOW_WORKERS,
+    max_queue=Settings.WORKFLOW_QUEUE_SIZE,
+    timeout=Settings.WORKFLOW_TIMEOUT,
+)
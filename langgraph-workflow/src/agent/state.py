@@ -20,6 +20,9 @@ class SupportState(MessagesState):
     tracking_number: Optional[str] = Field(
         None, description="Package tracking number, if present"
     )
+    tracking_numbers: Optional[List[str]] = Field(
+        None, description="Every package tracking number in the email"
+    )
     order_id: Optional[str] = Field(None, description="Order ID, if present")
 
     tracking_data: Optional[Dict] = Field(
@@ -28,6 +31,18 @@ class SupportState(MessagesState):
     policy_info: Optional[str] = Field(
         None, description="Company policy information from knowledge base"
     )
+    prefetched: Optional[List[str]] = Field(
+        None, description="Tools whose results were prefetched before analyze_problem"
+    )
+    tool_memo: Optional[Dict[str, str]] = Field(
+        None, description="Tool results of this run keyed by tool and normalized args"
+    )
+    memo_hits: Optional[int] = Field(
+        None, description="Tool calls answered from tool_memo in this run"
+    )
+    agent_turns: Optional[int] = Field(
+        None, description="Number of analyze_problem turns taken in this run"
+    )
     resolution: Optional[Dict] = Field(
         None, description="Proposed resolution for the issue"
     )
@@ -54,6 +69,9 @@ class EmailParseOutput(BaseModel):
     tracking_number: Optional[str] = Field(
         None, description="Package tracking number, if present"
     )
+    tracking_numbers: Optional[List[str]] = Field(
+        None, description="Every package tracking number in the email"
+    )
     order_id: Optional[str] = Field(None, description="Order ID, if present")
 
 
@@ -8,7 +8,7 @@ logger = logging.getLogger(__name__)
 @tool
 async def fetch_tracking_data(tracking_number: str) -> dict:
     """Fetch tracking information from shipping API."""
-    print("Inside Tool: fetch_tracking_data")
+    logger.debug("Inside Tool: fetch_tracking_data")
     return {
         "tracking_number": tracking_number,
         "status": "In Transit",
@@ -24,7 +24,7 @@ async def fetch_tracking_data(tracking_number: str) -> dict:
 @tool
 async def search_policy(query: str) -> str:
     """Search company policy and knowledge base for relevant information."""
-    print("Inside Tool: search_policy")
+    logger.debug("Inside Tool: search_policy")
     async with httpx.AsyncClient() as client:
         response = await client.get(
             "http://localhost:8000/api/search-kb", params={"query": query}
@@ -0,0 +1,96 @@
+import logging
+import time
+from langchain_core.callbacks import BaseCallbackHandler
+from ..utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Times graph nodes and LLM calls and counts LLM tokens.
+
+    Attached to each workflow run, so every node and every model call made
+    inside one is recorded without touching the node functions.
+    """
+
+    # Called on the event loop instead of being dispatched to a thread
+    run_inline = True
+
+    def __init__(self):
+        self._started = {}
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        # Nested runnables inherit the node's metadata; only time the node itself
+        if node is not None and kwargs.get("name") == node:
+            self._started[run_id] = (time.perf_counter(), node)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish_node(run_id, "ok")
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._finish_node(run_id, "error")
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        metadata = metadata or {}
+        self._started[run_id] = (
+            time.perf_counter(),
+            metadata.get("ls_model_name", "unknown"),
+            metadata.get("langgraph_node", "none"),
+        )
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        began, model, node = started
+        elapsed = time.perf_counter() - began
+        metrics.observe(
+            "llm_call_seconds", elapsed, help="LLM call latency",
+            model=model, node=node, status="ok",
+        )
+
+        usage = {}
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None) or usage
+        input_tokens = usage.get("input_tokens", 0)
+        output_tokens = usage.get("output_tokens", 0)
+        for kind, count in (("input", input_tokens), ("output", output_tokens)):
+            if count:
+                metrics.inc(
+                    "llm_tokens_total", count, help="LLM tokens by direction",
+                    model=model, node=node, type=kind,
+                )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "llm %s in %s: %.1fms, %s input / %s output tokens",
+                model, node, elapsed * 1000, input_tokens, output_tokens,
+            )
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            began, model, node = started
+            metrics.observe(
+                "llm_call_seconds", time.perf_counter() - began, help="LLM call latency",
+                model=model, node=node, status="error",
+            )
+
+    def _finish_node(self, run_id, status: str):
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        began, node = started
+        elapsed = time.perf_counter() - began
+        metrics.observe(
+            "graph_node_seconds", elapsed, help="Workflow graph node latency",
+            node=node, status=status,
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("node %s: %.1fms %s", node, elapsed * 1000, status)
+
+
+# Global instance
+metrics_callback = MetricsCallbackHandler()
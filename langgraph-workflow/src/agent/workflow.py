@@ -1,27 +1,24 @@
 import asyncio
-from dotenv import load_dotenv
 import json
+import logging
 from functools import partial
 from mcp import types
-import os
 
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import AIMessage, ToolMessage
 from .state import SupportState
+from .context import compact_json, format_tool_result
 from .nodes import (
+    TOOL_STATE_FIELDS,
     parse_email,
     analyze_problem,
     handle_tool_result,
     draft_response,
     format_to_html_and_send,
-    set_llm_with_tools,
 )
-from .client import MCPClient
+from ..config import Settings
 
-
-load_dotenv(override=True)
-
-server_url = f"{os.getenv("MCP_SERVER_BASE_URL")}/mcp"
+logger = logging.getLogger(__name__)
 
 
 # Define router function to handle tool calls
@@ -38,6 +35,12 @@ def router(state):
         ) and last_message.additional_kwargs.get("tool_calls"):
             has_tool_calls = True
 
+    if has_tool_calls and state.get("agent_turns", 0) >= Settings.MAX_AGENT_TURNS:
+        logger.info(
+            "Agent reached %d turns, drafting with current data", Settings.MAX_AGENT_TURNS
+        )
+        return "end"
+
     return "tools" if has_tool_calls else "end"
 
 
@@ -56,7 +59,56 @@ def extract_tool_result(result: types.CallToolResult):
     return first
 
 
-async def async_tool_executor(state, client: MCPClient, tools):
+def _unpack_tool_call(tool_call):
+    # Handle different formats of tool_call
+    if isinstance(tool_call, dict):
+        tool_name = tool_call.get("name")
+        tool_args = tool_call.get("args", {})
+        tool_id = tool_call.get("id", "tool-call-id")
+    else:
+        tool_name = tool_call.name
+        tool_args = tool_call.args if hasattr(tool_call, "args") else {}
+        tool_id = getattr(tool_call, "id", "tool-call-id")
+    return tool_name, tool_args, tool_id
+
+
+async def _execute_tool_call(tool_call, runtime, semaphore: asyncio.Semaphore):
+    """Run one tool call with its own timeout and error capture."""
+    tool_name, tool_args, tool_id = _unpack_tool_call(tool_call)
+
+    logger.debug("Executing tool %s with %s", tool_name, tool_args)
+
+    if tool_name not in runtime.tools_by_name:
+        # Tool not found
+        tool_error = f"Error: {tool_name} is not a valid tool, try one of {list(runtime.tools_by_name)}."
+        return AIMessage(content=tool_error)
+
+    try:
+        async with semaphore:
+            result = await asyncio.wait_for(
+                runtime.call_tool(tool_name, tool_args),
+                timeout=Settings.TOOL_CALL_TIMEOUT,
+            )
+        extracted_result = extract_tool_result(result)
+
+        # Add tool result
+        return ToolMessage(
+            content=format_tool_result(tool_name, extracted_result),
+            tool_call_id=tool_id,
+            name=tool_name,
+        )
+    except asyncio.TimeoutError:
+        error_msg = f"Error: {tool_name} timed out after {Settings.TOOL_CALL_TIMEOUT}s."
+        logger.warning("Tool error: %s", error_msg)
+    except Exception as e:
+        # Handle errors
+        error_msg = f"Error: {str(e)}\n Please fix your mistakes."
+        logger.exception("Tool error: %s", error_msg)
+
+    return AIMessage(content=error_msg)
+
+
+async def async_tool_executor(state, workflow_runtime):
     messages = state["messages"]
     last_message = messages[-1]
 
@@ -73,126 +125,201 @@ async def async_tool_executor(state, client: MCPClient, tools):
     if not tool_calls:
         return {"messages": messages}
 
-    # Process each tool call
-    new_messages = messages.copy()
-
-    for tool_call in tool_calls:
-        # Handle different formats of tool_call
-        if isinstance(tool_call, dict):
-            tool_name = tool_call.get("name")
-            tool_args = tool_call.get("args", {})
-            tool_id = tool_call.get("id", "tool-call-id")
-        else:
-            tool_name = tool_call.name
-            tool_args = tool_call.args if hasattr(tool_call, "args") else {}
-            tool_id = getattr(tool_call, "id", "tool-call-id")
-
-        # Print debug info
-        print(f"Executing tool: {tool_name}")
-        print(f"Tool args: {tool_args}")
-
-        # Find the matching tool
-        tool = next((t for t in tools if t.name == tool_name), None)
-
-        if not tool:
-            # Tool not found
-            tool_error = f"Error: {tool_name} is not a valid tool, try one of {[t.name for t in tools]}."
-            new_messages.append(AIMessage(content=tool_error))
-        else:
-            try:
-                result = await client.call_tool(tool_name, tool_args)
-                extracted_result = extract_tool_result(result)
-
-                # Add tool result
-                new_messages.append(
-                    ToolMessage(
-                        content=str(extracted_result),
-                        tool_call_id=tool_id,
-                        name=tool_name,
-                    )
-                )
-            except Exception as e:
-                # Handle errors
-                error_msg = f"Error: {str(e)}\n Please fix your mistakes."
-                print(f"Tool error: {error_msg}")
-                new_messages.append(AIMessage(content=error_msg))
-
-    return {"messages": new_messages}
-
-
-async def create_workflow(client: MCPClient):
-    """Create LangGraph workflow with MCP tools loaded."""
-    try:
-        mcp_tools = await client.list_tools()
-
-        # Initialize LLM with MCP tools
-        set_llm_with_tools(mcp_tools)
-
-        print(f"Loaded {len(mcp_tools)} MCP tools: {[tool.name for tool in mcp_tools]}")
-
-        # Build the StateGraph
-        workflow = StateGraph(SupportState)
-
-        # Add nodes
-        workflow.add_node("parse_email", parse_email)
-        workflow.add_node("analyze_problem", analyze_problem)
-        workflow.add_node(
-            "tools", partial(async_tool_executor, client=client, tools=mcp_tools)
-        )
-        workflow.add_node("handle_tool_result", handle_tool_result)
-        workflow.add_node("draft_response", draft_response)
-        workflow.add_node("format_to_html_and_send", format_to_html_and_send)
-
-        # Add edges
-        workflow.set_entry_point("parse_email")
-        workflow.add_edge("parse_email", "analyze_problem")
-
-        # Conditional: analyze_problem > tools OR draft_response
-        workflow.add_conditional_edges(
-            "analyze_problem",
-            router,
-            {
-                "tools": "tools",
-                "end": "draft_response",
-            },
+    results, updates = await _run_tool_calls(tool_calls, state, workflow_runtime)
+    return {"messages": messages + results, **updates}
+
+
+# Free-text arguments; the policy search ignores their case. Identifiers such
+# as tracking numbers keep theirs.
+CASE_INSENSITIVE_ARGS = {"query", "queries"}
+
+
+def _normalize_arg(value, casefold: bool):
+    if isinstance(value, str):
+        value = " ".join(value.split())
+        return value.lower() if casefold else value
+    if isinstance(value, list):
+        return [_normalize_arg(item, casefold) for item in value]
+    return value
+
+
+def _memo_key(tool_name: str, tool_args: dict) -> str:
+    normalized = {
+        key: _normalize_arg(value, key in CASE_INSENSITIVE_ARGS)
+        for key, value in tool_args.items()
+    }
+    return f"{tool_name}:{compact_json(normalized)}"
+
+
+async def _run_tool_calls(tool_calls, state, workflow_runtime):
+    """Run one turn's tool calls, answering repeats from the run's memo.
+
+    Returns the result messages in tool_call order and the updated
+    ``tool_memo`` / ``memo_hits`` state fields.
+    """
+    memo = dict(state.get("tool_memo") or {})
+    memo_hits = state.get("memo_hits") or 0
+
+    # Dispatch every new call from this turn concurrently; gather keeps the
+    # results in the original tool_call order.
+    semaphore = asyncio.Semaphore(Settings.TOOL_MAX_CONCURRENCY)
+
+    async def run(tool_call):
+        tool_name, tool_args, tool_id = _unpack_tool_call(tool_call)
+        key = _memo_key(tool_name, tool_args)
+        if key in memo:
+            logger.debug("Reusing earlier result for %s: %s", tool_name, tool_args)
+            message = ToolMessage(content=memo[key], tool_call_id=tool_id, name=tool_name)
+            return key, True, message
+        return key, False, await _execute_tool_call(tool_call, workflow_runtime, semaphore)
+
+    results = []
+    for key, memoized, result in await asyncio.gather(*(run(tc) for tc in tool_calls)):
+        if memoized:
+            memo_hits += 1
+        elif isinstance(result, ToolMessage):
+            memo[key] = result.content
+        results.append(result)
+
+    return results, {"tool_memo": memo, "memo_hits": memo_hits}
+
+
+async def prefetch_tools(state, workflow_runtime):
+    """Speculatively run the lookups the agent would ask for on its first turn.
+
+    With a tracking number the agent always wants tracking data and policy
+    info, so both are fetched concurrently before the first analyze_problem;
+    several tracking numbers are fetched with one batch call. Failed lookups
+    are left for the agent to retry through the normal tools node.
+    """
+    tracking_numbers = state.get("tracking_numbers") or [
+        tn for tn in [state.get("tracking_number")] if tn
+    ]
+    if not Settings.TOOL_PREFETCH or not tracking_numbers:
+        return {}
+
+    if len(tracking_numbers) > 1:
+        tracking_call = {
+            "name": "fetch_tracking_data_batch",
+            "args": {"tracking_numbers": tracking_numbers},
+            "id": "prefetch-tracking",
+        }
+    else:
+        tracking_call = {
+            "name": "fetch_tracking_data",
+            "args": {"tracking_number": tracking_numbers[0]},
+            "id": "prefetch-tracking",
+        }
+    tool_calls = [tracking_call]
+    if state.get("problem"):
+        tool_calls.append(
+            {"name": "search_policy", "args": {"query": state["problem"]}, "id": "prefetch-policy"}
         )
 
-        # After tools run, extract results and go back to analyze_problem
-        workflow.add_edge("tools", "handle_tool_result")
-        workflow.add_edge("handle_tool_result", "analyze_problem")
-        workflow.add_edge("draft_response", "format_to_html_and_send")
-        workflow.add_edge("format_to_html_and_send", END)
-
-        return workflow.compile()
-
-    except Exception as e:
-        print(f"Failed to create workflow: {e}")
-        raise
+    logger.debug("Inside Node: prefetch_tools")
+    results, updates = await _run_tool_calls(tool_calls, state, workflow_runtime)
+
+    updates["prefetched"] = []
+    for result in results:
+        if not isinstance(result, ToolMessage):
+            continue
+        updates[TOOL_STATE_FIELDS[result.name]] = result.content
+        updates["prefetched"].append(result.name)
+
+    return updates
+
+
+def prefetch_outcome(state) -> dict:
+    """How many LLM turns the prefetch saved in a finished run.
+
+    The agent requests tracking data and policy info together in one turn.
+    If it never asks for prefetched data again, through the single or the
+    batch tool, that turn was saved.
+    """
+    prefetched = set(state.get("prefetched") or [])
+    prefetched_fields = {TOOL_STATE_FIELDS[name] for name in prefetched}
+    redundant_calls = sum(
+        1
+        for message in state.get("messages", [])
+        if isinstance(message, AIMessage)
+        for tool_call in message.tool_calls
+        if TOOL_STATE_FIELDS.get(tool_call["name"]) in prefetched_fields
+    )
+    return {
+        "prefetched": sorted(prefetched),
+        "redundant_calls": redundant_calls,
+        "llm_turns_saved": int(bool(prefetched) and redundant_calls == 0),
+    }
+
+
+def build_workflow(runtime):
+    """Build and compile the LangGraph workflow.
+
+    The tool nodes dispatch through ``runtime`` so the compiled graph stays
+    valid across MCP reconnects. It is bound as ``workflow_runtime`` because
+    LangGraph injects its own object into node parameters named ``runtime``.
+    """
+    workflow = StateGraph(SupportState)
+
+    # Add nodes
+    workflow.add_node("parse_email", parse_email)
+    workflow.add_node("prefetch_tools", partial(prefetch_tools, workflow_runtime=runtime))
+    workflow.add_node("analyze_problem", analyze_problem)
+    workflow.add_node("tools", partial(async_tool_executor, workflow_runtime=runtime))
+    workflow.add_node("handle_tool_result", handle_tool_result)
+    workflow.add_node("draft_response", draft_response)
+    workflow.add_node("format_to_html_and_send", format_to_html_and_send)
+
+    # Add edges
+    workflow.set_entry_point("parse_email")
+    workflow.add_edge("parse_email", "prefetch_tools")
+    workflow.add_edge("prefetch_tools", "analyze_problem")
+
+    # Conditional: analyze_problem > tools OR draft_response
+    workflow.add_conditional_edges(
+        "analyze_problem",
+        router,
+        {
+            "tools": "tools",
+            "end": "draft_response",
+        },
+    )
+
+    # After tools run, extract results and go back to analyze_problem
+    workflow.add_edge("tools", "handle_tool_result")
+    workflow.add_edge("handle_tool_result", "analyze_problem")
+    workflow.add_edge("draft_response", "format_to_html_and_send")
+    workflow.add_edge("format_to_html_and_send", END)
+
+    return workflow.compile()
 
 
 async def save_workflow_graph(app, filename):
+    """Render the graph to a PNG. Rendering calls out to mermaid.ink, so this is
+    an explicit offline/admin action and never part of handling an email."""
     try:
-        graph_bytes = app.get_graph().draw_mermaid_png()
+        graph_bytes = await asyncio.to_thread(app.get_graph().draw_mermaid_png)
         with open(filename, "wb") as f:
             f.write(graph_bytes)
     except Exception as e:
-        print(f"Failed to save workflow graph: {e}")
+        logger.error("Failed to save workflow graph: %s", e)
 
 
 async def start_agent_workflow(subject: str, body: str, from_email: str):
     """Main workflow entry point."""
-    try:
-        async with MCPClient(server_url=server_url) as _client:
-            app = await create_workflow(_client)
-            await save_workflow_graph(app, "workflow.png")
-
-            initial_state = SupportState(
-                email_body=body, subject=subject, from_email=from_email
-            )
+    # Import here to avoid circular imports
+    from .runtime import get_runtime
 
-            result = await app.ainvoke(initial_state)
-            print(f"Workflow completed for {from_email}")
-            return result
+    try:
+        runtime = await get_runtime()
+        result = await runtime.run(subject, body, from_email)
+        logger.info("Workflow completed for %s", from_email)
+        return result
     except Exception as e:
-        print(f"Workflow failed for {from_email}: {e}")
+        logger.exception("Workflow failed for %s: %s", from_email, e)
         raise
+
+
+if __name__ == "__main__":
+    # Offline rendering: python -m src.agent.workflow
+    asyncio.run(save_workflow_graph(build_workflow(None), Settings.WORKFLOW_GRAPH_PATH))
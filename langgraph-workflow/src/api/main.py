@@ -1,6 +1,48 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from .routes import router
+from src.config import Settings
+from src.agent.runtime import start_runtime, stop_runtime
+from src.agent.scheduler import workflow_scheduler
+from src.utils import loop_monitor, mail_sender, gmail_manager, get_dedupe_index
+from src.utils.metrics import metrics
 
-app = FastAPI(title="Agentic Support Assistant")
+logging.basicConfig(
+    level=Settings.LOG_LEVEL,
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One warm MCP session and compiled graph shared by every email
+    loop_monitor.start()
+    mail_sender.start()
+    await asyncio.to_thread(get_dedupe_index)
+    try:
+        await asyncio.to_thread(gmail_manager.start)
+    except Exception as e:
+        logger.warning("Gmail client unavailable at startup: %s", e)
+    app.state.runtime = await start_runtime()
+    workflow_scheduler.start()
+    yield
+    await workflow_scheduler.stop()
+    await stop_runtime()
+    await mail_sender.stop()
+    gmail_manager.stop()
+    await loop_monitor.stop()
+
+
+app = FastAPI(title="Agentic Support Assistant", lifespan=lifespan)
 
 app.include_router(router)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Latency histograms and token counters in Prometheus text format."""
+    return metrics.render()
@@ -1,8 +1,21 @@
 import base64
 import json
+import logging
 from fastapi import APIRouter, Request, HTTPException, BackgroundTasks
-from src.utils import process_email_notification
+from src.utils import (
+    process_email_notification,
+    history_sync,
+    loop_monitor,
+    mail_sender,
+    get_dedupe_index,
+)
 from src.agent.knowledge_base import kb
+from src.agent.context import prompt_token_stats
+from src.agent.llm import get_llm_cache
+from src.agent.runtime import get_runtime
+from src.agent.scheduler import workflow_scheduler
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api")
 
@@ -12,13 +25,28 @@ async def health():
     return {"status": "healthy"}
 
 
+@router.get("/status")
+async def status():
+    runtime = await get_runtime()
+    return {
+        "loop_lag": loop_monitor.stats(),
+        "workflows": runtime.stats(),
+        "scheduler": workflow_scheduler.stats(),
+        "history_sync": history_sync.stats(),
+        "dedupe": get_dedupe_index().stats(),
+        "mail": mail_sender.stats(),
+        "prompt_tokens": prompt_token_stats(),
+        "llm_cache": llm_cache.stats() if (llm_cache := get_llm_cache()) else None,
+    }
+
+
 @router.post("/gmail-webhook")
 async def gmail_webhook(request: Request, background_tasks: BackgroundTasks):
     """Gmail webhook endpoint to receive Pub/Sub notifications."""
     try:
         body = await request.body()
         body_str = body.decode()
-        print(f"Raw webhook received: {body_str}")
+        logger.debug("Raw webhook received: %s", body_str)
 
         request_data = json.loads(body_str)
 
@@ -38,15 +66,28 @@ async def gmail_webhook(request: Request, background_tasks: BackgroundTasks):
         return {"status": "success", "message": "Processing email"}
 
     except Exception as e:
-        print(f"Webhook error: {e}")
+        logger.exception("Webhook error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/initialize-kb")
+@router.post("/initialize-kb", status_code=202)
 async def initialize_knowledge_base():
-    """Initialize the knowledge base by loading and indexing the PDF."""
-    try:
-        kb.load_and_index()
-        return {"status": "success", "message": "Knowledge base initialized"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    """Start an incremental sync of the knowledge base documents into Pinecone."""
+    job = kb.start_indexing()
+    return {"status": "accepted", "job": job.to_dict()}
+
+
+@router.get("/initialize-kb/status")
+async def knowledge_base_status():
+    """Progress of the most recent knowledge base indexing run."""
+    if kb.current_job is None:
+        raise HTTPException(status_code=404, detail="No indexing run has been started")
+    return kb.current_job.to_dict()
+
+
+@router.post("/admin/render-graph")
+async def render_workflow_graph():
+    """Render the compiled workflow graph to WORKFLOW_GRAPH_PATH."""
+    runtime = await get_runtime()
+    await runtime.render_graph()
+    return {"status": "success", "message": "Workflow graph rendered"}
@@ -0,0 +1,81 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv(override=True)
+
+
+class Settings:
+    MCP_SERVER_BASE_URL = os.getenv("MCP_SERVER_BASE_URL")
+    MCP_SERVER_URL = f"{MCP_SERVER_BASE_URL}/mcp"
+    # Shared secret for the MCP server's /cache/invalidate endpoint
+    MCP_ADMIN_TOKEN = os.getenv("MCP_ADMIN_TOKEN")
+    WORKFLOW_GRAPH_PATH = os.getenv("WORKFLOW_GRAPH_PATH", "workflow.png")
+    # DEBUG adds per-node, per-tool and per-span detail to the logs
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+    # Tool calls emitted in a single LLM turn run concurrently
+    TOOL_MAX_CONCURRENCY = int(os.getenv("TOOL_MAX_CONCURRENCY", "4"))
+    TOOL_CALL_TIMEOUT = float(os.getenv("TOOL_CALL_TIMEOUT", "30"))
+    # analyze_problem turns allowed before the run is forced to draft_response
+    MAX_AGENT_TURNS = int(os.getenv("MAX_AGENT_TURNS", "4"))
+    # Fetch tracking data and policy info right after parse_email, saving an LLM turn
+    TOOL_PREFETCH = os.getenv("TOOL_PREFETCH", "true").lower() == "true"
+
+    # On-disk cache of Gemini responses, keyed by model, prompt and output schema
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.db")
+    LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 86400)))
+
+    # Upper bound for analyze/draft prompts; policy text is trimmed to fit
+    PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "2000"))
+
+    # "template" renders replies locally; "llm" uses the HTML_CONVERTER_PROMPT round trip
+    HTML_RENDERER = os.getenv("HTML_RENDERER", "template")
+
+    # Outbound replies. For a local sink (e.g. python -m aiosmtpd -n -l localhost:8025)
+    # set SMTP_HOST=localhost SMTP_PORT=8025 SMTP_STARTTLS=false GMAIL_APP_PASSWORD=
+    GMAIL_USER = os.getenv("GMAIL_USER")
+    SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+    SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+    SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+    SMTP_USERNAME = os.getenv("SMTP_USERNAME", GMAIL_USER)
+    SMTP_PASSWORD = os.getenv("GMAIL_APP_PASSWORD")
+    SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+    SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "2"))
+    SMTP_QUEUE_SIZE = int(os.getenv("SMTP_QUEUE_SIZE", "1000"))
+    SMTP_MAX_RETRIES = int(os.getenv("SMTP_MAX_RETRIES", "3"))
+    SMTP_RETRY_BACKOFF = float(os.getenv("SMTP_RETRY_BACKOFF", "1"))
+    # Pooled connections idle longer than SMTP_NOOP_AFTER are probed with NOOP;
+    # past SMTP_IDLE_TIMEOUT they are replaced outright
+    SMTP_NOOP_AFTER = float(os.getenv("SMTP_NOOP_AFTER", "5"))
+    SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", "120"))
+
+    # Gmail ingestion: large history deltas fetch several batch requests at once
+    GMAIL_FETCH_CONCURRENCY = int(os.getenv("GMAIL_FETCH_CONCURRENCY", "4"))
+    GMAIL_BATCH_MAX_RETRIES = int(os.getenv("GMAIL_BATCH_MAX_RETRIES", "3"))
+    GMAIL_TOKEN_PATH = os.getenv("GMAIL_TOKEN_PATH", "token.pickle")
+    # Refresh the Gmail OAuth token this many seconds before it expires
+    GMAIL_TOKEN_REFRESH_MARGIN = float(os.getenv("GMAIL_TOKEN_REFRESH_MARGIN", "300"))
+
+    # Email workflows run on a bounded in-process queue
+    WORKFLOW_WORKERS = int(os.getenv("WORKFLOW_WORKERS", "8"))
+    WORKFLOW_QUEUE_SIZE = int(os.getenv("WORKFLOW_QUEUE_SIZE", "200"))
+    WORKFLOW_TIMEOUT = float(os.getenv("WORKFLOW_TIMEOUT", "300"))
+    WORKFLOW_ENQUEUE_TIMEOUT = float(os.getenv("WORKFLOW_ENQUEUE_TIMEOUT", "60"))
+    # Emails left behind by a sync (queue full, Gmail throttling) are retried
+    # this many seconds later; the history cursor waits for them
+    WORKFLOW_RETRY_DELAY = float(os.getenv("WORKFLOW_RETRY_DELAY", "60"))
+
+    # Processed-message index: claims expire so a crashed run can be retried
+    DEDUPE_DB_PATH = os.getenv("DEDUPE_DB_PATH", "processed_messages.db")
+    DEDUPE_CLAIM_TTL = float(os.getenv("DEDUPE_CLAIM_TTL", str(2 * WORKFLOW_TIMEOUT)))
+    DEDUPE_DONE_TTL = float(os.getenv("DEDUPE_DONE_TTL", str(30 * 86400)))
+    DEDUPE_BLOOM_CAPACITY = int(os.getenv("DEDUPE_BLOOM_CAPACITY", "1000000"))
+
+    # Knowledge base ingestion: a PDF or a directory of PDFs, synced incrementally
+    KB_SOURCE_PATH = os.getenv(
+        "KB_SOURCE_PATH", os.path.join(os.path.dirname(__file__), "..", "resources")
+    )
+    KB_PARSE_WORKERS = int(os.getenv("KB_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+    KB_EMBED_CONCURRENCY = int(os.getenv("KB_EMBED_CONCURRENCY", "4"))
@@ -1,12 +1,20 @@
-from .gmail_service import get_gmail_service
+from .gmail_service import get_gmail_service, gmail_manager
 from .history_tracker import get_last_history_id, save_last_history_id
-from .email_processor import process_email_notification
+from .email_processor import process_email_notification, history_sync
 from .auth import verify_pubsub_message
+from .loop_monitor import loop_monitor
+from .mail_sender import mail_sender
+from .dedupe_index import get_dedupe_index
 
 __all__ = [
     "get_gmail_service",
+    "gmail_manager",
     "get_last_history_id", 
     "save_last_history_id",
     "process_email_notification",
-    "verify_pubsub_message"
+    "history_sync",
+    "verify_pubsub_message",
+    "loop_monitor",
+    "mail_sender",
+    "get_dedupe_index",
 ]
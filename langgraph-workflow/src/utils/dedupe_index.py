@@ -0,0 +1,165 @@
+import functools
+import hashlib
+import math
+import sqlite3
+import threading
+import time
+from ..config import Settings
+
+CLAIMED = "claimed"
+IN_PROGRESS = "in_progress"
+DONE = "done"
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings; no false negatives."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class DedupeIndex:
+    """Durable record of Gmail message ids that have been picked up.
+
+    Each id is ``claimed`` by ingestion, ``in_progress`` while its workflow
+    runs and ``done`` afterwards. Claims expire so a crashed run can be
+    retried, but a claim this process still holds (queued or running) never
+    expires under it; done entries expire after DEDUPE_DONE_TTL. An in-memory
+    Bloom filter answers "never seen" without touching SQLite.
+    """
+
+    def __init__(self, path: str, claim_ttl: float, done_ttl: float):
+        self._claim_ttl = claim_ttl
+        self._done_ttl = done_ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS processed_messages (
+                message_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )"""
+        )
+        self._db.execute(
+            "DELETE FROM processed_messages WHERE expires_at <= ?", (time.time(),)
+        )
+
+        self._bloom = BloomFilter(Settings.DEDUPE_BLOOM_CAPACITY)
+        for (message_id,) in self._db.execute("SELECT message_id FROM processed_messages"):
+            self._bloom.add(message_id)
+
+        # Claims this process holds until mark_done or release
+        self._held = set()
+
+        self.claims = 0
+        self.dedupe_hits = 0
+        self.bloom_fast_path = 0
+
+    def claim(self, message_id: str) -> bool:
+        """Claim a message for processing; False if it is already taken or done."""
+        now = time.time()
+        with self._lock:
+            if message_id in self._held:
+                self.dedupe_hits += 1
+                return False
+            if message_id not in self._bloom:
+                self.bloom_fast_path += 1
+                inserted = self._db.execute(
+                    "INSERT OR IGNORE INTO processed_messages VALUES (?, ?, ?, ?)",
+                    (message_id, CLAIMED, now, now + self._claim_ttl),
+                ).rowcount
+            else:
+                # Possibly seen: take it over only if the previous entry expired
+                inserted = self._db.execute(
+                    """INSERT INTO processed_messages VALUES (?, ?, ?, ?)
+                    ON CONFLICT(message_id) DO UPDATE SET
+                        status = excluded.status,
+                        updated_at = excluded.updated_at,
+                        expires_at = excluded.expires_at
+                    WHERE processed_messages.expires_at <= ?""",
+                    (message_id, CLAIMED, now, now + self._claim_ttl, now),
+                ).rowcount
+
+            self._bloom.add(message_id)
+            if inserted:
+                self._held.add(message_id)
+                self.claims += 1
+                return True
+            self.dedupe_hits += 1
+            return False
+
+    def mark_in_progress(self, message_id: str):
+        """Record that the workflow started; restarts the claim's TTL."""
+        self._set_status(message_id, IN_PROGRESS, self._claim_ttl)
+
+    def mark_done(self, message_id: str):
+        self._set_status(message_id, DONE, self._done_ttl)
+        with self._lock:
+            self._held.discard(message_id)
+
+    def release(self, message_id: str):
+        """Forget a claim so a redelivery of the message is processed again."""
+        with self._lock:
+            self._held.discard(message_id)
+            self._db.execute(
+                "DELETE FROM processed_messages WHERE message_id = ? AND status != ?",
+                (message_id, DONE),
+            )
+
+    def status(self, message_id: str) -> str | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status FROM processed_messages WHERE message_id = ? AND expires_at > ?",
+                (message_id, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set_status(self, message_id: str, status: str, ttl: float):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE processed_messages SET status = ?, updated_at = ?, expires_at = ? WHERE message_id = ?",
+                (status, now, now + ttl, message_id),
+            )
+
+    def stats(self) -> dict:
+        lookups = self.claims + self.dedupe_hits
+        return {
+            "claims": self.claims,
+            "held": len(self._held),
+            "dedupe_hits": self.dedupe_hits,
+            "dedupe_hit_rate": self.dedupe_hits / lookups if lookups else 0.0,
+            "bloom_fast_path": self.bloom_fast_path,
+        }
+
+
+@functools.cache
+def get_dedupe_index() -> DedupeIndex:
+    """The shared index, opened on first use.
+
+    Opening it creates the SQLite file and fills the Bloom filter, which
+    should not happen as a side effect of importing ``src.utils``.
+    """
+    return DedupeIndex(
+        Settings.DEDUPE_DB_PATH,
+        claim_ttl=Settings.DEDUPE_CLAIM_TTL,
+        done_ttl=Settings.DEDUPE_DONE_TTL,
+    )
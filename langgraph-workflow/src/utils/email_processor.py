@@ -1,122 +1,278 @@
 import base64
-import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from email import message_from_bytes
-from .gmail_service import get_gmail_service
+from googleapiclient.errors import HttpError
+from .gmail_service import get_gmail_service, gmail_manager
 from .history_tracker import get_last_history_id, save_last_history_id
+from .history_sync import HistorySyncCoordinator
+from .dedupe_index import get_dedupe_index
+from ..config import Settings
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Gmail throttles batches larger than 50 requests; batchModify takes up to 1000 ids
+GMAIL_BATCH_SIZE = 50
+GMAIL_MODIFY_BATCH_SIZE = 1000
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
 
 
 def process_email_notification(email_address, history_id):
-    """Background task to process ONLY the new email that triggered the webhook."""
-    try:
-        print(f"New email notification for: {email_address}, historyId: {history_id}")
+    """Background task run for each Pub/Sub notification.
+
+    Notifications that arrive while a sync is running collapse into a single
+    follow-up sync up to the highest historyId seen.
+    """
+    logger.info("New email notification for: %s, historyId: %s", email_address, history_id)
+    history_sync.notify(history_id)
 
+
+def sync_history(history_id):
+    """Process every message added since the stored cursor, then advance it.
+
+    When messages had to be left behind the cursor stays put and the sync is
+    retried after WORKFLOW_RETRY_DELAY; messages already handled are skipped
+    by the dedupe index on the second pass.
+    """
+    try:
         last_processed_id = get_last_history_id()
         service = get_gmail_service()
 
         if last_processed_id:
             try:
-                history_response = (
-                    service.users()
-                    .history()
-                    .list(
-                        userId="me",
-                        startHistoryId=last_processed_id,
-                        historyTypes="messageAdded",
-                    )
-                    .execute()
-                )
-
-                history_items = history_response.get("history", [])
-                print(
-                    f"Found {len(history_items)} history items since {last_processed_id}"
-                )
-
-                new_message_ids = []
-                for history_item in history_items:
-                    messages_added = history_item.get("messagesAdded", [])
-                    for message_added in messages_added:
-                        message_id = message_added["message"]["id"]
-                        new_message_ids.append(message_id)
-                        print(f"New message detected: {message_id}")
-
-                for message_id in new_message_ids:
-                    process_single_message(service, message_id)
+                new_message_ids = list_new_message_ids(service, last_processed_id)
+                deferred = process_messages(service, new_message_ids)
 
             except Exception as history_error:
-                print(
-                    f"History API error, falling back to unread method: {history_error}"
+                logger.warning(
+                    "History API error, falling back to unread method: %s", history_error
                 )
-                process_all_unread_messages(service)
+                deferred = process_all_unread_messages(service)
         else:
-            print("First run: processing all current unread messages")
-            process_all_unread_messages(service)
+            logger.info("First run: processing all current unread messages")
+            deferred = process_all_unread_messages(service)
+
+        if deferred:
+            logger.warning(
+                "%d messages deferred, retrying in %ss",
+                len(deferred), Settings.WORKFLOW_RETRY_DELAY,
+            )
+            history_sync.retry_later(history_id, Settings.WORKFLOW_RETRY_DELAY)
+            return
 
         save_last_history_id(history_id)
-        print("Finished processing new emails")
+        logger.info("Finished processing new emails")
 
     except Exception as e:
-        print(f"Error processing email: {e}")
+        logger.exception("Error processing email: %s", e)
 
 
-def process_all_unread_messages(service):
-    """Fallback method: process all unread messages (less precise)."""
-    messages_response = (
-        service.users()
-        .messages()
-        .list(userId="me", labelIds=["INBOX", "UNREAD"], maxResults=10)
-        .execute()
-    )
+def list_new_message_ids(service, start_history_id):
+    """Return ids of messages added since ``start_history_id``, in order."""
+    new_message_ids = []
+    page_token = None
 
-    messages = messages_response.get("messages", [])
-    print(f"Found {len(messages)} unread messages in fallback mode")
+    while True:
+        with metrics.span("gmail_call", op="history.list"):
+            history_response = (
+                service.users()
+                .history()
+                .list(
+                    userId="me",
+                    startHistoryId=start_history_id,
+                    historyTypes="messageAdded",
+                    pageToken=page_token,
+                )
+                .execute()
+            )
 
-    for msg in messages:
-        message_id = msg["id"]
-        process_single_message(service, message_id)
+        history_items = history_response.get("history", [])
+        logger.info("Found %d history items since %s", len(history_items), start_history_id)
 
+        for history_item in history_items:
+            messages_added = history_item.get("messagesAdded", [])
+            for message_added in messages_added:
+                message_id = message_added["message"]["id"]
+                if message_id not in new_message_ids:
+                    new_message_ids.append(message_id)
+                    logger.debug("New message detected: %s", message_id)
+
+        page_token = history_response.get("nextPageToken")
+        if not page_token:
+            return new_message_ids
 
-def process_single_message(service, message_id):
-    """Process a single message by ID and mark it as read."""
-    try:
-        print(f"Processing message ID: {message_id}")
 
-        message_response = (
+def process_all_unread_messages(service):
+    """Fallback method: process all unread messages (less precise)."""
+    with metrics.span("gmail_call", op="messages.list"):
+        messages_response = (
             service.users()
             .messages()
-            .get(userId="me", id=message_id, format="raw")
+            .list(userId="me", labelIds=["INBOX", "UNREAD"], maxResults=10)
             .execute()
         )
 
-        msg_str = base64.urlsafe_b64decode(message_response["raw"].encode("ASCII"))
-        mime_msg = message_from_bytes(msg_str)
+    messages = messages_response.get("messages", [])
+    logger.info("Found %d unread messages in fallback mode", len(messages))
+
+    return process_messages(service, [msg["id"] for msg in messages])
 
-        subject = mime_msg["subject"]
-        from_ = mime_msg["from"]
-        body = ""
 
-        if mime_msg.is_multipart():
-            for part in mime_msg.walk():
-                if part.get_content_type() == "text/plain":
-                    body = part.get_payload(decode=True).decode()
-                    break
-        else:
-            body = mime_msg.get_payload(decode=True).decode()
+def process_messages(service, message_ids):
+    """Fetch messages in batches, start their workflows and mark them read in bulk.
 
-        print("Processing Email:")
-        print(f"From: {from_}")
-        print(f"Subject: {subject}")
-        print(f"Body preview: {body[:200]}...")
+    Returns the ids left for a later retry: messages Gmail kept throttling
+    and messages the saturated workflow queue turned away.
+    """
+    dedupe_index = get_dedupe_index()
+    # Redeliveries and overlapping history ranges stop here, before any work
+    message_ids = [m for m in message_ids if dedupe_index.claim(m)]
+    if not message_ids:
+        return []
 
-        # Import here to avoid circular imports
-        from ..agent.workflow import start_agent_workflow
+    raw_messages = fetch_raw_messages(service, message_ids)
 
-        # Start the LangGraph workflow
-        asyncio.create_task(start_agent_workflow(subject, body, from_))
+    processed_ids = []
+    deferred_ids = []
+    for message_id in message_ids:
+        if message_id not in raw_messages:
+            deferred_ids.append(message_id)
+            dedupe_index.release(message_id)
+            continue
+        raw = raw_messages[message_id]
+        if raw is None:
+            # Could not be fetched at all; retrying would not help
+            dedupe_index.release(message_id)
+            continue
+        try:
+            process_single_message(message_id, raw)
+            processed_ids.append(message_id)
+        except TimeoutError:
+            deferred_ids.append(message_id)
+            dedupe_index.release(message_id)
+        except Exception as e:
+            dedupe_index.release(message_id)
+            logger.exception("Error processing single message %s: %s", message_id, e)
 
-        service.users().messages().modify(
-            userId="me", id=message_id, body={"removeLabelIds": ["UNREAD"]}
-        ).execute()
-        print(f"Marked message {message_id} as read")
+    mark_messages_read(service, processed_ids)
+    return deferred_ids
 
-    except Exception as e:
-        print(f"Error processing single message {message_id}: {e}")
+
+def fetch_raw_messages(service, message_ids) -> dict:
+    """Return message_id -> raw RFC 822 payload, one HTTP round trip per batch.
+
+    Large history deltas are split into batches fetched concurrently, each
+    thread on its own HTTP connection. Messages that failed permanently map
+    to None; ids still throttled after the last retry are missing.
+    """
+    chunks = [
+        message_ids[i : i + GMAIL_BATCH_SIZE]
+        for i in range(0, len(message_ids), GMAIL_BATCH_SIZE)
+    ]
+    if len(chunks) == 1:
+        return _fetch_batch_with_retry(service, chunks[0])
+
+    raw_messages = {}
+    with ThreadPoolExecutor(max_workers=Settings.GMAIL_FETCH_CONCURRENCY) as pool:
+        futures = [
+            pool.submit(
+                _fetch_batch_with_retry,
+                service,
+                chunk,
+                gmail_manager.authorized_http(),
+            )
+            for chunk in chunks
+        ]
+        for future in futures:
+            raw_messages.update(future.result())
+    return raw_messages
+
+
+def _fetch_batch_with_retry(service, message_ids, http=None) -> dict:
+    raw_messages = {}
+    pending = list(message_ids)
+
+    for attempt in range(Settings.GMAIL_BATCH_MAX_RETRIES + 1):
+        if attempt:
+            time.sleep(2**attempt * 0.5)
+
+        retry = []
+
+        def callback(request_id, response, exception):
+            if exception is None:
+                raw_messages[request_id] = response["raw"]
+            elif (
+                isinstance(exception, HttpError)
+                and exception.resp.status in RETRYABLE_STATUSES
+            ):
+                retry.append(request_id)
+            else:
+                raw_messages[request_id] = None
+                logger.error("Failed to fetch message %s: %s", request_id, exception)
+
+        batch = service.new_batch_http_request(callback=callback)
+        for message_id in pending:
+            batch.add(
+                service.users().messages().get(userId="me", id=message_id, format="raw"),
+                request_id=message_id,
+            )
+        with metrics.span("gmail_call", op="messages.batch_get"):
+            batch.execute(http=http)
+
+        if not retry:
+            break
+        pending = retry
+    else:
+        logger.error("Gave up fetching %d throttled messages: %s", len(pending), pending)
+
+    return raw_messages
+
+
+def mark_messages_read(service, message_ids):
+    for i in range(0, len(message_ids), GMAIL_MODIFY_BATCH_SIZE):
+        chunk = message_ids[i : i + GMAIL_MODIFY_BATCH_SIZE]
+        with metrics.span("gmail_call", op="messages.batchModify"):
+            service.users().messages().batchModify(
+                userId="me", body={"ids": chunk, "removeLabelIds": ["UNREAD"]}
+            ).execute()
+        logger.info("Marked %d messages as read", len(chunk))
+
+
+def parse_raw_message(raw):
+    msg_str = base64.urlsafe_b64decode(raw.encode("ASCII"))
+    mime_msg = message_from_bytes(msg_str)
+
+    subject = mime_msg["subject"]
+    from_ = mime_msg["from"]
+    body = ""
+
+    if mime_msg.is_multipart():
+        for part in mime_msg.walk():
+            if part.get_content_type() == "text/plain":
+                body = part.get_payload(decode=True).decode()
+                break
+    else:
+        body = mime_msg.get_payload(decode=True).decode()
+
+    return subject, from_, body
+
+
+def process_single_message(message_id, raw):
+    """Parse one fetched message and start its workflow."""
+    subject, from_, body = parse_raw_message(raw)
+
+    logger.info("Processing message %s from %s: %s", message_id, from_, subject)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Body preview: %s...", body[:200])
+
+    # Import here to avoid circular imports
+    from ..agent.scheduler import workflow_scheduler
+
+    # Queue the LangGraph workflow; blocks while the scheduler is saturated
+    workflow_scheduler.submit_threadsafe(subject, body, from_, message_id)
+
+
+# Global instance
+history_sync = HistorySyncCoordinator(sync_history)
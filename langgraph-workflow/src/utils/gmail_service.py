@@ -1,20 +1,130 @@
-import pickle
+import json
+import logging
 import os
+import pickle
+import threading
+from datetime import datetime, timedelta, timezone
+import httplib2
 from google.auth.transport import requests as google_requests
-from googleapiclient.discovery import build
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from ..config import Settings
+
+logger = logging.getLogger(__name__)
+
+
+def _utcnow() -> datetime:
+    """Current UTC time as a naive datetime, the form google-auth stores expiry in."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class GmailClientManager:
+    """Process-wide Gmail client.
+
+    Credentials are loaded once and refreshed ahead of expiry by a background
+    thread. The service is built from the discovery document bundled with
+    google-api-python-client, so no discovery fetch happens at runtime.
+    httplib2 is not thread-safe, so each thread gets its own service object
+    and HTTP connection on top of the shared credentials.
+    """
+
+    def __init__(self, token_path: str):
+        self._token_path = token_path
+        self._creds = None
+        self._discovery_doc = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stop = threading.Event()
+        self._refresher = None
+
+    def start(self):
+        """Load credentials and start the background refresher."""
+        self.credentials()
+        if self._refresher is None:
+            self._stop.clear()
+            self._refresher = threading.Thread(
+                target=self._refresh_loop, name="gmail-token-refresh", daemon=True
+            )
+            self._refresher.start()
+
+    def stop(self):
+        self._stop.set()
+        self._refresher = None
+
+    def service(self):
+        service = getattr(self._local, "service", None)
+        if service is None:
+            service = build_from_document(
+                self._discovery_document(), http=self.authorized_http()
+            )
+            self._local.service = service
+        return service
+
+    def authorized_http(self) -> AuthorizedHttp:
+        """A new HTTP connection for one thread, sharing the managed credentials."""
+        return AuthorizedHttp(self.credentials(), http=httplib2.Http())
+
+    def credentials(self):
+        with self._lock:
+            if self._creds is None:
+                self._creds = self._load_credentials()
+            elif not self._creds.valid:
+                self._refresh()
+            return self._creds
+
+    def _load_credentials(self):
+        creds = None
+        if os.path.exists(self._token_path):
+            with open(self._token_path, "rb") as token:
+                creds = pickle.load(token)
+
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                self._creds = creds
+                self._refresh()
+            else:
+                raise Exception("No valid credentials available. Run the watch script first.")
+        return creds
+
+    def _refresh(self):
+        """Refresh and persist the token. Caller holds the lock."""
+        self._creds.refresh(google_requests.Request())
+        tmp_path = f"{self._token_path}.tmp"
+        with open(tmp_path, "wb") as token:
+            pickle.dump(self._creds, token)
+        os.replace(tmp_path, self._token_path)
+
+    def _refresh_loop(self):
+        margin = timedelta(seconds=Settings.GMAIL_TOKEN_REFRESH_MARGIN)
+        while not self._stop.is_set():
+            with self._lock:
+                expiry = self._creds.expiry if self._creds else None
+                due = expiry is not None and expiry - margin <= _utcnow()
+                if due:
+                    try:
+                        self._refresh()
+                        expiry = self._creds.expiry
+                    except Exception as e:
+                        logger.error("Gmail token refresh failed: %s", e)
+
+            if expiry is None:
+                wait = 60
+            else:
+                wait = (expiry - margin - _utcnow()).total_seconds()
+            self._stop.wait(max(wait, 30))
+
+    def _discovery_document(self) -> dict:
+        with self._lock:
+            if self._discovery_doc is None:
+                self._discovery_doc = json.loads(get_static_doc("gmail", "v1"))
+            return self._discovery_doc
+
+
+# Global instance
+gmail_manager = GmailClientManager(Settings.GMAIL_TOKEN_PATH)
 
 
 def get_gmail_service():
-    """Build an authenticated Gmail API client using saved credentials."""
-    creds = None
-    if os.path.exists("token.pickle"):
-        with open("token.pickle", "rb") as token:
-            creds = pickle.load(token)
-
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(google_requests.Request())
-        else:
-            raise Exception("No valid credentials available. Run the watch script first.")
-
-    return build("gmail", "v1", credentials=creds)
+    """Return this thread's authenticated Gmail API client."""
+    return gmail_manager.service()
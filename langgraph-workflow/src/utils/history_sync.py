@@ -0,0 +1,85 @@
+import threading
+
+
+class HistorySyncCoordinator:
+    """Single-flight Gmail history sync.
+
+    Only one sync runs at a time. Notifications that arrive meanwhile only
+    raise the target ``historyId``; when the running sync finishes, one
+    follow-up sync covers all of them. Notifications at or below the
+    ``historyId`` the running sync started with are already covered by it.
+    """
+
+    def __init__(self, sync_fn):
+        self._sync_fn = sync_fn
+        self._lock = threading.Lock()
+        self._running = False
+        self._in_flight = None
+        self._pending = None
+        self._retry_timer = None
+        self.notifications = 0
+        self.coalesced = 0
+        self.syncs = 0
+        self.retries = 0
+
+    def notify(self, history_id):
+        """Request a sync up to ``history_id``; returns once no sync is owed."""
+        history_id = int(history_id)
+        with self._lock:
+            self.notifications += 1
+            if self._running:
+                self.coalesced += 1
+                if history_id > self._in_flight:
+                    self._pending = max(self._pending or 0, history_id)
+                return
+            # Claim the loop and its first target together, so a concurrent
+            # notify never sees _running without _in_flight
+            self._running = True
+            self._in_flight = max(self._pending or 0, history_id)
+            self._pending = None
+
+        try:
+            while True:
+                self.syncs += 1
+                self._sync_fn(self._in_flight)
+                with self._lock:
+                    # Releasing the loop and checking for work is one step, so
+                    # a notify cannot slip in between and be left unsynced
+                    if self._pending is None:
+                        self._running = False
+                        self._in_flight = None
+                        return
+                    self._in_flight, self._pending = self._pending, None
+        except BaseException:
+            with self._lock:
+                self._running = False
+                self._in_flight = None
+            raise
+
+    def retry_later(self, history_id, delay: float):
+        """Sync up to ``history_id`` again after ``delay`` seconds.
+
+        Used when a sync had to leave messages behind; at most one retry is
+        pending at a time.
+        """
+        with self._lock:
+            if self._retry_timer is not None:
+                return
+            self._retry_timer = threading.Timer(delay, self._retry, args=(history_id,))
+            self._retry_timer.daemon = True
+            self._retry_timer.start()
+
+    def _retry(self, history_id):
+        with self._lock:
+            self._retry_timer = None
+            self.retries += 1
+        self.notify(history_id)
+
+    def stats(self) -> dict:
+        return {
+            "notifications": self.notifications,
+            "coalesced": self.coalesced,
+            "syncs": self.syncs,
+            "retries": self.retries,
+            "running": self._running,
+        }
@@ -1,7 +1,10 @@
 import os
+import threading
 
 HISTORY_ID_FILE = "last_history_id.txt"
 
+_cursor_lock = threading.Lock()
+
 
 def get_last_history_id():
     """Read the last processed history ID from a file."""
@@ -12,6 +15,21 @@ def get_last_history_id():
 
 
 def save_last_history_id(history_id):
-    """Save the last processed history ID to a file."""
-    with open(HISTORY_ID_FILE, "w") as f:
-        f.write(str(history_id))
+    """Save the last processed history ID to a file.
+
+    The write is atomic (temp file + rename) and the cursor only moves
+    forward; returns False when ``history_id`` is not newer than the stored one.
+    """
+    history_id = int(history_id)
+    with _cursor_lock:
+        current = get_last_history_id()
+        if current is not None and history_id <= current:
+            return False
+
+        tmp_path = f"{HISTORY_ID_FILE}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(history_id))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, HISTORY_ID_FILE)
+        return True
@@ -0,0 +1,51 @@
+import asyncio
+from collections import deque
+
+
+class LoopLagMonitor:
+    """Samples event-loop lag: how late a ``sleep(interval)`` wakes up.
+
+    Anything that blocks the loop (a sync LLM call, smtplib, file I/O) shows up
+    directly as lag, so a flat lag under load shows workflows run concurrently.
+    """
+
+    def __init__(self, interval: float = 0.1, window: int = 600):
+        self.interval = interval
+        self._samples = deque(maxlen=window)
+        self._max_lag = 0.0
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self._samples.append(lag)
+            self._max_lag = max(self._max_lag, lag)
+
+    def stats(self) -> dict:
+        samples = sorted(self._samples)
+        if not samples:
+            return {"samples": 0}
+        return {
+            "samples": len(samples),
+            "current_ms": self._samples[-1] * 1000,
+            "avg_ms": sum(samples) / len(samples) * 1000,
+            "p99_ms": samples[int(0.99 * (len(samples) - 1))] * 1000,
+            "max_ms": self._max_lag * 1000,
+        }
+
+
+# Global instance
+loop_monitor = LoopLagMonitor()
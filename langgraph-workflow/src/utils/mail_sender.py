@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import queue
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from ..config import Settings
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledConnection:
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.messages_sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPConnectionPool:
+    """Small pool of authenticated SMTP connections reused across sends.
+
+    Idle connections are health-checked with NOOP before reuse and replaced
+    when the server has dropped them.
+    """
+
+    def __init__(self, size: int):
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self.connects = 0
+        self.discards = 0
+
+    def send(self, msg):
+        with metrics.span("smtp_send"), self.connection() as conn:
+            conn.smtp.send_message(msg)
+            conn.messages_sent += 1
+
+    @contextmanager
+    def connection(self):
+        with self._slots:
+            conn = self._checkout()
+            try:
+                yield conn
+            except Exception:
+                self._discard(conn)
+                raise
+            conn.last_used = time.monotonic()
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._quit(conn)
+
+    def _checkout(self) -> _PooledConnection:
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+        if self._healthy(conn):
+            return conn
+        self._discard(conn)
+        return self._connect()
+
+    def _connect(self) -> _PooledConnection:
+        smtp = smtplib.SMTP(
+            Settings.SMTP_HOST, Settings.SMTP_PORT, timeout=Settings.SMTP_TIMEOUT
+        )
+        try:
+            if Settings.SMTP_STARTTLS:
+                smtp.starttls()
+            if Settings.SMTP_PASSWORD:
+                smtp.login(Settings.SMTP_USERNAME, Settings.SMTP_PASSWORD)
+        except Exception:
+            smtp.close()
+            raise
+        self.connects += 1
+        return _PooledConnection(smtp)
+
+    def _healthy(self, conn: _PooledConnection) -> bool:
+        idle = time.monotonic() - conn.last_used
+        if idle > Settings.SMTP_IDLE_TIMEOUT:
+            return False
+        if idle < Settings.SMTP_NOOP_AFTER:
+            return True
+        try:
+            return conn.smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _discard(self, conn: _PooledConnection):
+        self.discards += 1
+        self._quit(conn)
+
+    @staticmethod
+    def _quit(conn: _PooledConnection):
+        try:
+            conn.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            conn.smtp.close()
+
+
+class MailSender:
+    """Async send queue in front of the SMTP pool.
+
+    Workflows enqueue a message and move on; worker tasks deliver it with
+    retry and exponential backoff.
+    """
+
+    def __init__(self, pool: SMTPConnectionPool, workers: int, max_queue: int):
+        self.pool = pool
+        self._workers = workers
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._tasks = []
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self._send_seconds = 0.0
+        self._wait_seconds = 0.0
+        self._max_send_seconds = 0.0
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._worker()) for _ in range(self._workers)
+            ]
+
+    async def stop(self, timeout: float = 10.0):
+        """Drain queued mail for up to ``timeout`` seconds, then shut down."""
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Mail sender stopped with %d messages queued", self._queue.qsize())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await asyncio.to_thread(self.pool.close)
+
+    async def enqueue(self, msg):
+        self.start()
+        await self._queue.put((msg, time.monotonic()))
+
+    async def _worker(self):
+        while True:
+            msg, enqueued_at = await self._queue.get()
+            self._wait_seconds += time.monotonic() - enqueued_at
+            try:
+                await self._deliver(msg)
+            except Exception:
+                # Anything unexpected would otherwise end this worker silently
+                self.failed += 1
+                logger.exception("Unexpected error sending email to %s", msg["To"])
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, msg):
+        for attempt in range(Settings.SMTP_MAX_RETRIES + 1):
+            started = time.monotonic()
+            try:
+                await asyncio.to_thread(self.pool.send, msg)
+            except (smtplib.SMTPException, OSError) as e:
+                permanent = isinstance(e, smtplib.SMTPRecipientsRefused) or (
+                    isinstance(e, smtplib.SMTPResponseException) and e.smtp_code >= 500
+                )
+                if permanent or attempt == Settings.SMTP_MAX_RETRIES:
+                    self.failed += 1
+                    logger.error("Failed to send email to %s: %s", msg["To"], e)
+                    return
+                self.retries += 1
+                await asyncio.sleep(Settings.SMTP_RETRY_BACKOFF * 2**attempt)
+            else:
+                elapsed = time.monotonic() - started
+                self.sent += 1
+                self._send_seconds += elapsed
+                self._max_send_seconds = max(self._max_send_seconds, elapsed)
+                return
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "connections_opened": self.pool.connects,
+            "connections_discarded": self.pool.discards,
+            "messages_per_connection": (
+                self.sent / self.pool.connects if self.pool.connects else 0.0
+            ),
+            "avg_send_ms": self._send_seconds / self.sent * 1000 if self.sent else 0.0,
+            "max_send_ms": self._max_send_seconds * 1000,
+            "avg_queue_wait_ms": (
+                self._wait_seconds / (self.sent + self.failed) * 1000
+                if self.sent + self.failed
+                else 0.0
+            ),
+        }
+
+
+# Global instance
+mail_sender = MailSender(
+    SMTPConnectionPool(size=Settings.SMTP_POOL_SIZE),
+    workers=Settings.SMTP_POOL_SIZE,
+    max_queue=Settings.SMTP_QUEUE_SIZE,
+)
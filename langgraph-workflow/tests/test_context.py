@@ -0,0 +1,126 @@
+import json
+from decimal import Decimal
+
+import pytest
+
+from src.agent import context
+from src.agent.context import (
+    build_prompt,
+    dedupe_policy_chunks,
+    estimate_tokens,
+    format_tool_result,
+    project_tracking,
+)
+from src.agent.prompts import DRAFT_RESPONSE_PROMPT
+from src.config import Settings
+
+DRAFT_VALUES = {
+    "problem": "Package has not arrived",
+    "sentiment": "frustrated",
+    "from_email": "sam@example.com",
+    "order_id": "ORD-1001",
+    "tracking_data": '{"tracking_number":"TRK123","status":"Delayed"}',
+    "analysis": "Delayed for 9 days; offer a refund per policy",
+    "todays_date": "2025-09-01",
+}
+
+
+@pytest.fixture(autouse=True)
+def prompt_stats(monkeypatch):
+    stats = {}
+    monkeypatch.setattr(context, "prompt_stats", stats)
+    return stats
+
+
+def test_oversized_policy_is_trimmed_to_the_budget(monkeypatch, prompt_stats):
+    monkeypatch.setattr(Settings, "PROMPT_TOKEN_BUDGET", 600)
+    policy = "\n".join(f"Policy clause {i}: refunds within 30 days." for i in range(500))
+
+    prompt = build_prompt(
+        "draft_response", DRAFT_RESPONSE_PROMPT, policy_info=policy, **DRAFT_VALUES
+    )
+
+    assert estimate_tokens(prompt) <= 600
+    assert "Policy clause 0:" in prompt
+    assert "Policy clause 499:" not in prompt
+    assert "\n[...]" in prompt
+    for value in DRAFT_VALUES.values():
+        assert value in prompt
+    assert prompt_stats["draft_response"]["trimmed"] == 1
+
+
+def test_policy_within_budget_is_untouched(monkeypatch, prompt_stats):
+    monkeypatch.setattr(Settings, "PROMPT_TOKEN_BUDGET", 600)
+    policy = "Refunds are issued within 30 days of delivery."
+
+    prompt = build_prompt(
+        "draft_response", DRAFT_RESPONSE_PROMPT, policy_info=policy, **DRAFT_VALUES
+    )
+
+    assert prompt == DRAFT_RESPONSE_PROMPT.format(policy_info=policy, **DRAFT_VALUES)
+    assert prompt_stats["draft_response"] == {
+        "calls": 1,
+        "tokens": estimate_tokens(prompt),
+        "trimmed": 0,
+    }
+
+
+def test_duplicate_chunk_lines_are_removed():
+    chunks = (
+        "Refund policy\n"
+        "Refunds are issued within 30 days.\n"
+        "Items must be unused.\n"
+        "\n"
+        "Items must be  unused.\n"
+        "Return shipping is free for damaged items.\n"
+        "\n"
+        "\n"
+        "Refunds are issued within 30 days.\n"
+    )
+
+    assert dedupe_policy_chunks(chunks) == (
+        "Refund policy\n"
+        "Refunds are issued within 30 days.\n"
+        "Items must be unused.\n"
+        "\n"
+        "Return shipping is free for damaged items."
+    )
+
+
+def test_tracking_projection_keeps_the_prompt_fields():
+    record = {
+        "tracking_number": "TRK123",
+        "order_id": "ORD-1001",
+        "status": "Delayed",
+        "carrier": "UPS",
+        "location": "Memphis, TN",
+        "last_update": "2025-08-30",
+        "estimated_delivery": "2025-09-03",
+        "days_in_transit": Decimal("9"),
+        "customer_email": "sam@example.com",
+        "events": [{"status": "Picked up"}] * 20,
+        "warehouse_id": "",
+    }
+
+    projected = project_tracking(record)
+
+    assert list(projected) == [
+        "tracking_number",
+        "order_id",
+        "status",
+        "carrier",
+        "location",
+        "last_update",
+        "estimated_delivery",
+        "days_in_transit",
+    ]
+    assert json.loads(format_tool_result("fetch_tracking_data", record)) == {
+        **{key: record[key] for key in projected},
+        "days_in_transit": 9,
+    }
+
+
+def test_tracking_errors_are_kept():
+    assert project_tracking({"error": "Tracking number not found", "status": None}) == {
+        "error": "Tracking number not found"
+    }
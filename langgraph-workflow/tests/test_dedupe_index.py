@@ -0,0 +1,39 @@
+import time
+
+import pytest
+
+from src.utils.dedupe_index import DedupeIndex
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "processed_messages.db")
+
+
+def test_done_messages_are_not_claimed_again(db_path):
+    index = DedupeIndex(db_path, claim_ttl=60, done_ttl=60)
+
+    assert index.claim("m1")
+    index.mark_done("m1")
+
+    assert not index.claim("m1")
+    assert not DedupeIndex(db_path, claim_ttl=60, done_ttl=60).claim("m1")
+
+
+def test_held_claim_outlives_its_ttl(db_path):
+    index = DedupeIndex(db_path, claim_ttl=0.01, done_ttl=60)
+    assert index.claim("m1")
+    time.sleep(0.05)
+
+    # Still queued in this process: a redelivery must not start a second run
+    assert not index.claim("m1")
+
+    index.release("m1")
+    assert index.claim("m1")
+
+
+def test_expired_claim_from_a_crashed_process_is_taken_over(db_path):
+    assert DedupeIndex(db_path, claim_ttl=0.01, done_ttl=60).claim("m1")
+    time.sleep(0.05)
+
+    assert DedupeIndex(db_path, claim_ttl=0.01, done_ttl=60).claim("m1")
@@ -0,0 +1,184 @@
+import threading
+from types import SimpleNamespace
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from src.config import Settings
+from src.utils import email_processor
+
+
+def _http_error(status: int) -> HttpError:
+    return HttpError(httplib2.Response({"status": status}), b"{}")
+
+
+class _Request:
+    def __init__(self, fn):
+        self._fn = fn
+
+    def execute(self, http=None):
+        return self._fn()
+
+
+class _Batch:
+    def __init__(self, gmail, callback):
+        self._gmail = gmail
+        self._callback = callback
+        self._ids = []
+
+    def add(self, request, request_id):
+        self._ids.append(request_id)
+
+    def execute(self, http=None):
+        self._gmail.record_batch(self._ids, http)
+        for message_id in self._ids:
+            self._callback(message_id, *self._gmail.answer(message_id))
+
+
+class FakeGmailService:
+    """messages.get through batch requests, and messages.batchModify.
+
+    ``throttled`` maps an id to how many times it is answered with a 429
+    before it succeeds; ids in ``missing`` are answered with a 404.
+    """
+
+    def __init__(self, throttled=None, missing=()):
+        self.throttled = dict(throttled or {})
+        self.missing = set(missing)
+        self.batches = []
+        self.modified = []
+        self._lock = threading.Lock()
+
+    def record_batch(self, message_ids, http):
+        with self._lock:
+            self.batches.append((list(message_ids), http))
+
+    def answer(self, message_id):
+        if message_id in self.missing:
+            return None, _http_error(404)
+        with self._lock:
+            if self.throttled.get(message_id, 0) > 0:
+                self.throttled[message_id] -= 1
+                return None, _http_error(429)
+        return {"id": message_id, "raw": f"raw-{message_id}"}, None
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return SimpleNamespace(get=self._get, batchModify=self._batch_modify)
+
+    def new_batch_http_request(self, callback):
+        return _Batch(self, callback)
+
+    def _get(self, userId, id, format="raw"):
+        return _Request(lambda: None)
+
+    def _batch_modify(self, userId, body):
+        self.modified.append(body)
+        return _Request(lambda: None)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(email_processor, "time", SimpleNamespace(sleep=sleeps.append))
+    monkeypatch.setattr(Settings, "GMAIL_BATCH_MAX_RETRIES", 2)
+    return sleeps
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    opened = []
+
+    def authorized_http():
+        opened.append(f"http-{len(opened)}")
+        return opened[-1]
+
+    monkeypatch.setattr(
+        email_processor, "gmail_manager", SimpleNamespace(authorized_http=authorized_http)
+    )
+    return opened
+
+
+def test_large_fetches_are_split_into_batches_of_50(connections):
+    gmail = FakeGmailService()
+    ids = [f"m{i}" for i in range(120)]
+
+    raw = email_processor.fetch_raw_messages(gmail, ids)
+
+    assert raw == {m: f"raw-{m}" for m in ids}
+    assert sorted(len(batch) for batch, _ in gmail.batches) == [20, 50, 50]
+    # Each concurrent batch runs on its own connection
+    assert sorted(http for _, http in gmail.batches) == connections == [
+        "http-0",
+        "http-1",
+        "http-2",
+    ]
+
+
+def test_a_single_batch_uses_the_shared_connection(connections):
+    gmail = FakeGmailService()
+
+    email_processor.fetch_raw_messages(gmail, ["m1", "m2"])
+
+    assert gmail.batches == [(["m1", "m2"], None)]
+    assert connections == []
+
+
+def test_only_throttled_messages_are_retried(no_backoff):
+    gmail = FakeGmailService(throttled={"m2": 1, "m3": 2}, missing={"m4"})
+
+    raw = email_processor._fetch_batch_with_retry(gmail, ["m1", "m2", "m3", "m4"])
+
+    assert raw == {"m1": "raw-m1", "m2": "raw-m2", "m3": "raw-m3", "m4": None}
+    assert [batch for batch, _ in gmail.batches] == [
+        ["m1", "m2", "m3", "m4"],
+        ["m2", "m3"],
+        ["m3"],
+    ]
+    assert no_backoff == [1.0, 2.0]
+
+
+def test_messages_still_throttled_are_deferred(monkeypatch):
+    gmail = FakeGmailService(throttled={"m2": 10}, missing={"m3"})
+    released = []
+    monkeypatch.setattr(
+        email_processor,
+        "get_dedupe_index",
+        lambda: SimpleNamespace(claim=lambda m: True, release=released.append),
+    )
+    processed = []
+    monkeypatch.setattr(
+        email_processor,
+        "process_single_message",
+        lambda message_id, raw: processed.append((message_id, raw)),
+    )
+
+    deferred = email_processor.process_messages(gmail, ["m1", "m2", "m3"])
+
+    assert deferred == ["m2"]
+    assert processed == [("m1", "raw-m1")]
+    assert sorted(released) == ["m2", "m3"]
+    assert len(gmail.batches) == Settings.GMAIL_BATCH_MAX_RETRIES + 1
+    assert [body["ids"] for body in gmail.modified] == [["m1"]]
+
+
+def test_mark_read_chunks_at_1000_ids():
+    gmail = FakeGmailService()
+    ids = [f"m{i}" for i in range(2500)]
+
+    email_processor.mark_messages_read(gmail, ids)
+
+    assert [len(body["ids"]) for body in gmail.modified] == [1000, 1000, 500]
+    assert [m for body in gmail.modified for m in body["ids"]] == ids
+    assert all(body["removeLabelIds"] == ["UNREAD"] for body in gmail.modified)
+
+
+def test_mark_read_without_ids_makes_no_call():
+    gmail = FakeGmailService()
+
+    email_processor.mark_messages_read(gmail, [])
+
+    assert gmail.modified == []
@@ -0,0 +1,89 @@
+import threading
+
+import pytest
+
+from src.utils.history_sync import HistorySyncCoordinator
+
+
+class PausingLock:
+    """Lock that runs ``hook`` before the owner thread's Nth acquisition.
+
+    Lets a test put a second notify exactly between two of the first
+    notify's critical sections.
+    """
+
+    def __init__(self, pause_at: int, hook):
+        self._lock = threading.Lock()
+        self._owner = threading.get_ident()
+        self._pause_at = pause_at
+        self._hook = hook
+        self._acquisitions = 0
+        self.fired = False
+
+    def __enter__(self):
+        if threading.get_ident() == self._owner:
+            self._acquisitions += 1
+            if self._acquisitions == self._pause_at:
+                self.fired = True
+                self._hook()
+        return self._lock.__enter__()
+
+    def __exit__(self, *exc):
+        return self._lock.__exit__(*exc)
+
+
+def test_notify_during_a_sync_is_coalesced_into_one_follow_up():
+    synced = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def sync(history_id):
+        synced.append(history_id)
+        if len(synced) == 1:
+            started.set()
+            release.wait(5)
+
+    coordinator = HistorySyncCoordinator(sync)
+    first = threading.Thread(target=coordinator.notify, args=(10,))
+    first.start()
+    assert started.wait(5)
+
+    coordinator.notify(20)
+    coordinator.notify(30)
+    coordinator.notify(5)  # already covered by the running sync
+    release.set()
+    first.join(5)
+
+    assert synced == [10, 30]
+    assert coordinator.stats()["running"] is False
+
+
+@pytest.mark.parametrize("pause_at", [2, 3, 4])
+def test_notify_between_critical_sections_is_never_lost(pause_at):
+    # Before the fix, pausing at the 2nd acquisition raised TypeError in the
+    # second notify (_running set, _in_flight still None) and pausing at the
+    # 4th dropped its history id (loop done, _running not yet reset)
+    synced = []
+    errors = []
+    coordinator = HistorySyncCoordinator(synced.append)
+
+    def notify_from_other_thread():
+        def notify():
+            try:
+                coordinator.notify(20)
+            except Exception as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=notify)
+        thread.start()
+        thread.join(5)
+
+    coordinator._lock = PausingLock(pause_at, notify_from_other_thread)
+    coordinator.notify(10)
+    if not coordinator._lock.fired:
+        notify_from_other_thread()
+
+    assert errors == []
+    assert synced[0] == 10
+    assert synced[-1] == 20
+    assert coordinator.stats()["running"] is False
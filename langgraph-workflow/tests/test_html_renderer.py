@@ -0,0 +1,88 @@
+import re
+
+import pytest
+
+from src.agent.html_renderer import render_email_html
+
+
+def _content(rendered: str) -> list[str]:
+    """The rendered blocks between the wrapper's div tags, tags and all."""
+    inner = rendered.split("\n", 4)[4].rsplit("\n</div>", 1)[0]
+    return inner.split("\n")
+
+
+def _text(fragment: str) -> str:
+    return re.sub(r"<[^>]+>", "", fragment)
+
+
+def test_text_is_escaped():
+    rendered = render_email_html('Order <b>#42</b> & "Rosa\'s" refund')
+
+    assert "<b>" not in rendered
+    assert _text(_content(rendered)[0]) == (
+        "Order &lt;b&gt;#42&lt;/b&gt; &amp; &quot;Rosa&#x27;s&quot; refund"
+    )
+
+
+def test_bold_is_applied_after_escaping():
+    rendered = render_email_html("Your **refund <now>** is on its way")
+
+    assert "<strong>refund &lt;now&gt;</strong>" in rendered
+
+
+def test_mixed_lists_and_paragraphs():
+    body = (
+        "Here is what happens next:\n"
+        "- We receive the item\n"
+        "* We inspect it\n"
+        "\n"
+        "1. Print the label\n"
+        "2) Drop it off\n"
+        "Then wait for the email."
+    )
+
+    blocks = _content(render_email_html(body))
+
+    assert [re.match(r"<(\w+)", block).group(1) for block in blocks] == [
+        "p",
+        "ul",
+        "ol",
+        "p",
+    ]
+    assert _text(blocks[1]) == "We receive the itemWe inspect it"
+    assert _text(blocks[2]) == "Print the labelDrop it off"
+    assert _text(blocks[3]) == "Then wait for the email."
+
+
+def test_paragraph_lines_are_joined_with_breaks():
+    blocks = _content(render_email_html("Line one\nLine two\r\n\r\nNext paragraph"))
+
+    assert blocks[0].endswith(">Line one<br>Line two</p>")
+    assert _text(blocks[1]) == "Next paragraph"
+
+
+def test_signature_block_is_split_off():
+    body = "Hi Sam,\n\nYour order shipped.\n\nBest regards,\nThe Support Team"
+
+    blocks = _content(render_email_html(body))
+
+    assert len(blocks) == 3
+    assert "color:#52606d" in blocks[-1]
+    assert _text(blocks[-1]) == "Best regards,The Support Team"
+    assert "color:#52606d" not in blocks[1]
+
+
+def test_sign_off_words_mid_email_are_not_a_signature():
+    body = "Thanks for your patience.\n\nYour order shipped.\n\nAnything else?"
+
+    rendered = render_email_html(body)
+
+    assert "color:#52606d" not in rendered
+
+
+@pytest.mark.parametrize("body", ["", None, "\n\n  \n"])
+def test_empty_body_renders_the_empty_template(body):
+    rendered = render_email_html(body)
+
+    assert rendered.startswith("<!DOCTYPE html>")
+    assert _content(rendered) == [""]
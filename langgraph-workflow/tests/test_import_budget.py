@@ -0,0 +1,51 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Generous next to the ~1.5 s measured locally, so slow CI machines pass;
+# benchmarks/import_budget.py holds the tighter budget and the breakdown
+IMPORT_BUDGET_SECONDS = 5.0
+
+# Loaded by /initialize-kb or the first LLM call, never by importing the app
+LAZY_MODULES = (
+    "langchain_google_genai",
+    "langchain_cohere",
+    "pinecone",
+    "pypdf",
+    "src.agent.llm_cache",
+)
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import src.api.main
+elapsed = time.perf_counter() - started
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def _import_app(tmp_path) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=tmp_path,
+        env={**os.environ, "PYTHONPATH": str(PROJECT_ROOT)},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_app_import_is_lazy_and_within_budget(tmp_path):
+    probe = _import_app(tmp_path)
+
+    loaded = set(probe["modules"])
+    assert [m for m in LAZY_MODULES if m in loaded] == []
+    assert probe["elapsed"] < IMPORT_BUDGET_SECONDS
+    # Importing the app must not create state files either
+    assert list(tmp_path.iterdir()) == []
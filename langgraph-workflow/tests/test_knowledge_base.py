@@ -0,0 +1,123 @@
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from src.agent import knowledge_base as kb_module
+from src.agent.knowledge_base import KnowledgeBase
+
+
+class FakeIndex:
+    """The list/upsert/delete subset of a Pinecone serverless index."""
+
+    def __init__(self, page_size=2):
+        self.vectors = {}
+        self.page_size = page_size
+        self.upserted = []
+        self.deleted = []
+
+    def list(self):
+        ids = sorted(self.vectors)
+        for i in range(0, len(ids), self.page_size):
+            yield ids[i : i + self.page_size]
+
+    def upsert(self, vectors):
+        for record in vectors:
+            self.vectors[record["id"]] = record
+        self.upserted.extend(record["id"] for record in vectors)
+
+    def delete(self, ids):
+        for vector_id in ids:
+            del self.vectors[vector_id]
+        self.deleted.extend(ids)
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.texts = []
+
+    async def aembed_documents(self, texts):
+        self.texts.extend(texts)
+        return [[float(len(text))] for text in texts]
+
+
+def _load_and_split(pdf_path: str) -> list[tuple[str, dict]]:
+    """Stand-in for the PDF parser: every line of the file is a chunk."""
+    lines = Path(pdf_path).read_text().splitlines()
+    return [(line, {"source": Path(pdf_path).name, "page": 0}) for line in lines]
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = FakeIndex()
+    pinecone = SimpleNamespace(Pinecone=lambda: SimpleNamespace(Index=lambda name: index))
+    monkeypatch.setitem(sys.modules, "pinecone", pinecone)
+    monkeypatch.setattr(kb_module, "_load_and_split", _load_and_split)
+    monkeypatch.setattr(
+        kb_module,
+        "ProcessPoolExecutor",
+        lambda max_workers, mp_context: ThreadPoolExecutor(max_workers),
+    )
+    invalidations = []
+
+    async def invalidate_search_cache():
+        invalidations.append(True)
+
+    monkeypatch.setattr(kb_module, "invalidate_search_cache", invalidate_search_cache)
+    index.invalidations = invalidations
+    return index
+
+
+def _sync(source: Path):
+    kb = KnowledgeBase(str(source))
+    kb._embeddings = FakeEmbeddings()
+    job = asyncio.run(kb.load_and_index())
+    assert job.status == "succeeded", job.error
+    return job, kb._embeddings.texts
+
+
+def test_incremental_sync(tmp_path, index):
+    (tmp_path / "returns.pdf").write_text("Returns within 30 days\nKeep the receipt")
+    (tmp_path / "shipping.pdf").write_text("Ships in 2 days\nFree over $50")
+
+    job, embedded = _sync(tmp_path)
+    assert (job.documents, job.chunks, job.unchanged, job.deleted) == (2, 4, 0, 0)
+    assert sorted(embedded) == sorted(
+        ["Returns within 30 days", "Keep the receipt", "Ships in 2 days", "Free over $50"]
+    )
+    assert len(index.invalidations) == 1
+
+    # Nothing changed: no embedding calls, no writes, no cache invalidation
+    index.upserted.clear()
+    job, embedded = _sync(tmp_path)
+    assert (job.chunks, job.unchanged, job.to_embed, job.deleted) == (4, 4, 0, 0)
+    assert embedded == []
+    assert index.upserted == []
+    assert len(index.invalidations) == 1
+
+    # One PDF removed, one added: only the new chunks are embedded
+    (tmp_path / "shipping.pdf").unlink()
+    (tmp_path / "warranty.pdf").write_text("One year warranty")
+    job, embedded = _sync(tmp_path)
+    assert (job.documents, job.chunks, job.unchanged) == (2, 3, 2)
+    assert embedded == ["One year warranty"]
+    assert job.deleted == 2
+    assert sorted(
+        record["metadata"]["source"] for record in index.vectors.values()
+    ) == ["returns.pdf", "returns.pdf", "warranty.pdf"]
+    assert len(index.invalidations) == 2
+
+
+def test_vectors_from_older_runs_are_deleted(tmp_path, index):
+    index.vectors["legacy-random-uuid"] = {"id": "legacy-random-uuid"}
+    (tmp_path / "returns.pdf").write_text("Returns within 30 days")
+
+    _sync(tmp_path)
+
+    assert index.deleted == ["legacy-random-uuid"]
+    assert list(index.vectors) == [
+        kb_module.chunk_id("Returns within 30 days", {"source": "returns.pdf"})
+    ]
@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.outputs import Generation
+
+from src.agent import llm_cache as llm_cache_module
+from src.agent.llm_cache import SQLiteLLMCache
+
+LLM = "model=gemini-2.0-flash temperature=0"
+
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache_module, "time", SimpleNamespace(time=clock.time))
+    return clock
+
+
+def _cache(tmp_path, max_bytes=1_000_000, ttl=3600) -> SQLiteLLMCache:
+    return SQLiteLLMCache(str(tmp_path / "llm_cache.db"), max_bytes=max_bytes, ttl=ttl)
+
+
+def _answer(text: str) -> list[Generation]:
+    return [Generation(text=text)]
+
+
+def test_miss_then_hit(tmp_path, clock):
+    cache = _cache(tmp_path)
+
+    assert cache.lookup("Where is TRK123?", LLM) is None
+    cache.update("Where is TRK123?", LLM, _answer("In transit"))
+
+    assert cache.lookup("Where is TRK123?", LLM) == _answer("In transit")
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_entries_survive_reopening(tmp_path, clock):
+    _cache(tmp_path).update("Where is TRK123?", LLM, _answer("In transit"))
+
+    assert _cache(tmp_path).lookup("Where is TRK123?", LLM) == _answer("In transit")
+
+
+def test_different_llm_string_misses(tmp_path, clock):
+    cache = _cache(tmp_path)
+    cache.update("Where is TRK123?", LLM, _answer("In transit"))
+
+    assert cache.lookup("Where is TRK123?", LLM + " tools=[track]") is None
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = _cache(tmp_path, ttl=60)
+    cache.update("Where is TRK123?", LLM, _answer("In transit"))
+
+    clock.now += 59
+    assert cache.lookup("Where is TRK123?", LLM) == _answer("In transit")
+    clock.now += 1
+    assert cache.lookup("Where is TRK123?", LLM) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    entry_size = len(llm_cache_module.dumps(_answer("answer 0")))
+    cache = _cache(tmp_path, max_bytes=entry_size * 2)
+
+    cache.update("prompt 0", LLM, _answer("answer 0"))
+    clock.now += 1
+    cache.update("prompt 1", LLM, _answer("answer 1"))
+    clock.now += 1
+    assert cache.lookup("prompt 0", LLM) is not None  # now the most recent
+    clock.now += 1
+    cache.update("prompt 2", LLM, _answer("answer 2"))
+
+    assert cache.lookup("prompt 1", LLM) is None
+    assert cache.lookup("prompt 0", LLM) == _answer("answer 0")
+    assert cache.lookup("prompt 2", LLM) == _answer("answer 2")
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2
+    assert stats["bytes"] <= stats["max_bytes"]
@@ -0,0 +1,94 @@
+import asyncio
+import socket
+from email.message import EmailMessage
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from src.config import Settings
+from src.utils.mail_sender import MailSender, SMTPConnectionPool
+
+
+class ScriptedHandler:
+    """Answers DATA with queued SMTP replies, then accepts everything."""
+
+    def __init__(self):
+        self.replies = []
+        self.delivered = []
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.replies:
+            return self.replies.pop(0)
+        self.delivered.append(envelope.rcpt_tos)
+        return "250 Message accepted for delivery"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    handler = ScriptedHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    monkeypatch.setattr(Settings, "SMTP_HOST", controller.hostname)
+    monkeypatch.setattr(Settings, "SMTP_PORT", controller.port)
+    monkeypatch.setattr(Settings, "SMTP_STARTTLS", False)
+    monkeypatch.setattr(Settings, "SMTP_PASSWORD", None)
+    monkeypatch.setattr(Settings, "SMTP_MAX_RETRIES", 2)
+    monkeypatch.setattr(Settings, "SMTP_RETRY_BACKOFF", 0)
+    yield handler
+    controller.stop()
+
+
+def _message(to: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "support@example.com"
+    msg["To"] = to
+    msg["Subject"] = "Re: your order"
+    msg.set_content("Thanks for reaching out.")
+    return msg
+
+
+def _send_all(*messages) -> MailSender:
+    async def run():
+        sender = MailSender(SMTPConnectionPool(size=1), workers=1, max_queue=10)
+        for msg in messages:
+            await sender.enqueue(msg)
+        await sender.stop()
+        return sender
+
+    return asyncio.run(run())
+
+
+def test_transient_failure_is_retried(smtp_server):
+    smtp_server.replies = ["451 Try again later"]
+
+    sender = _send_all(_message("customer@example.com"))
+
+    assert (sender.sent, sender.failed, sender.retries) == (1, 0, 1)
+    assert smtp_server.delivered == [["customer@example.com"]]
+
+
+def test_permanent_failure_is_not_retried(smtp_server):
+    smtp_server.replies = ["550 No such user"]
+
+    sender = _send_all(_message("missing@example.com"))
+
+    assert (sender.sent, sender.failed, sender.retries) == (0, 1, 0)
+    assert smtp_server.delivered == []
+
+
+def test_unexpected_error_does_not_stop_the_worker(smtp_server):
+    # smtplib refuses messages with more than one Resent- block (ValueError)
+    broken = _message("broken@example.com")
+    broken["Resent-Date"] = "Mon, 1 Sep 2025 10:00:00 +0000"
+    broken["Resent-Date"] = "Mon, 1 Sep 2025 11:00:00 +0000"
+
+    sender = _send_all(broken, _message("customer@example.com"))
+
+    assert (sender.sent, sender.failed) == (1, 1)
+    assert smtp_server.delivered == [["customer@example.com"]]
@@ -0,0 +1,31 @@
+from pathlib import Path
+
+import pytest
+
+from src.utils.metrics import MetricsRegistry
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+COPIES = (
+    REPO_ROOT / "langgraph-workflow" / "src" / "utils" / "metrics.py",
+    REPO_ROOT / "mcp-server" / "src" / "services" / "metrics.py",
+)
+
+
+def test_service_copies_are_identical():
+    if not all(path.exists() for path in COPIES):
+        pytest.skip("needs the full repository checkout")
+    assert COPIES[0].read_text() == COPIES[1].read_text()
+
+
+def test_render_histogram_and_counter():
+    registry = MetricsRegistry(buckets=(0.1, 1))
+    registry.inc("llm_tokens_total", 5, help="LLM tokens", type="input")
+    registry.observe("llm_call_seconds", 0.5, model='gemini "flash"')
+
+    text = registry.render()
+
+    assert "# TYPE llm_tokens_total counter" in text
+    assert 'llm_tokens_total{type="input"} 5' in text
+    assert 'llm_call_seconds_bucket{model="gemini \\"flash\\"",le="0.1"} 0' in text
+    assert 'llm_call_seconds_bucket{model="gemini \\"flash\\"",le="1"} 1' in text
+    assert 'llm_call_seconds_count{model="gemini \\"flash\\""} 1' in text
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.agent.scheduler import WorkflowScheduler
+from src.config import Settings
+
+
+def test_full_queue_rejects_without_queueing(monkeypatch):
+    monkeypatch.setattr(Settings, "WORKFLOW_ENQUEUE_TIMEOUT", 0.05)
+
+    async def run():
+        # No workers, so the single slot stays taken
+        scheduler = WorkflowScheduler(workers=0, max_queue=1, timeout=1)
+        await scheduler.submit("first", "body", "a@example.com")
+
+        def submit_from_thread():
+            with pytest.raises(TimeoutError):
+                scheduler.submit_threadsafe("second", "body", "b@example.com")
+
+        await asyncio.to_thread(submit_from_thread)
+        return scheduler
+
+    scheduler = asyncio.run(run())
+
+    assert scheduler.stats()["queue_depth"] == 1
+    assert (scheduler.submitted, scheduler.rejected) == (1, 1)
+
+
+def test_threadsafe_submit_waits_for_space(monkeypatch):
+    monkeypatch.setattr(Settings, "WORKFLOW_ENQUEUE_TIMEOUT", 5)
+
+    async def run():
+        scheduler = WorkflowScheduler(workers=0, max_queue=1, timeout=1)
+        await scheduler.submit("first", "body", "a@example.com")
+        submitted = threading.Event()
+
+        def submit_from_thread():
+            scheduler.submit_threadsafe("second", "body", "b@example.com")
+            submitted.set()
+
+        waiting = asyncio.create_task(asyncio.to_thread(submit_from_thread))
+        await asyncio.sleep(0.05)
+        assert not submitted.is_set()
+        scheduler._queue.get_nowait()
+        scheduler._queue.task_done()
+        await waiting
+        return scheduler
+
+    scheduler = asyncio.run(run())
+
+    assert (scheduler.submitted, scheduler.rejected) == (2, 0)
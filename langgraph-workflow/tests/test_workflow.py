@@ -0,0 +1,105 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, ToolMessage
+from mcp import types
+
+from src.agent.nodes import _analysis
+from src.agent.workflow import _memo_key, _run_tool_calls
+from src.config import Settings
+
+
+class SleepyRuntime:
+    """Tools that sleep for ``args["delay"]`` and track their concurrency."""
+
+    def __init__(self):
+        self.tools_by_name = {"search_policy": object()}
+        self.active = 0
+        self.peak = 0
+        self.calls = []
+
+    async def call_tool(self, name, args):
+        self.calls.append(args["query"])
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(args["delay"])
+        finally:
+            self.active -= 1
+        return types.CallToolResult(
+            content=[types.TextContent(type="text", text=f"Policy on {args['query']}")]
+        )
+
+
+def _policy_call(i: int, delay: float) -> dict:
+    return {
+        "name": "search_policy",
+        "args": {"query": f"topic {i}", "delay": delay},
+        "id": f"call-{i}",
+    }
+
+
+def test_memo_key_folds_case_of_queries_only():
+    assert _memo_key("search_policy", {"query": "Late  Delivery"}) == _memo_key(
+        "search_policy", {"query": "late delivery"}
+    )
+    assert _memo_key("fetch_tracking_data", {"tracking_number": "TRKab12"}) != _memo_key(
+        "fetch_tracking_data", {"tracking_number": "TRKAB12"}
+    )
+
+
+def test_analysis_explains_a_turn_cap():
+    capped = AIMessage(
+        content="",
+        tool_calls=[
+            {"name": "search_policy", "args": {"query": "refund"}, "id": "call-1"}
+        ],
+    )
+
+    analysis = _analysis(capped)
+
+    assert "turn limit" in analysis
+    assert 'search_policy({"query":"refund"})' in analysis
+    assert _analysis(AIMessage(content="Refund is due.")) == "Refund is due."
+
+
+def test_tool_calls_run_concurrently_and_keep_their_order(monkeypatch):
+    monkeypatch.setattr(Settings, "TOOL_MAX_CONCURRENCY", 3)
+    runtime = SleepyRuntime()
+    # Later calls finish first
+    tool_calls = [_policy_call(i, 0.05 - i * 0.005) for i in range(8)]
+
+    results, updates = asyncio.run(_run_tool_calls(tool_calls, {}, runtime))
+
+    assert [r.tool_call_id for r in results] == [f"call-{i}" for i in range(8)]
+    assert [r.content for r in results] == [f"Policy on topic {i}" for i in range(8)]
+    assert runtime.peak == 3
+    assert len(updates["tool_memo"]) == 8
+
+
+def test_timed_out_call_does_not_fail_the_others(monkeypatch):
+    monkeypatch.setattr(Settings, "TOOL_CALL_TIMEOUT", 0.1)
+    runtime = SleepyRuntime()
+    tool_calls = [_policy_call(0, 0.01), _policy_call(1, 5), _policy_call(2, 0.01)]
+
+    results, updates = asyncio.run(_run_tool_calls(tool_calls, {}, runtime))
+
+    assert [type(r) for r in results] == [ToolMessage, AIMessage, ToolMessage]
+    assert "timed out" in results[1].content
+    assert results[2].content == "Policy on topic 2"
+    # Errors are not memoized, so the agent can retry them
+    assert len(updates["tool_memo"]) == 2
+    assert runtime.active == 0
+
+
+def test_repeated_calls_are_answered_from_the_memo():
+    runtime = SleepyRuntime()
+    first, state = asyncio.run(_run_tool_calls([_policy_call(0, 0)], {}, runtime))
+
+    repeat = {**_policy_call(0, 0), "id": "call-again"}
+    repeat["args"]["query"] = "Topic  0"
+    results, updates = asyncio.run(_run_tool_calls([repeat], state, runtime))
+
+    assert results[0].content == first[0].content
+    assert results[0].tool_call_id == "call-again"
+    assert runtime.calls == ["topic 0"]
+    assert updates["memo_hits"] == 1
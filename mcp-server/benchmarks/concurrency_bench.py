@@ -0,0 +1,185 @@
+"""Check that concurrent MCP tool calls overlap instead of queueing.
+
+The tool functions run against stand-ins with fixed latencies: Cohere's async
+embed call, a blocking Pinecone-style vector query and a blocking DynamoDB
+BatchGetItem. N simultaneous calls should take about as long as one. Run from
+mcp-server/:
+
+    python -m benchmarks.concurrency_bench
+    python -m benchmarks.concurrency_bench --calls 64 --latency 0.1
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+import time
+import types
+import numpy as np
+
+# embed-english-light-v3.0 produces 384-dimensional vectors
+DIMENSIONS = 384
+
+
+def _vector(text: str) -> list[float]:
+    seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "little")
+    return np.random.default_rng(seed).standard_normal(DIMENSIONS).tolist()
+
+
+class FakeEmbeddings:
+    """CohereEmbeddings stand-in; the async path awaits like the real client."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def embed_query(self, text: str) -> list[float]:
+        time.sleep(self.latency)
+        return _vector(text)
+
+    async def aembed(self, texts: list[str], input_type=None) -> list[list[float]]:
+        await asyncio.sleep(self.latency)
+        return [_vector(text) for text in texts]
+
+
+class BlockingVectorIndex:
+    """Wraps a vector index with a blocking round trip, like Pinecone's client."""
+
+    def __init__(self, index, latency: float):
+        self.index = index
+        self.latency = latency
+
+    def search(self, embedding: list[float], k: int) -> list[str]:
+        time.sleep(self.latency)
+        return self.index.search(embedding, k)
+
+    def reload(self):
+        self.index.reload()
+
+
+class FakeDynamoDB:
+    """boto3 resource stand-in whose BatchGetItem blocks for ``latency``."""
+
+    def __init__(self, table_name: str, latency: float):
+        self.table_name = table_name
+        self.latency = latency
+        self.calls = 0
+
+    def batch_get_item(self, RequestItems):
+        time.sleep(self.latency)
+        self.calls += 1
+        keys = RequestItems[self.table_name]["Keys"]
+        return {
+            "Responses": {
+                self.table_name: [
+                    {"tracking_number": key["tracking_number"], "status": "In Transit"}
+                    for key in keys
+                ]
+            }
+        }
+
+
+class LoopLagProbe:
+    """Largest delay between when a periodic tick was due and when it ran."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.max_lag = 0.0
+        self._task = None
+
+    async def _run(self):
+        while True:
+            due = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.max_lag = max(self.max_lag, time.perf_counter() - due)
+
+    def __enter__(self):
+        self.max_lag = 0.0
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    def __exit__(self, *exc):
+        self._task.cancel()
+
+
+async def timed(calls) -> tuple[float, float]:
+    with LoopLagProbe() as probe:
+        started = time.perf_counter()
+        await asyncio.gather(*calls)
+        elapsed = time.perf_counter() - started
+    return elapsed, probe.max_lag
+
+
+async def run(args) -> bool:
+    from src.config import Settings
+    from src.tools import knowledge_tools, tracking_tools
+
+    kb_service = knowledge_tools.kb_service
+    tracking_service = tracking_tools.tracking_service
+    kb_service.embeddings = FakeEmbeddings(args.latency)
+    kb_service.vector_index = BlockingVectorIndex(kb_service.vector_index, args.latency)
+    dynamodb = FakeDynamoDB(Settings.DYNAMODB_TABLE, args.latency)
+    tracking_service.dynamodb = dynamodb
+    tracking_service.table = types.SimpleNamespace(name=dynamodb.table_name)
+
+    # Distinct queries and tracking numbers per round so no cache answers them
+    rounds = {
+        "search_policy": lambda n, tag: [
+            knowledge_tools.search_policy(f"{tag} refund question {i}") for i in range(n)
+        ],
+        "fetch_tracking_data": lambda n, tag: [
+            tracking_tools.fetch_tracking_data(f"TRK{tag}{i:05d}") for i in range(n)
+        ],
+    }
+
+    passed = True
+    print(f"{args.calls} concurrent calls, {args.latency * 1000:.0f} ms per backend call")
+    for tool, make_calls in rounds.items():
+        single, _ = await timed(make_calls(1, "a"))
+        concurrent, lag = await timed(make_calls(args.calls, "b"))
+        ratio = concurrent / single
+        ok = ratio <= args.max_ratio
+        passed &= ok
+        print(
+            f"  {tool:<20} 1 call={single * 1000:8.1f} ms  "
+            f"{args.calls} calls={concurrent * 1000:8.1f} ms  "
+            f"ratio={ratio:5.2f}  serial={single * args.calls * 1000:8.1f} ms  "
+            f"max loop lag={lag * 1000:6.1f} ms  {'ok' if ok else 'SLOW'}"
+        )
+    print(f"  DynamoDB BatchGetItem calls: {dynamodb.calls}")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=32)
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="seconds per backend round trip"
+    )
+    parser.add_argument(
+        "--max-ratio",
+        type=float,
+        default=2.0,
+        help="fail if N calls take longer than this multiple of one call",
+    )
+    args = parser.parse_args()
+
+    # The services are created at import time and read these settings then
+    os.environ.setdefault("COHERE_API_KEY", "benchmark")
+    from src.config import Settings
+    from src.services.vector_index import LocalVectorIndex
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        texts = [f"Policy section {i}: refunds and late deliveries." for i in range(200)]
+        LocalVectorIndex.build(index_dir, [_vector(t) for t in texts], texts)
+        Settings.VECTOR_BACKEND = "local"
+        Settings.LOCAL_INDEX_PATH = index_dir
+        Settings.KB_SEARCH_MODE = "vector"
+        passed = asyncio.run(run(args))
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
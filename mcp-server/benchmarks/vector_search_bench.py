@@ -0,0 +1,95 @@
+"""Compare the in-process vector index with the Pinecone search path.
+
+Embeddings come from a deterministic fake embedder, so the local runs need no
+network or API keys. Run from mcp-server/:
+
+    python -m benchmarks.vector_search_bench
+    python -m benchmarks.vector_search_bench --pinecone   # also query PINECONE_INDEX
+"""
+
+import argparse
+import hashlib
+import statistics
+import tempfile
+import time
+import numpy as np
+
+# embed-english-light-v3.0 produces 384-dimensional vectors
+DIMENSIONS = 384
+
+
+class FakeEmbeddings:
+    """Deterministic stand-in for CohereEmbeddings: same text, same vector."""
+
+    def embed_query(self, text: str) -> list[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "little")
+        return np.random.default_rng(seed).standard_normal(DIMENSIONS).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+
+def bench(search, queries: list[list[float]], k: int) -> tuple[list[float], list]:
+    timings, results = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append(search(query, k))
+        timings.append(time.perf_counter() - started)
+    return timings, results
+
+
+def report(name: str, timings: list[float], recall: float | None = None):
+    timings = sorted(timings)
+    p95 = timings[int(0.95 * (len(timings) - 1))]
+    line = (
+        f"{name:<16} n={len(timings):<6} "
+        f"mean={statistics.mean(timings) * 1e6:10.1f} us  "
+        f"p50={statistics.median(timings) * 1e6:10.1f} us  "
+        f"p95={p95 * 1e6:10.1f} us"
+    )
+    if recall is not None:
+        line += f"  recall@k={recall:.3f}"
+    print(line)
+
+
+def recall(expected: list, actual: list) -> float:
+    hits = sum(len(set(e) & set(a)) for e, a in zip(expected, actual))
+    return hits / sum(len(e) for e in expected)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument(
+        "--pinecone", action="store_true", help="also query the configured Pinecone index"
+    )
+    args = parser.parse_args()
+
+    from src.config import Settings
+    from src.services.vector_index import LocalVectorIndex, PineconeVectorIndex
+
+    embedder = FakeEmbeddings()
+    texts = [f"policy chunk {i}" for i in range(args.chunks)]
+    embeddings = embedder.embed_documents(texts)
+    queries = [embedder.embed_query(f"customer question {i}") for i in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as float_dir, tempfile.TemporaryDirectory() as int8_dir:
+        LocalVectorIndex.build(float_dir, embeddings, texts)
+        LocalVectorIndex.build(int8_dir, embeddings, texts, quantize=True)
+
+        timings, exact = bench(LocalVectorIndex(float_dir).search, queries, args.k)
+        report("local float32", timings)
+        timings, quantized = bench(LocalVectorIndex(int8_dir).search, queries, args.k)
+        report("local int8", timings, recall(exact, quantized))
+
+    if args.pinecone:
+        # Few queries: each one is a network round trip
+        index = PineconeVectorIndex(Settings.PINECONE_INDEX, embedder)
+        timings, _ = bench(index.search, queries[:50], args.k)
+        report("pinecone", timings)
+
+
+if __name__ == "__main__":
+    main()
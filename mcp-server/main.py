@@ -1,3 +1,10 @@
+import logging
+from src.config import Settings
 from src.server import get_app
 
+logging.basicConfig(
+    level=Settings.LOG_LEVEL,
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
+
 mcp_app = get_app()
@@ -5,7 +5,61 @@ load_dotenv(override=True)
 
 
 class Settings:
+    # DEBUG adds per-span timings to the logs
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
     AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
     DYNAMODB_TABLE = os.getenv("DYNAMODB_TABLE", "OrderTrackingInfo")
     PINECONE_INDEX = os.getenv("PINECONE_INDEX", "support-kb")
     COHERE_MODEL = os.getenv("COHERE_MODEL", "embed-english-light-v3.0")
+    # "pinecone", or "local" to search an exported index in-process
+    VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone")
+    LOCAL_INDEX_PATH = os.getenv("LOCAL_INDEX_PATH", "local_index")
+
+    # Policy search cache: exact (normalized query, k) results and query embeddings
+    KB_CACHE_SIZE = int(os.getenv("KB_CACHE_SIZE", "512"))
+    KB_CACHE_TTL = float(os.getenv("KB_CACHE_TTL", "3600"))
+    KB_EMBEDDING_CACHE_SIZE = int(os.getenv("KB_EMBEDDING_CACHE_SIZE", "2048"))
+    KB_EMBEDDING_CACHE_TTL = float(os.getenv("KB_EMBEDDING_CACHE_TTL", "86400"))
+    # "vector", "lexical" (BM25 only) or "hybrid" (BM25 when confident, else vector).
+    # BM25 indexes the texts.json of the local index export, or without one the
+    # chunk texts stored in the vector index metadata (read at warm-up).
+    KB_SEARCH_MODE = os.getenv("KB_SEARCH_MODE", "vector")
+    KB_LEXICAL_MIN_SCORE = float(os.getenv("KB_LEXICAL_MIN_SCORE", "3.0"))
+    # Fraction of the query's terms the best BM25 chunk must contain
+    KB_LEXICAL_MIN_COVERAGE = float(os.getenv("KB_LEXICAL_MIN_COVERAGE", "0.75"))
+    # Reuse cached results for queries within this cosine distance (0 disables)
+    KB_NEAR_DUPLICATE_DISTANCE = float(os.getenv("KB_NEAR_DUPLICATE_DISTANCE", "0"))
+
+    # Threads for the blocking boto3 and Pinecone calls; also sizes their HTTP pools
+    SERVICE_EXECUTOR_WORKERS = int(os.getenv("SERVICE_EXECUTOR_WORKERS", "32"))
+
+    # Startup warm-up: /ready fails until the backends have been exercised once.
+    # WARMUP_QUERIES (";"-separated) prime the policy search caches.
+    WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    WARMUP_QUERIES = [
+        q.strip()
+        for q in os.getenv(
+            "WARMUP_QUERIES",
+            "refund policy;late delivery compensation;damaged item return;"
+            "shipping delay",
+        ).split(";")
+        if q.strip()
+    ]
+    WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "30"))
+    WARMUP_RETRY_INTERVAL = float(os.getenv("WARMUP_RETRY_INTERVAL", "10"))
+
+    # Shared secret for the admin endpoints (/cache/invalidate, /cache/stats,
+    # /metrics), sent in the X-Admin-Token header; unset disables them
+    MCP_ADMIN_TOKEN = os.getenv("MCP_ADMIN_TOKEN") or None
+
+    # Point at DynamoDB Local (e.g. http://localhost:8001) for development and tests
+    DYNAMODB_ENDPOINT_URL = os.getenv("DYNAMODB_ENDPOINT_URL") or None
+    # Tracking lookups are coalesced over this window into one BatchGetItem
+    TRACKING_BATCH_WINDOW_MS = float(os.getenv("TRACKING_BATCH_WINDOW_MS", "5"))
+    DYNAMODB_BATCH_MAX_RETRIES = int(os.getenv("DYNAMODB_BATCH_MAX_RETRIES", "5"))
+    TRACKING_CACHE_SIZE = int(os.getenv("TRACKING_CACHE_SIZE", "4096"))
+    # Settled shipments rarely change; active ones are re-read quickly
+    TRACKING_CACHE_TTL_SETTLED = float(os.getenv("TRACKING_CACHE_TTL_SETTLED", "86400"))
+    TRACKING_CACHE_TTL_ACTIVE = float(os.getenv("TRACKING_CACHE_TTL_ACTIVE", "60"))
+    TRACKING_SETTLED_STATUSES = {"delivered", "returned", "cancelled"}
@@ -1,8 +1,20 @@
+import asyncio
+import functools
+import hmac
+from contextlib import asynccontextmanager
 from mcp.server.fastmcp import FastMCP
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, PlainTextResponse
 from starlette.routing import Route
-from .tools.tracking_tools import fetch_tracking_data
-from .tools.knowledge_tools import search_policy
+from .tools.tracking_tools import (
+    fetch_tracking_data,
+    fetch_tracking_data_batch,
+    tracking_service,
+)
+from .tools.knowledge_tools import search_policy, search_policy_multi, kb_service
+from .services.executor import blocking_executor
+from .services.metrics import metrics
+from .services.warmup import warmup
+from .config import Settings
 
 
 def create_server():
@@ -12,7 +24,9 @@ def create_server():
     )
 
     mcp.tool()(fetch_tracking_data)
+    mcp.tool()(fetch_tracking_data_batch)
     mcp.tool()(search_policy)
+    mcp.tool()(search_policy_multi)
 
     return mcp
 
@@ -21,12 +35,82 @@ async def health_check(request):
     return JSONResponse({"status": "healthy"})
 
 
+async def readiness_check(request):
+    """Passes only once the warm-up has opened every backend connection."""
+    return JSONResponse(
+        {"status": "ready" if warmup.ready else "warming", **warmup.stats()},
+        status_code=200 if warmup.ready else 503,
+    )
+
+
+def _is_admin(request) -> bool:
+    token = request.headers.get("X-Admin-Token", "")
+    return Settings.MCP_ADMIN_TOKEN is not None and hmac.compare_digest(
+        token.encode(), Settings.MCP_ADMIN_TOKEN.encode()
+    )
+
+
+def admin_only(endpoint):
+    """Reject requests without the MCP_ADMIN_TOKEN secret; the ALB is public."""
+
+    @functools.wraps(endpoint)
+    async def wrapper(request):
+        if not _is_admin(request):
+            return JSONResponse({"error": "forbidden"}, status_code=403)
+        return await endpoint(request)
+
+    return wrapper
+
+
+@admin_only
+async def cache_stats(request):
+    return JSONResponse(
+        {
+            "knowledge_base": kb_service.cache_stats(),
+            "tracking": tracking_service.stats(),
+            "executor": blocking_executor.stats(),
+        }
+    )
+
+
+@admin_only
+async def invalidate_cache(request):
+    """Hook for the indexer: cached search results are stale after a rebuild."""
+    # Re-reads the local index and rebuilds BM25, which may read Pinecone
+    await blocking_executor.run(kb_service.invalidate_cache)
+    return JSONResponse({"status": "invalidated"})
+
+
+@admin_only
+async def prometheus_metrics(request):
+    return PlainTextResponse(metrics.render())
+
+
 def get_app():
     server = create_server()
     app = server.streamable_http_app()
+    session_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(app):
+        async with session_lifespan(app):
+            # Warm up in the background so /health answers while /ready waits
+            task = asyncio.create_task(warmup.run(kb_service, tracking_service))
+            try:
+                yield
+            finally:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                blocking_executor.shutdown()
+
+    app.router.lifespan_context = lifespan
 
     # Add health check route
     app.routes.append(Route("/", health_check, methods=["GET"]))
     app.routes.append(Route("/health", health_check, methods=["GET"]))
+    app.routes.append(Route("/ready", readiness_check, methods=["GET"]))
+    app.routes.append(Route("/cache/stats", cache_stats, methods=["GET"]))
+    app.routes.append(Route("/cache/invalidate", invalidate_cache, methods=["POST"]))
+    app.routes.append(Route("/metrics", prometheus_metrics, methods=["GET"]))
 
     return app
@@ -0,0 +1,96 @@
+import asyncio
+
+
+class BatchLoader:
+    """DataLoader-style request coalescing.
+
+    Keys requested within ``window`` seconds of each other are deduplicated
+    and resolved by a single ``batch_fn(keys)`` call, which returns a mapping
+    of key to value (or to an exception for keys that failed). Keys already
+    in flight are joined instead of being fetched again.
+    """
+
+    def __init__(self, batch_fn, window: float = 0.005, max_batch_size: int = 100):
+        self._batch_fn = batch_fn
+        self._window = window
+        self._max_batch_size = max_batch_size
+        self._pending = {}
+        self._in_flight = {}
+        self._flush_handle = None
+        # The event loop only keeps weak references to tasks
+        self._tasks = set()
+        self.batches = 0
+        self.loads = 0
+        self.coalesced = 0
+
+    async def load(self, key):
+        self.loads += 1
+        future = self._in_flight.get(key) or self._pending.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[key] = future
+            if len(self._pending) >= self._max_batch_size:
+                self._dispatch()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self._window, self._dispatch)
+
+        # Shield so one cancelled caller does not cancel the shared lookup
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys) -> list:
+        return await asyncio.gather(*(self.load(key) for key in keys))
+
+    def stats(self) -> dict:
+        return {
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "avg_batch_size": (
+                (self.loads - self.coalesced) / self.batches if self.batches else 0.0
+            ),
+        }
+
+    def _dispatch(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, {}
+        if batch:
+            self._in_flight.update(batch)
+            self.batches += 1
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict):
+        try:
+            results = await self._batch_fn(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+        except BaseException:
+            # Cancelled (e.g. at shutdown): release the waiters, then propagate
+            for future in batch.values():
+                future.cancel()
+            raise
+        else:
+            for key, future in batch.items():
+                if future.done():
+                    continue
+                value = results.get(key)
+                if isinstance(value, Exception):
+                    future.set_exception(value)
+                else:
+                    future.set_result(value)
+        finally:
+            for key, future in batch.items():
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+                # Nobody may be awaiting a failed lookup any more
+                if future.done() and not future.cancelled():
+                    future.exception()
@@ -0,0 +1,49 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from ..config import Settings
+
+
+class BlockingExecutor:
+    """Bounded thread pool for the synchronous clients (boto3, Pinecone).
+
+    Keeps their network waits off the event loop. The pool is sized together
+    with the clients' HTTP connection pools, so a worker never queues for a
+    connection.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="mcp-io"
+        )
+        self.submitted = 0
+        self.active = 0
+        self.peak_active = 0
+
+    async def run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        self.submitted += 1
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            return await loop.run_in_executor(
+                self._pool, functools.partial(fn, *args, **kwargs)
+            )
+        finally:
+            self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "submitted": self.submitted,
+            "active": self.active,
+            "peak_active": self.peak_active,
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Global instance
+blocking_executor = BlockingExecutor(Settings.SERVICE_EXECUTOR_WORKERS)
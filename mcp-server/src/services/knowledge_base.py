@@ -1,19 +1,236 @@
-from langchain_pinecone import PineconeVectorStore
+import asyncio
+import logging
+import os
+import re
+import numpy as np
 from langchain_cohere import CohereEmbeddings
+from .cache import TTLCache
+from .executor import blocking_executor
+from .lexical_index import BM25Index
+from .metrics import metrics
+from .vector_index import TEXTS_FILE, create_vector_index
 from ..config import Settings
 
+logger = logging.getLogger(__name__)
+
 
 class KnowledgeBaseService:
     def __init__(self):
-        self.index_name = Settings.PINECONE_INDEX
-        self.vectorstore = None
         self.embeddings = CohereEmbeddings(model=Settings.COHERE_MODEL)
+        self.vector_index = create_vector_index(self.embeddings)
+        # BM25 over the chunk texts of the exported local index. Without an
+        # export the corpus is read from the vector index during warm-up.
+        self.lexical_index = BM25Index.from_file(self._texts_path())
+        if not len(self.lexical_index) and Settings.KB_SEARCH_MODE != "vector":
+            logger.warning(
+                "KB_SEARCH_MODE=%s but %s is missing or empty; building the BM25 "
+                "corpus from the vector index at warm-up, vector search until then",
+                Settings.KB_SEARCH_MODE, self._texts_path(),
+            )
+
+        # Exact layer: (normalized query, k) -> (query embedding or None, chunks)
+        self.result_cache = TTLCache(Settings.KB_CACHE_SIZE, Settings.KB_CACHE_TTL)
+        # Embedding layer: normalized query -> query embedding
+        self.embedding_cache = TTLCache(
+            Settings.KB_EMBEDDING_CACHE_SIZE, Settings.KB_EMBEDDING_CACHE_TTL
+        )
+        self.near_duplicate_hits = 0
+        self.near_duplicate_misses = 0
+        self.searches = 0
+        self.lexical_served = 0
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        return re.sub(r"\s+", " ", query).strip().rstrip("?.!").lower()
+
+    async def search(self, query: str, k: int = 3) -> str:
+        """Search the policy chunks according to KB_SEARCH_MODE.
+
+        ``vector`` embeds every query. ``lexical`` answers from BM25 alone.
+        ``hybrid`` answers from BM25 when its best hit is confident and falls
+        back to a vector search otherwise.
+
+        Only the network calls yield: the query is embedded with Cohere's
+        async client and the vector search runs on the blocking executor.
+        """
+        (chunks,) = await self._search_chunks([self.normalize_query(query)], k)
+        return "\n\n".join(chunks)
+
+    async def search_multi(self, queries: list[str], k: int = 3) -> str:
+        """Search several questions at once and merge the hits.
 
-    def search(self, query: str, k: int = 3) -> str:
-        if not self.vectorstore:
-            self.vectorstore = PineconeVectorStore.from_existing_index(
-                self.index_name, self.embeddings
+        Uncached queries are embedded in a single Cohere call and searched
+        concurrently; a chunk returned for more than one query appears once.
+        """
+        normalized = list(
+            dict.fromkeys(self.normalize_query(q) for q in queries if q.strip())
+        )
+        merged = dict.fromkeys(
+            chunk
+            for chunks in await self._search_chunks(normalized, k)
+            for chunk in chunks
+        )
+        return "\n\n".join(merged)
+
+    async def _search_chunks(self, queries: list[str], k: int) -> list[list[str]]:
+        """Top-k chunks for each normalized query, in order."""
+        results = {}
+        to_embed = []
+        for query in queries:
+            self.searches += 1
+            cached = self.result_cache.get((query, k))
+            if cached is not None:
+                results[query] = cached[1]
+                continue
+
+            chunks = self._lexical_search(query, k)
+            if chunks is not None:
+                self.lexical_served += 1
+                self.result_cache.set((query, k), (None, chunks))
+                results[query] = chunks
+                continue
+
+            if query not in to_embed:
+                to_embed.append(query)
+
+        async def vector_search(query: str, embedding: list[float]) -> list[str]:
+            chunks = self._find_near_duplicate(embedding, k)
+            if chunks is None:
+                with metrics.span("vector_search", backend=Settings.VECTOR_BACKEND):
+                    chunks = await blocking_executor.run(
+                        self.vector_index.search, embedding, k
+                    )
+            self.result_cache.set((query, k), (embedding, chunks))
+            return chunks
+
+        if to_embed:
+            embeddings = await self._embed_queries(to_embed)
+            found = await asyncio.gather(
+                *(vector_search(q, e) for q, e in zip(to_embed, embeddings))
             )
-        
-        docs = self.vectorstore.similarity_search(query, k=k)
-        return "\n\n".join([doc.page_content for doc in docs])
+            results.update(zip(to_embed, found))
+        return [results[query] for query in queries]
+
+    async def warm_up(self, queries: list[str]):
+        """Open the vector index connection and prime the caches with ``queries``.
+
+        The queries go through the normal search path, so the Cohere client
+        and, outside lexical mode, the vector search are exercised too.
+        """
+        await blocking_executor.run(self.vector_index.warm_up)
+        if not len(self.lexical_index) and Settings.KB_SEARCH_MODE != "vector":
+            self.lexical_index = await blocking_executor.run(self._load_lexical_index)
+        if queries:
+            await self.search_multi(queries)
+
+    def invalidate_cache(self):
+        """Drop cached search results; call after the index is rebuilt.
+
+        Query embeddings only depend on the embedding model, so they are kept.
+        A local index is re-read from disk, and BM25 is rebuilt.
+        """
+        self.vector_index.reload()
+        self.lexical_index = self._load_lexical_index()
+        self.result_cache.clear()
+
+    def cache_stats(self) -> dict:
+        near_lookups = self.near_duplicate_hits + self.near_duplicate_misses
+        return {
+            "query": self.result_cache.stats(),
+            "embedding": self.embedding_cache.stats(),
+            "near_duplicate": {
+                "enabled": Settings.KB_NEAR_DUPLICATE_DISTANCE > 0,
+                "hits": self.near_duplicate_hits,
+                "misses": self.near_duplicate_misses,
+                "hit_rate": (
+                    self.near_duplicate_hits / near_lookups if near_lookups else 0.0
+                ),
+            },
+            "lexical": {
+                "mode": Settings.KB_SEARCH_MODE,
+                "chunks": len(self.lexical_index),
+                "served": self.lexical_served,
+                "served_fraction": (
+                    self.lexical_served / self.searches if self.searches else 0.0
+                ),
+            },
+        }
+
+    @staticmethod
+    def _texts_path() -> str:
+        return os.path.join(Settings.LOCAL_INDEX_PATH, TEXTS_FILE)
+
+    def _load_lexical_index(self) -> BM25Index:
+        """BM25 over texts.json, else over the vector index's chunk metadata.
+
+        Blocking: reading the Pinecone metadata lists and fetches every vector.
+        """
+        index = BM25Index.from_file(self._texts_path())
+        if len(index) or Settings.KB_SEARCH_MODE == "vector":
+            return index
+
+        index = BM25Index(self.vector_index.chunk_texts())
+        if len(index):
+            logger.info("Built the BM25 corpus from %d vector index chunks", len(index))
+        else:
+            logger.warning(
+                "KB_SEARCH_MODE=%s but the vector index has no chunk texts; "
+                "using vector search",
+                Settings.KB_SEARCH_MODE,
+            )
+        return index
+
+    def _lexical_search(self, normalized: str, k: int) -> list[str] | None:
+        mode = Settings.KB_SEARCH_MODE
+        # Without an exported corpus BM25 would answer every query with nothing
+        if mode == "vector" or not len(self.lexical_index):
+            return None
+
+        hits = self.lexical_index.search(normalized, k)
+        if mode == "hybrid":
+            if not hits:
+                return None
+            _, score, coverage = hits[0]
+            if (
+                score < Settings.KB_LEXICAL_MIN_SCORE
+                or coverage < Settings.KB_LEXICAL_MIN_COVERAGE
+            ):
+                return None
+
+        return [self.lexical_index.texts[doc_id] for doc_id, _, _ in hits]
+
+    async def _embed_queries(self, queries: list[str]) -> list[list[float]]:
+        """Embeddings for ``queries``; the uncached ones share one Cohere call."""
+        embeddings = {q: self.embedding_cache.get(q) for q in queries}
+        missing = [q for q, embedding in embeddings.items() if embedding is None]
+        if missing:
+            with metrics.span("embedding_call", op="embed_queries"):
+                fetched = await self.embeddings.aembed(missing, input_type="search_query")
+            for query, embedding in zip(missing, fetched):
+                self.embedding_cache.set(query, embedding)
+                embeddings[query] = embedding
+        return [embeddings[q] for q in queries]
+
+    def _find_near_duplicate(self, embedding: list[float], k: int) -> list[str] | None:
+        max_distance = Settings.KB_NEAR_DUPLICATE_DISTANCE
+        if max_distance <= 0:
+            return None
+
+        entries = [
+            (cached_embedding, result)
+            for (_, cached_k), (cached_embedding, result) in self.result_cache.items()
+            if cached_k == k and cached_embedding is not None
+        ]
+        if entries:
+            matrix = np.asarray([e for e, _ in entries], dtype=np.float32)
+            query = np.asarray(embedding, dtype=np.float32)
+            similarity = matrix @ query / (
+                np.linalg.norm(matrix, axis=1) * np.linalg.norm(query) + 1e-12
+            )
+            best = int(np.argmax(similarity))
+            if 1.0 - similarity[best] <= max_distance:
+                self.near_duplicate_hits += 1
+                return entries[best][1]
+
+        self.near_duplicate_misses += 1
+        return None
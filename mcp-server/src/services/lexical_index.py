@@ -0,0 +1,76 @@
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i if in is it my of on "
+    "or our the this to was what when where which who why will with you your".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 over the policy chunks, backed by an inverted index."""
+
+    def __init__(self, texts: list[str], k1: float = 1.5, b: float = 0.75):
+        self.texts = texts
+        self.k1 = k1
+        self.b = b
+        self._postings = defaultdict(list)
+        self._doc_lengths = []
+        for doc_id, text in enumerate(texts):
+            terms = Counter(tokenize(text))
+            self._doc_lengths.append(sum(terms.values()))
+            for term, tf in terms.items():
+                self._postings[term].append((doc_id, tf))
+
+        n = len(texts)
+        self._avg_length = sum(self._doc_lengths) / n if n else 0.0
+        self._idf = {
+            term: math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    @classmethod
+    def from_file(cls, path: str) -> "BM25Index":
+        """Load chunk texts from a JSON list, e.g. a local index's texts.json."""
+        if not os.path.exists(path):
+            return cls([])
+        with open(path, "r") as f:
+            return cls(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def search(self, query: str, k: int) -> list[tuple[int, float, float]]:
+        """Top-k (doc id, score, coverage) hits.
+
+        Coverage is the fraction of distinct query terms found in the chunk.
+        """
+        terms = set(tokenize(query))
+        if not terms or not self.texts:
+            return []
+
+        scores = defaultdict(float)
+        matched = defaultdict(int)
+        for term in terms:
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, tf in self._postings[term]:
+                # _avg_length is 0.0 when every chunk is empty
+                relative_length = (
+                    self._doc_lengths[doc_id] / self._avg_length if self._avg_length else 0.0
+                )
+                norm = 1 - self.b + self.b * relative_length
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+                matched[doc_id] += 1
+
+        top = sorted(scores, key=scores.get, reverse=True)[:k]
+        return [(doc_id, scores[doc_id], matched[doc_id] / len(terms)) for doc_id in top]
@@ -1,20 +1,120 @@
+import asyncio
+import copy
+import random
+import time
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
+from .batch_loader import BatchLoader
+from .cache import TTLCache
+from .executor import blocking_executor
+from .metrics import metrics
 from ..config import Settings
 
+# DynamoDB caps BatchGetItem at 100 keys per request
+BATCH_GET_MAX_KEYS = 100
+# Looked up at startup to open the connection; it need not exist
+WARMUP_PROBE_KEY = "warmup-probe"
+
 
 class TrackingService:
     def __init__(self):
-        self.dynamodb = boto3.resource("dynamodb", region_name=Settings.AWS_REGION)
+        self.dynamodb = boto3.resource(
+            "dynamodb",
+            region_name=Settings.AWS_REGION,
+            endpoint_url=Settings.DYNAMODB_ENDPOINT_URL,
+            # botocore defaults to 10 connections, fewer than the executor's threads
+            config=Config(max_pool_connections=Settings.SERVICE_EXECUTOR_WORKERS),
+        )
         self.table = self.dynamodb.Table(Settings.DYNAMODB_TABLE)
+        self.cache = TTLCache(
+            Settings.TRACKING_CACHE_SIZE, Settings.TRACKING_CACHE_TTL_ACTIVE
+        )
+        self.loader = BatchLoader(
+            self._load_batch,
+            window=Settings.TRACKING_BATCH_WINDOW_MS / 1000,
+            max_batch_size=BATCH_GET_MAX_KEYS,
+        )
+
+    async def get_tracking_info(self, tracking_number: str) -> dict:
+        """The tracking item, or an ``error`` dict.
+
+        Returns a copy, so callers may modify it without touching the cache or
+        other callers sharing the same lookup.
+        """
+        item = self.cache.get(tracking_number)
+        if item is not None:
+            return copy.deepcopy(item)
 
-    def get_tracking_info(self, tracking_number: str) -> dict:
         try:
-            response = self.table.get_item(Key={"tracking_number": tracking_number})
-            
-            if "Item" not in response:
-                return {"error": "Tracking number not found"}
-            
-            return response["Item"]
+            item = await self.loader.load(tracking_number)
         except ClientError as e:
             return {"error": f"Database error: {e.response['Error']['Message']}"}
+        except Exception as e:
+            return {"error": f"Database error: {e}"}
+
+        if item is None:
+            return {"error": "Tracking number not found"}
+
+        self.cache.set(tracking_number, item, ttl=self._cache_ttl(item))
+        return copy.deepcopy(item)
+
+    async def get_tracking_info_batch(self, tracking_numbers: list[str]) -> dict:
+        """tracking_number -> item or error, for each distinct number.
+
+        Concurrent lookups coalesce in the batch loader, so uncached numbers
+        are read with a single BatchGetItem (per 100 keys).
+        """
+        unique = list(dict.fromkeys(tn.strip() for tn in tracking_numbers if tn.strip()))
+        items = await asyncio.gather(*(self.get_tracking_info(tn) for tn in unique))
+        return dict(zip(unique, items))
+
+    async def warm_up(self):
+        """Open the DynamoDB connection and check credentials and table access."""
+        await self._load_batch([WARMUP_PROBE_KEY])
+
+    def stats(self) -> dict:
+        return {"cache": self.cache.stats(), "batcher": self.loader.stats()}
+
+    @staticmethod
+    def _cache_ttl(item: dict) -> float:
+        status = str(item.get("status", "")).strip().lower()
+        if status in Settings.TRACKING_SETTLED_STATUSES:
+            return Settings.TRACKING_CACHE_TTL_SETTLED
+        return Settings.TRACKING_CACHE_TTL_ACTIVE
+
+    async def _load_batch(self, tracking_numbers: list[str]) -> dict:
+        return await blocking_executor.run(self.batch_get_items, tracking_numbers)
+
+    def batch_get_items(self, tracking_numbers: list[str]) -> dict:
+        """BatchGetItem with jittered exponential backoff on UnprocessedKeys.
+
+        Returns tracking_number -> item for found keys; keys still unprocessed
+        after the last retry map to an exception.
+        """
+        table_name = self.table.name
+        items = {}
+        request = {
+            table_name: {
+                "Keys": [{"tracking_number": tn} for tn in tracking_numbers]
+            }
+        }
+
+        for attempt in range(Settings.DYNAMODB_BATCH_MAX_RETRIES + 1):
+            if attempt:
+                time.sleep(random.uniform(0, min(0.05 * 2**attempt, 1.0)))
+
+            with metrics.span("dynamodb_call", op="batch_get_item"):
+                response = self.dynamodb.batch_get_item(RequestItems=request)
+            for item in response.get("Responses", {}).get(table_name, []):
+                items[item["tracking_number"]] = item
+
+            request = response.get("UnprocessedKeys")
+            if not request:
+                return items
+
+        for key in request[table_name]["Keys"]:
+            items[key["tracking_number"]] = RuntimeError(
+                "Lookup throttled, please retry"
+            )
+        return items
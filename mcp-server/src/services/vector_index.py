@@ -0,0 +1,190 @@
+"""Vector index backends for policy search.
+
+The policy corpus is a few hundred chunks, so besides Pinecone it can be
+served from an in-process flat index: exact cosine top-k over a matrix of
+unit-normalized embeddings, optionally int8-quantized. The matrix is
+memory-mapped, so every worker process on a host shares one copy through the
+page cache.
+
+Export the Pinecone index to a local one from mcp-server/:
+
+    python -m src.services.vector_index export [--int8]
+"""
+
+import argparse
+import json
+import logging
+import os
+import numpy as np
+from langchain_pinecone import PineconeVectorStore
+from pinecone import Pinecone
+from ..config import Settings
+
+VECTORS_FILE = "vectors.npy"
+SCALES_FILE = "scales.npy"
+TEXTS_FILE = "texts.json"
+
+logger = logging.getLogger(__name__)
+
+
+class PineconeVectorIndex:
+    def __init__(self, index_name: str, embeddings):
+        self.index_name = index_name
+        self.embeddings = embeddings
+        self.index = None
+        self.vectorstore = None
+
+    def search(self, embedding: list[float], k: int) -> list[str]:
+        docs = self._get_vectorstore().similarity_search_by_vector(embedding, k=k)
+        return [doc.page_content for doc in docs]
+
+    def reload(self):
+        pass
+
+    def warm_up(self):
+        """Resolve the index host and open its HTTPS connection."""
+        self._get_vectorstore()
+        self.index.describe_index_stats()
+
+    def chunk_texts(self) -> list[str]:
+        """Every chunk's text, from the vector metadata the indexer writes."""
+        self._get_vectorstore()
+        return [text for _, text in _fetch_all(self.index)]
+
+    def _get_vectorstore(self) -> PineconeVectorStore:
+        if not self.vectorstore:
+            # Searches run on the blocking executor; give each thread a connection
+            self.index = Pinecone().Index(
+                self.index_name,
+                connection_pool_maxsize=Settings.SERVICE_EXECUTOR_WORKERS,
+            )
+            self.vectorstore = PineconeVectorStore(
+                index=self.index, embedding=self.embeddings
+            )
+        return self.vectorstore
+
+
+class LocalVectorIndex:
+    """Exact cosine top-k over a memory-mapped embedding matrix.
+
+    ``vectors.npy`` holds unit-normalized rows as float32, or as int8 with a
+    per-row scale in ``scales.npy``; int8 is a quarter of the size but is
+    widened for each search, so it is slower. Chunk texts live in
+    ``texts.json``.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.vectors = None
+        self.scales = None
+        self.texts = []
+        self.reload()
+
+    def reload(self):
+        """Re-open the index files, e.g. after a new export."""
+        self.vectors = np.load(os.path.join(self.path, VECTORS_FILE), mmap_mode="r")
+        scales_path = os.path.join(self.path, SCALES_FILE)
+        self.scales = np.load(scales_path) if os.path.exists(scales_path) else None
+        with open(os.path.join(self.path, TEXTS_FILE), "r") as f:
+            self.texts = json.load(f)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def warm_up(self):
+        """Fault the memory-mapped vectors into the page cache."""
+        np.asarray(self.vectors).sum()
+
+    def chunk_texts(self) -> list[str]:
+        return list(self.texts)
+
+    def search(self, embedding: list[float], k: int) -> list[str]:
+        # asarray returns a float32 caller's array as is, so don't normalize in place
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) + 1e-12)
+
+        scores = self.vectors @ query
+        if self.scales is not None:
+            scores *= self.scales
+
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [self.texts[i] for i in top]
+
+    @staticmethod
+    def build(path: str, embeddings, texts: list[str], quantize: bool = False):
+        """Write an index directory from raw embeddings and their texts."""
+        if len(embeddings) != len(texts):
+            raise ValueError("embeddings and texts must have the same length")
+
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+
+        os.makedirs(path, exist_ok=True)
+        scales_path = os.path.join(path, SCALES_FILE)
+        if quantize:
+            scales = np.abs(matrix).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            matrix = np.round(matrix / scales[:, None]).astype(np.int8)
+            _save_atomic(scales_path, lambda f: np.save(f, scales.astype(np.float32)))
+        elif os.path.exists(scales_path):
+            os.remove(scales_path)
+
+        _save_atomic(os.path.join(path, VECTORS_FILE), lambda f: np.save(f, matrix))
+        _save_atomic(os.path.join(path, TEXTS_FILE), lambda f: f.write(json.dumps(texts).encode()))
+
+
+def _save_atomic(path: str, write):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def create_vector_index(embeddings):
+    """Return the vector index selected by Settings.VECTOR_BACKEND."""
+    if Settings.VECTOR_BACKEND == "local":
+        return LocalVectorIndex(Settings.LOCAL_INDEX_PATH)
+    if Settings.VECTOR_BACKEND == "pinecone":
+        return PineconeVectorIndex(Settings.PINECONE_INDEX, embeddings)
+    raise ValueError(f"Unknown VECTOR_BACKEND: {Settings.VECTOR_BACKEND}")
+
+
+def _fetch_all(index):
+    """Yield (values, text) for every vector of a serverless Pinecone index."""
+    for ids in index.list():
+        fetched = index.fetch(ids=ids)
+        for vector in fetched.vectors.values():
+            yield vector.values, (vector.metadata or {}).get("text", "")
+
+
+def export_pinecone_index(index_name: str, path: str, quantize: bool = False) -> int:
+    """Copy every vector and its text from Pinecone into a local index."""
+    embeddings, texts = [], []
+    for values, text in _fetch_all(Pinecone().Index(index_name)):
+        embeddings.append(values)
+        texts.append(text)
+
+    LocalVectorIndex.build(path, embeddings, texts, quantize=quantize)
+    return len(texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the local policy vector index")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    export = subcommands.add_parser("export", help="export the Pinecone index")
+    export.add_argument("--index", default=Settings.PINECONE_INDEX)
+    export.add_argument("--path", default=Settings.LOCAL_INDEX_PATH)
+    export.add_argument("--int8", action="store_true", help="store int8-quantized vectors")
+    args = parser.parse_args()
+    logging.basicConfig(level=Settings.LOG_LEVEL)
+
+    count = export_pinecone_index(args.index, args.path, quantize=args.int8)
+    logger.info("Exported %d vectors from %s to %s", count, args.index, args.path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import time
+from .metrics import metrics
+from ..config import Settings
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """Startup warm-up of the service connections, reported by /ready.
+
+    Opens the DynamoDB and Pinecone/Cohere connections and primes the policy
+    search caches. Failed attempts are retried until one succeeds; until then
+    the task stays out of the load balancer.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.attempts = 0
+        self.error = None
+        self.steps_ms = {}
+        self.ready_after_s = None
+        self._started = time.monotonic()
+
+    async def run(self, kb_service, tracking_service):
+        if not Settings.WARMUP_ENABLED:
+            self._mark_ready()
+            return
+
+        while True:
+            self.attempts += 1
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(
+                        self._step("dynamodb", tracking_service.warm_up()),
+                        self._step(
+                            "knowledge_base", kb_service.warm_up(Settings.WARMUP_QUERIES)
+                        ),
+                    ),
+                    Settings.WARMUP_TIMEOUT,
+                )
+            except Exception as e:
+                self.error = str(e) or type(e).__name__
+                logger.warning("Warm-up attempt %d failed: %s", self.attempts, self.error)
+                await asyncio.sleep(Settings.WARMUP_RETRY_INTERVAL)
+            else:
+                self._mark_ready()
+                logger.info(
+                    "Warm-up finished after %.1fs: %s", self.ready_after_s, self.steps_ms
+                )
+                return
+
+    async def _step(self, name: str, warm):
+        started = time.perf_counter()
+        with metrics.span("warmup", step=name):
+            await warm
+        self.steps_ms[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    def _mark_ready(self):
+        self.ready = True
+        self.error = None
+        self.ready_after_s = round(time.monotonic() - self._started, 3)
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "attempts": self.attempts,
+            "error": self.error,
+            "steps_ms": self.steps_ms,
+            "ready_after_s": self.ready_after_s,
+        }
+
+
+# Global instance
+warmup = Warmup()
@@ -1,4 +1,9 @@
-from .tracking_tools import fetch_tracking_data
-from .knowledge_tools import search_policy
+from .tracking_tools import fetch_tracking_data, fetch_tracking_data_batch
+from .knowledge_tools import search_policy, search_policy_multi
 
-__all__ = ["fetch_tracking_data", "search_policy"]
+__all__ = [
+    "fetch_tracking_data",
+    "fetch_tracking_data_batch",
+    "search_policy",
+    "search_policy_multi",
+]
@@ -1,11 +1,26 @@
 from ..services import KnowledgeBaseService
+from ..services.metrics import metrics
 
 kb_service = KnowledgeBaseService()
 
 
 async def search_policy(query: str) -> str:
     """Search company policy and knowledge base for relevant information."""
-    try:
-        return kb_service.search(query)
-    except Exception as e:
-        return f"Search error: {str(e)}"
+    with metrics.span("tool_call", tool="search_policy"):
+        try:
+            return await kb_service.search(query)
+        except Exception as e:
+            return f"Search error: {str(e)}"
+
+
+async def search_policy_multi(queries: list[str]) -> str:
+    """Search company policy for several distinct questions in one call.
+
+    Matching sections are merged and returned once, even when several
+    questions hit them.
+    """
+    with metrics.span("tool_call", tool="search_policy_multi"):
+        try:
+            return await kb_service.search_multi(queries)
+        except Exception as e:
+            return f"Search error: {str(e)}"
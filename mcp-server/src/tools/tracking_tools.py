@@ -1,7 +1,18 @@
 from ..services import TrackingService
+from ..services.metrics import metrics
 
 tracking_service = TrackingService()
 
 async def fetch_tracking_data(tracking_number: str) -> dict:
     """Fetch tracking information from shipping API."""
-    return tracking_service.get_tracking_info(tracking_number)
+    with metrics.span("tool_call", tool="fetch_tracking_data"):
+        return await tracking_service.get_tracking_info(tracking_number)
+
+
+async def fetch_tracking_data_batch(tracking_numbers: list[str]) -> dict:
+    """Fetch tracking information for several tracking numbers in one call.
+
+    Returns a mapping of tracking number to its tracking data or error.
+    """
+    with metrics.span("tool_call", tool="fetch_tracking_data_batch"):
+        return await tracking_service.get_tracking_info_batch(tracking_numbers)
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from src.services.batch_loader import BatchLoader
+
+
+def test_cancelled_batch_releases_its_waiters():
+    started = asyncio.Event()
+
+    async def batch_fn(keys):
+        started.set()
+        await asyncio.sleep(60)
+
+    async def run():
+        loader = BatchLoader(batch_fn, window=0)
+        waiters = [asyncio.create_task(loader.load(key)) for key in ("a", "b", "a")]
+        await started.wait()
+
+        (task,) = loader._tasks
+        task.cancel()
+        results = await asyncio.wait_for(
+            asyncio.gather(*waiters, return_exceptions=True), timeout=1
+        )
+        return loader, results
+
+    loader, results = asyncio.run(run())
+
+    assert [type(result) for result in results] == [asyncio.CancelledError] * 3
+    assert loader._in_flight == {}
+    assert loader._tasks == set()
+
+
+def test_failed_batch_fails_every_waiter():
+    async def batch_fn(keys):
+        raise ConnectionError("DynamoDB unreachable")
+
+    async def run():
+        loader = BatchLoader(batch_fn, window=0)
+        return await asyncio.gather(
+            loader.load("a"), loader.load("b"), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+
+    assert [str(result) for result in results] == ["DynamoDB unreachable"] * 2
+
+
+def test_keys_are_retried_after_a_cancelled_batch():
+    calls = []
+
+    async def batch_fn(keys):
+        calls.append(keys)
+        if len(calls) == 1:
+            await asyncio.sleep(60)
+        return {key: key.upper() for key in keys}
+
+    async def run():
+        loader = BatchLoader(batch_fn, window=0)
+        first = asyncio.create_task(loader.load("a"))
+        await asyncio.sleep(0.01)
+        (task,) = loader._tasks
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(first, timeout=1)
+        return await loader.load("a")
+
+    assert asyncio.run(run()) == "A"
+    assert calls == [["a"], ["a"]]
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+
+import pytest
+
+from src.config import Settings
+from src.services import knowledge_base
+from src.services.knowledge_base import KnowledgeBaseService
+
+CHUNKS = [
+    "Refunds are issued within 14 days of receiving the return.",
+    "Standard shipping takes 3 to 5 business days.",
+    "Damaged items can be exchanged free of charge.",
+]
+
+
+class FakeVectorIndex:
+    """A vector backend without a texts.json export, like Pinecone."""
+
+    def __init__(self):
+        self.searches = 0
+
+    def warm_up(self):
+        pass
+
+    def reload(self):
+        pass
+
+    def chunk_texts(self):
+        return list(CHUNKS)
+
+    def search(self, embedding, k):
+        self.searches += 1
+        return CHUNKS[:k]
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.calls = 0
+
+    async def aembed(self, texts, input_type):
+        self.calls += 1
+        return [[1.0, 0.0] for _ in texts]
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    monkeypatch.setenv("COHERE_API_KEY", "testing")
+    monkeypatch.setattr(Settings, "KB_SEARCH_MODE", "hybrid")
+    # BM25 scores stay low over a three-chunk corpus
+    monkeypatch.setattr(Settings, "KB_LEXICAL_MIN_SCORE", 0.5)
+    monkeypatch.setattr(Settings, "LOCAL_INDEX_PATH", str(tmp_path))
+    monkeypatch.setattr(knowledge_base, "create_vector_index", lambda e: FakeVectorIndex())
+    return KnowledgeBaseService
+
+
+def test_hybrid_without_export_warns_and_builds_corpus_at_warm_up(service, caplog):
+    with caplog.at_level(logging.WARNING, logger=knowledge_base.__name__):
+        kb = service()
+    assert len(kb.lexical_index) == 0
+    assert "texts.json is missing or empty" in caplog.text
+
+    kb.embeddings = FakeEmbeddings()
+    asyncio.run(kb.warm_up([]))
+    result = asyncio.run(kb.search("refunds for a return", k=1))
+
+    assert len(kb.lexical_index) == len(CHUNKS)
+    assert result == CHUNKS[0]
+    assert (kb.lexical_served, kb.embeddings.calls, kb.vector_index.searches) == (1, 0, 0)
+
+
+def test_vector_mode_does_not_read_the_corpus(service, monkeypatch, caplog):
+    monkeypatch.setattr(Settings, "KB_SEARCH_MODE", "vector")
+
+    with caplog.at_level(logging.WARNING, logger=knowledge_base.__name__):
+        kb = service()
+        asyncio.run(kb.warm_up([]))
+
+    assert len(kb.lexical_index) == 0
+    assert caplog.text == ""
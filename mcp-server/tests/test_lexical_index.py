@@ -0,0 +1,21 @@
+from src.services.lexical_index import BM25Index
+
+
+def test_ranks_matching_chunk_first():
+    index = BM25Index(
+        [
+            "Refunds are issued within 14 days of receiving the return.",
+            "Standard shipping takes 3 to 5 business days.",
+        ]
+    )
+
+    doc_id, score, coverage = index.search("refunds for a return", k=1)[0]
+
+    assert doc_id == 0
+    assert score > 0
+    assert coverage == 1.0
+
+
+def test_empty_corpus_returns_no_hits():
+    assert BM25Index([]).search("refund", k=3) == []
+    assert BM25Index(["", "   "]).search("refund", k=3) == []
@@ -0,0 +1,118 @@
+import asyncio
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src.config import Settings
+from src.services.tracking import TrackingService
+
+
+class FlakyBatchGet:
+    """Wraps the DynamoDB resource; BatchGetItem leaves some keys unprocessed.
+
+    ``unprocessed`` lists how many keys each successive call leaves behind,
+    the way DynamoDB does when a request exceeds provisioned throughput.
+    """
+
+    def __init__(self, dynamodb, unprocessed):
+        self._dynamodb = dynamodb
+        self.unprocessed = list(unprocessed)
+        self.requests = []
+
+    def batch_get_item(self, RequestItems):
+        (table_name, request), = RequestItems.items()
+        keys = request["Keys"]
+        self.requests.append([key["tracking_number"] for key in keys])
+        held_back = self.unprocessed.pop(0) if self.unprocessed else 0
+        served, deferred = keys[: len(keys) - held_back], keys[len(keys) - held_back :]
+
+        response = {"Responses": {table_name: []}}
+        if served:
+            response = self._dynamodb.batch_get_item(
+                RequestItems={table_name: {"Keys": served}}
+            )
+        if deferred:
+            response["UnprocessedKeys"] = {table_name: {"Keys": deferred}}
+        return response
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setattr(Settings, "DYNAMODB_ENDPOINT_URL", None)
+    monkeypatch.setattr(Settings, "DYNAMODB_BATCH_MAX_RETRIES", 2)
+    monkeypatch.setattr(Settings, "TRACKING_BATCH_WINDOW_MS", 20)
+
+    with mock_aws():
+        table = boto3.resource("dynamodb", region_name=Settings.AWS_REGION).create_table(
+            TableName=Settings.DYNAMODB_TABLE,
+            KeySchema=[{"AttributeName": "tracking_number", "KeyType": "HASH"}],
+            AttributeDefinitions=[
+                {"AttributeName": "tracking_number", "AttributeType": "S"}
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        for i in range(5):
+            table.put_item(
+                Item={
+                    "tracking_number": f"TRK{i}",
+                    "status": "In Transit",
+                    "events": ["Picked up"],
+                }
+            )
+        yield TrackingService()
+
+
+def test_concurrent_lookups_share_one_batch_get(service):
+    flaky = FlakyBatchGet(service.dynamodb, unprocessed=[])
+    service.dynamodb = flaky
+
+    async def run():
+        return await asyncio.gather(
+            *(service.get_tracking_info(tn) for tn in ["TRK0", "TRK1", "TRK1", "TRK2"])
+        )
+
+    results = asyncio.run(run())
+
+    assert [r["tracking_number"] for r in results] == ["TRK0", "TRK1", "TRK1", "TRK2"]
+    assert flaky.requests == [["TRK0", "TRK1", "TRK2"]]
+    assert service.loader.stats()["coalesced"] == 1
+
+
+def test_unprocessed_keys_are_retried(service):
+    flaky = FlakyBatchGet(service.dynamodb, unprocessed=[2, 1])
+    service.dynamodb = flaky
+
+    results = asyncio.run(service.get_tracking_info_batch(["TRK0", "TRK1", "TRK2"]))
+
+    assert all(result["status"] == "In Transit" for result in results.values())
+    assert [len(keys) for keys in flaky.requests] == [3, 2, 1]
+
+
+def test_errors_are_reported_per_key(service):
+    # Every attempt leaves one key unprocessed, so it runs out of retries
+    flaky = FlakyBatchGet(service.dynamodb, unprocessed=[1, 1, 1])
+    service.dynamodb = flaky
+
+    results = asyncio.run(
+        service.get_tracking_info_batch(["TRK0", "MISSING", "TRK1"])
+    )
+
+    assert results["TRK0"]["status"] == "In Transit"
+    assert results["MISSING"] == {"error": "Tracking number not found"}
+    assert results["TRK1"]["error"].endswith("Lookup throttled, please retry")
+
+
+def test_callers_get_their_own_copy(service):
+    async def run():
+        first = await service.get_tracking_info("TRK0")
+        first["events"].append("Tampered")
+        first["status"] = "Delivered"
+        return await service.get_tracking_info("TRK0")
+
+    second = asyncio.run(run())
+
+    assert second["status"] == "In Transit"
+    assert second["events"] == ["Picked up"]
@@ -0,0 +1,111 @@
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.services import vector_index
+from src.services.vector_index import LocalVectorIndex
+
+DIM = 64
+COUNT = 300
+K = 5
+
+
+class FakePineconeIndex:
+    """The list/fetch subset of a Pinecone serverless index."""
+
+    def __init__(self, embeddings, texts, page_size=100):
+        self.records = {
+            f"chunk-{i}": SimpleNamespace(values=list(map(float, v)), metadata={"text": t})
+            for i, (v, t) in enumerate(zip(embeddings, texts))
+        }
+        self.page_size = page_size
+
+    def list(self):
+        ids = list(self.records)
+        for i in range(0, len(ids), self.page_size):
+            yield ids[i : i + self.page_size]
+
+    def fetch(self, ids):
+        return SimpleNamespace(vectors={i: self.records[i] for i in ids})
+
+
+@pytest.fixture
+def corpus():
+    rng = np.random.default_rng(7)
+    embeddings = rng.normal(size=(COUNT, DIM)).astype(np.float32)
+    texts = [f"policy chunk {i}" for i in range(COUNT)]
+    queries = rng.normal(size=(20, DIM)).astype(np.float32)
+    return embeddings, texts, queries
+
+
+def _brute_force(embeddings, texts, query, k):
+    unit = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    scores = unit @ (query / np.linalg.norm(query))
+    return [texts[i] for i in np.argsort(-scores)[:k]]
+
+
+def _export(monkeypatch, path, embeddings, texts, *flags):
+    index = FakePineconeIndex(embeddings, texts)
+    monkeypatch.setattr(
+        vector_index, "Pinecone", lambda: SimpleNamespace(Index=lambda name: index)
+    )
+    monkeypatch.setattr(
+        sys, "argv", ["vector_index", "export", "--path", str(path), *flags]
+    )
+    vector_index.main()
+
+
+def test_float32_export_matches_brute_force(monkeypatch, tmp_path, corpus):
+    embeddings, texts, queries = corpus
+    _export(monkeypatch, tmp_path, embeddings, texts)
+
+    index = LocalVectorIndex(str(tmp_path))
+
+    assert len(index) == COUNT
+    assert isinstance(index.vectors, np.memmap)
+    assert index.vectors.dtype == np.float32
+    assert index.scales is None
+    for query in queries:
+        assert index.search(query, K) == _brute_force(embeddings, texts, query, K)
+
+
+def test_int8_export_matches_brute_force(monkeypatch, tmp_path, corpus):
+    embeddings, texts, queries = corpus
+    _export(monkeypatch, tmp_path, embeddings, texts, "--int8")
+
+    index = LocalVectorIndex(str(tmp_path))
+
+    assert isinstance(index.vectors, np.memmap)
+    assert index.vectors.dtype == np.int8
+    assert index.scales.shape == (COUNT,)
+    # Quantization may swap near-ties, so compare the sets and the best match
+    found = 0
+    for query in queries:
+        results = index.search(query, K)
+        expected = _brute_force(embeddings, texts, query, K)
+        assert results[0] == expected[0]
+        found += len(set(results) & set(expected))
+    assert found / (len(queries) * K) >= 0.95
+
+
+def test_search_leaves_the_query_untouched(tmp_path, corpus):
+    embeddings, texts, queries = corpus
+    LocalVectorIndex.build(str(tmp_path), embeddings, texts)
+    query = queries[0].copy()
+
+    LocalVectorIndex(str(tmp_path)).search(query, K)
+
+    np.testing.assert_array_equal(query, queries[0])
+
+
+def test_float32_export_removes_stale_scales(monkeypatch, tmp_path, corpus):
+    embeddings, texts, _ = corpus
+    _export(monkeypatch, tmp_path, embeddings, texts, "--int8")
+    _export(monkeypatch, tmp_path, embeddings, texts)
+
+    index = LocalVectorIndex(str(tmp_path))
+
+    assert index.scales is None
+    assert index.vectors.dtype == np.float32